@@ -0,0 +1,50 @@
+"""
+Reports test data generation throughput in rows per second.
+
+Usage: python -m benchmarks.bench_datagen [--rows ROWS]
+"""
+
+from argparse import ArgumentParser
+from time import perf_counter
+from typing import Callable
+
+from evolver.evolver import RxDataGen
+from evolver.helpers import postcode_test_data_settings
+
+
+def report(name: str, rows: int, func: Callable[[], object]) -> float:
+    start: float = perf_counter()
+    func()
+    rate: float = rows / (perf_counter() - start)
+    print(f"{name:<24} {rate:>12,.0f} rows/s")
+    return rate
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=100_000)
+    rows: int = parser.parse_args().rows
+
+    data_gen = RxDataGen()
+    settings: dict = postcode_test_data_settings(rows)
+    no_match_args: tuple = (
+        settings["probabilities"]["alphanum"],
+        settings["probabilities"]["data_format"],
+        settings["data_format"],
+    )
+
+    report(
+        "gen_test_no_match",
+        rows,
+        lambda: [data_gen.gen_test_no_match(*no_match_args) for i in range(rows)],
+    )
+    report(
+        "gen_test_no_match_batch",
+        rows,
+        lambda: data_gen.gen_test_no_match_batch(rows, *no_match_args),
+    )
+    report("gen_test_data", rows, lambda: data_gen.gen_test_data(**settings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Compares generational and steady-state evolution by the wall-clock time taken to
+find a perfect regex, on generated postcode data and the regex golf dataset.
+Each mode is run from the same seeds, and runs that do not find a perfect regex
+within the generation budget report their best score instead.
+
+Usage: python -m benchmarks.bench_evolve [--runs RUNS] [--pop-size SIZE] [--max-gen GEN]
+"""
+
+from argparse import ArgumentParser
+from random import seed as seed_random
+from statistics import median
+from time import perf_counter
+from typing import Dict, List, Tuple
+
+from evolver.config import Dataset
+from evolver.evolver import RxEvolver, RxDataGen
+from evolver.helpers import postcode_test_data_settings
+
+
+def datasets() -> Dict[str, Dataset]:
+    golf = RxDataGen()
+    golf.load_data("data/regex_golf_1.csv")
+    return {
+        "postcode": RxDataGen().gen_test_data(
+            **postcode_test_data_settings(300), seed=0
+        ),
+        "regex golf": golf.export(),
+    }
+
+
+def run(
+    dataset: Dataset, steady_state: bool, seed: int, pop_size: int, max_gen: int
+) -> Tuple[float, float]:
+    """
+    Returns the time taken by one evolution and the score of its best candidate.
+    """
+    seed_random(seed)
+    evolver = RxEvolver(dataset, seed=seed)
+    start: float = perf_counter()
+    result = evolver.evolve(
+        pop_size=pop_size, max_gen=max_gen, verbose=False, steady_state=steady_state
+    )
+    elapsed: float = perf_counter() - start
+    return elapsed, evolver.score_func(result)
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--pop-size", type=int, default=200)
+    parser.add_argument("--max-gen", type=int, default=100)
+    args = parser.parse_args()
+
+    for name, dataset in datasets().items():
+        for mode, steady_state in [("generational", False), ("steady-state", True)]:
+            results: List[Tuple[float, float]] = [
+                run(dataset, steady_state, seed, args.pop_size, args.max_gen)
+                for seed in range(args.runs)
+            ]
+            solved: List[float] = [elapsed for elapsed, score in results if score == 0]
+            best: float = min([score for _, score in results])
+            print(
+                f"{name:<12} {mode:<14} solved {len(solved)}/{args.runs}"
+                f" {median(solved) if solved else float('nan'):>8.2f} s median"
+                f" {median([elapsed for elapsed, _ in results]):>8.2f} s overall"
+                f" best {best:.4f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
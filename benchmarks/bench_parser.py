@@ -0,0 +1,92 @@
+"""
+Reports regex tokenizing time for increasingly long alternation-heavy and deeply
+grouped regexes. Linear parsing keeps the time per character roughly constant
+as the regexes grow, and the growth reported from the smallest to the largest
+size stays near 1x. Garbage collection is paused while timing, as in `timeit`.
+
+Also compares the throughput of compiling a corpus of random regexes to nodes
+directly against going through regex and node specs.
+
+Usage: python -m benchmarks.bench_parser [--sizes SIZE ...] [--corpus SIZE]
+"""
+
+import gc
+from argparse import ArgumentParser
+from time import perf_counter
+from typing import Callable, List
+
+from evolver.nodes import RxNodeFactory, RxNodeSetFactory
+from evolver.parser import extract_symbols, parse_regex, regex_to_nodes
+
+
+def alternations(size: int) -> str:
+    return "|".join([f"a{i % 10}(b|c[d-f]{{1,2}})" for i in range(size)])
+
+
+def nested(size: int) -> str:
+    return "(a|" * size + "b" + ")" * size
+
+
+def report(name: str, make_regex: Callable[[int], str], sizes: List[int]) -> None:
+    per_char: List[float] = []
+    for size in sizes:
+        regex: str = make_regex(size)
+        gc.disable()
+        start: float = perf_counter()
+        extract_symbols(regex)
+        elapsed: float = perf_counter() - start
+        gc.enable()
+        per_char.append(elapsed * 1e6 / len(regex))
+        print(
+            f"{name:<14} {len(regex):>10,} chars {elapsed * 1e3:>10.1f} ms"
+            f" {per_char[-1]:>8.2f} us/char"
+        )
+    # well above 1x means the time per character grows with the regex
+    print(f"{'growth':<14} {per_char[-1] / per_char[0]:>37.2f}x")
+
+
+def spec_nodes(regex: str, node_factory: RxNodeFactory) -> list:
+    return [node_factory.make_node(**spec) for spec in parse_regex(regex)]
+
+
+def report_compile(size: int) -> None:
+    node_set_factory = RxNodeSetFactory(seed=0)
+    node_factory: RxNodeFactory = node_set_factory.node_factory
+
+    # the spec path cannot compile every regex (eg alternations), so skip those
+    corpus: List[str] = []
+    for node_set in node_set_factory.random_node_sets(size):
+        try:
+            spec_nodes(node_set.display(), node_factory)
+            corpus.append(node_set.display())
+        except Exception:
+            continue
+
+    for name, compile_nodes in [
+        ("specs", spec_nodes),
+        ("regex_to_nodes", regex_to_nodes),
+    ]:
+        gc.disable()
+        start: float = perf_counter()
+        for regex in corpus:
+            compile_nodes(regex, node_factory)
+        elapsed: float = perf_counter() - start
+        gc.enable()
+        print(f"{name:<14} {len(corpus) / elapsed:>12,.0f} regexes/s")
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--corpus", type=int, default=10000)
+    args = parser.parse_args()
+    sizes: List[int] = args.sizes
+
+    report("alternations", alternations, sizes)
+    # groups are still tokenized recursively, so nesting stays within the limit
+    report("nested", nested, [min(size // 20, 500) for size in sizes])
+    report_compile(args.corpus)
+
+
+if __name__ == "__main__":
+    main()
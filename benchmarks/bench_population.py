@@ -0,0 +1,47 @@
+"""
+Reports population initialisation throughput in node sets per second, generating
+node sets one at a time with `random_node_set` against generating the whole
+population with `random_node_sets`, which only draws the root-level decisions as
+a batch.
+
+Usage: python -m benchmarks.bench_population [--sizes SIZE ...]
+"""
+
+import gc
+from argparse import ArgumentParser
+from time import perf_counter
+from typing import Callable, List
+
+from evolver.nodes import RxNodeSetFactory
+
+
+def report(name: str, size: int, func: Callable[[], object]) -> float:
+    gc.disable()
+    start: float = perf_counter()
+    func()
+    rate: float = size / (perf_counter() - start)
+    gc.enable()
+    print(f"{name:<18} {size:>8,} {rate:>12,.0f} node sets/s")
+    return rate
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5000, 50000])
+    sizes: List[int] = parser.parse_args().sizes
+
+    node_set_factory = RxNodeSetFactory(seed=0)
+    for size in sizes:
+        single: float = report(
+            "random_node_set",
+            size,
+            lambda: [node_set_factory.random_node_set() for _ in range(size)],
+        )
+        batch: float = report(
+            "random_node_sets", size, lambda: node_set_factory.random_node_sets(size)
+        )
+        print(f"{'speedup':<18} {size:>8,} {batch / single:>12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
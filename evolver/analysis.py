@@ -0,0 +1,117 @@
+from typing import Iterable, Optional, Dict, List, Set
+
+from evolver.parser import get_literal
+from evolver.config import CHAR_SETS, WHITESPACE_CHARS, P_EXTEND, DatasetRow
+
+# the character groups (see `CHAR_SETS`) that do not overlap each other
+CHAR_GROUPS: List[str] = ["digit", "alpha_upper", "alpha_lower", "punctuation", "meta"]
+
+# the groups whose characters can bound a range
+RANGE_GROUPS: List[str] = ["digit", "alpha_upper", "alpha_lower"]
+
+# the group of each printable character
+GROUP_OF: Dict[str, str] = {
+    char: group for group in CHAR_GROUPS for char in CHAR_SETS[group]
+}
+
+# the single digits available as repeat counts (see the `int` wrapper)
+COUNT_DIGITS: str = CHAR_SETS["digit"]
+
+
+class RxDataProfile:
+    """
+    Summarises the characters and string lengths in a dataset, so that the node
+    factory can be restricted to the components that could plausibly be used by
+    a regex separating its positive and negative examples.
+    """
+
+    def __init__(self, rows: Iterable[DatasetRow]) -> None:
+        self.positive_chars: Set[str] = set()
+        self.negative_chars: Set[str] = set()
+        lengths: List[int] = []
+        for string, label in rows:
+            if label:
+                self.positive_chars.update(string)
+                lengths.append(len(string))
+            else:
+                self.negative_chars.update(string)
+
+        self.chars: Set[str] = self.positive_chars | self.negative_chars
+        self.positive_groups: Set[str] = char_groups(self.positive_chars)
+        self.negative_groups: Set[str] = char_groups(self.negative_chars)
+        self.has_whitespace: bool = bool(self.chars & set(WHITESPACE_CHARS))
+        self.has_digits: bool = bool(self.chars & set(CHAR_SETS["digit"]))
+
+        # lengths of the positive examples
+        self.positives: int = len(lengths)
+        self.min_length: int = min(lengths, default=0)
+        self.max_length: int = max(lengths, default=0)
+        self.mean_length: float = sum(lengths) / len(lengths) if lengths else 0
+
+    def groups(self) -> Set[str]:
+        return self.positive_groups | self.negative_groups
+
+    def printable_subset(self) -> Optional[List[str]]:
+        """
+        Returns the character groups appearing anywhere in the dataset, for use as
+        the node factory's `printable_subset`, or None if no restriction applies.
+        """
+        groups: Set[str] = self.groups()
+        if not groups or groups == set(CHAR_GROUPS):
+            return None
+        return [group for group in CHAR_GROUPS if group in groups]
+
+    def omit_types(self) -> Set[str]:
+        """
+        Returns the node types that cannot be generated usefully: character groups
+        absent from the dataset, and ranges once none of their bounds remain.
+        Omitting punctuation also omits meta characters, so it is only omitted
+        if neither appears.
+        """
+        groups: Set[str] = self.groups()
+        omit: Set[str] = set([group for group in RANGE_GROUPS if group not in groups])
+        if "meta" not in groups:
+            omit.add("punctuation" if "punctuation" not in groups else "meta")
+
+        if omit.issuperset(RANGE_GROUPS):
+            omit.add("range")
+        if not self.chars & set(CHAR_SETS["printable"] + " "):
+            omit.add("printable")
+        return omit
+
+    def omit_wrappers(self) -> Set[str]:
+        """
+        Returns the names of wrappers that cannot be generated usefully: the
+        literals of characters absent from the dataset, repeat counts longer than
+        any positive example, and the whitespace and digit classes when no
+        whitespace or digits appear.
+        """
+        omit: Set[str] = set(
+            [get_literal(char) for char in CHAR_SETS["printable"] + " "]
+        ) - set([get_literal(char) for char in self.chars])
+
+        longest: int = max(self.max_length, 1)
+        omit |= set([f"int({digit})" for digit in COUNT_DIGITS if int(digit) > longest])
+
+        if not self.has_whitespace:
+            omit.add("whitespace")
+        if not self.has_digits:
+            omit.add("digit")
+        return omit
+
+    def prob_extend(self, prob_extend: float = P_EXTEND) -> float:
+        """
+        Returns the probability of extending a random node set by another node,
+        lowered from `prob_extend` so that random candidates are not expected to
+        have more nodes than the mean positive example has characters.
+        """
+        if self.mean_length < 1:
+            return prob_extend
+        return min(prob_extend, 1 - 1 / self.mean_length)
+
+
+def char_groups(chars: Iterable[str]) -> Set[str]:
+    """
+    Returns the character groups (see `CHAR_GROUPS`) that `chars` belong to.
+    """
+    return set([GROUP_OF[char] for char in chars if char in GROUP_OF])
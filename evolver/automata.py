@@ -0,0 +1,371 @@
+from __future__ import annotations
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterable,
+    Optional,
+    FrozenSet,
+    Dict,
+    List,
+    Tuple,
+)
+from random import choice, randrange
+
+from evolver.config import MAX_SAMPLE_LENGTH, MAX_DFA_STATES, MAX_VALID_TRIES
+from evolver.exceptions import AutomatonError, NotFoundError
+from evolver.types import Alphabet, ALPHABET
+from evolver.wrapper_functions import node_mask
+
+if TYPE_CHECKING:
+    from evolver.nodes import RxNode, RxNodeSet
+
+
+# Transition = (character mask, target state); a mask of None is an epsilon move
+Transition = Tuple[Optional[int], int]
+
+
+class RxNFA:
+    """
+    A nondeterministic automaton over the characters of an alphabet, built from
+    a node set by Thompson's construction with character masks on its edges.
+    """
+
+    def __init__(self, node_set: "RxNodeSet", alphabet: Alphabet = ALPHABET) -> None:
+        self.alphabet: Alphabet = alphabet
+        self.edges: List[List[Transition]] = []
+        self.start: int = self.add_state()
+
+        state: int = self.start
+        for node in node_set.nodes:
+            state = self.add_node(node, state)
+        self.accept: int = state
+
+    def add_state(self) -> int:
+        self.edges.append([])
+        return len(self.edges) - 1
+
+    def add_edge(self, source: int, target: int, mask: Optional[int] = None) -> None:
+        self.edges[source].append((mask, target))
+
+    def add_node(self, node: "RxNode", start: int) -> int:
+        """
+        Adds the states matching `node` (including its modifier) after `start`,
+        returning the state reached once the node has been matched.
+        """
+        if node.assertion and not node.strip_mod:
+            raise AutomatonError(f"Assertions are not supported ({node.display()})")
+
+        min_count, max_count = repeat_bounds(node)
+
+        state: int = start
+        for _ in range(min_count):
+            state = self.add_base(node, state)
+
+        if max_count is None:
+            loop: int = self.add_state()
+            self.add_edge(state, loop)
+            self.add_edge(self.add_base(node, loop), loop)
+            return loop
+
+        end: int = self.add_state()
+        for _ in range(max_count - min_count):
+            self.add_edge(state, end)
+            state = self.add_base(node, state)
+        self.add_edge(state, end)
+        return end
+
+    def add_base(self, node: "RxNode", start: int) -> int:
+        """
+        Adds the states matching a single instance of `node`, ignoring its modifier.
+        """
+        if node.name == "or":
+            end: int = self.add_state()
+            for child in node.children:
+                self.add_edge(self.add_node(child, start), end)
+            return end
+
+        if node.rxtype.is_type_name("cset*"):
+            raise AutomatonError(
+                f"Zero-width assertions are not supported ({node.display()})"
+            )
+
+        end = self.add_state()
+        self.add_edge(start, end, node_mask(node, self.alphabet))
+        return end
+
+    def closure(self, states: Iterable[int]) -> FrozenSet[int]:
+        """
+        Returns the states reachable from `states` through epsilon moves.
+        """
+        stack: List[int] = list(states)
+        reached: set = set(stack)
+        while stack:
+            for mask, target in self.edges[stack.pop()]:
+                if mask is None and target not in reached:
+                    reached.add(target)
+                    stack.append(target)
+        return frozenset(reached)
+
+    def atoms(self) -> List[int]:
+        """
+        Partitions the alphabet into the coarsest character masks that every edge
+        either fully contains or excludes, so that each atom can be treated as a
+        single symbol.
+        """
+        atoms: List[int] = [self.alphabet.full]
+        for mask in set([mask for edges in self.edges for mask, _ in edges]):
+            if mask is None:
+                continue
+            refined: List[int] = []
+            for atom in atoms:
+                for part in (atom & mask, atom & ~mask):
+                    if part:
+                        refined.append(part)
+            atoms = refined
+        return atoms
+
+
+def repeat_bounds(node: "RxNode") -> Tuple[int, Optional[int]]:
+    """
+    Returns the minimum and maximum (`None` if unbounded) number of times a node
+    is repeated by its modifier. Non-greedy modifiers do not change the strings
+    matched, so are ignored.
+    """
+    modifier: Optional["RxNode"] = None if node.strip_mod else node.modifier
+    if not modifier:
+        return 1, 1
+
+    if modifier.name == "0+":
+        return 0, None
+    if modifier.name == "1+":
+        return 1, None
+    if modifier.name == "0/1":
+        return 0, 1
+
+    counts: List[int] = sorted([int(child.compile()) for child in modifier.children])
+    return counts[0], counts[-1]
+
+
+class RxAutomaton:
+    """
+    A deterministic automaton accepting exactly the strings (over an alphabet)
+    that a node set's regex fully matches. The number of accepted strings of each
+    length is counted by dynamic programming, so that matching strings can be
+    sampled exactly uniformly without generating and verifying candidates.
+    """
+
+    def __init__(self, node_set: "RxNodeSet", alphabet: Alphabet = ALPHABET) -> None:
+        nfa: RxNFA = RxNFA(node_set, alphabet)
+
+        self.alphabet: Alphabet = alphabet
+        self.atoms: List[int] = nfa.atoms()
+        self.atom_tables: List[str] = [alphabet.chars_of(atom) for atom in self.atoms]
+        self.atom_sizes: List[int] = [len(table) for table in self.atom_tables]
+        self._atom_index: Dict[str, int] = {
+            char: i for i, table in enumerate(self.atom_tables) for char in table
+        }
+
+        # subset construction, where the dead state is left implicit (-1)
+        self.transitions: List[List[int]] = []
+        self.accepting: List[bool] = []
+        states: Dict[FrozenSet[int], int] = {}
+        pending: List[FrozenSet[int]] = [nfa.closure([nfa.start])]
+        states[pending[0]] = 0
+        while pending:
+            current: FrozenSet[int] = pending.pop()
+            row: List[int] = []
+            for atom in self.atoms:
+                bit: int = atom & -atom
+                targets: FrozenSet[int] = nfa.closure(
+                    [
+                        target
+                        for state in current
+                        for mask, target in nfa.edges[state]
+                        if mask is not None and mask & bit
+                    ]
+                )
+                if not targets:
+                    row.append(-1)
+                    continue
+                if targets not in states:
+                    if len(states) >= MAX_DFA_STATES:
+                        raise AutomatonError(
+                            f"Automaton exceeds {MAX_DFA_STATES} states"
+                        )
+                    states[targets] = len(states)
+                    pending.append(targets)
+                row.append(states[targets])
+
+            index: int = states[current]
+            while len(self.transitions) <= index:
+                self.transitions.append([])
+                self.accepting.append(False)
+            self.transitions[index] = row
+            self.accepting[index] = nfa.accept in current
+
+        # counts[n][state]: number of strings of length n accepted from state
+        self._counts: List[List[int]] = [[int(a) for a in self.accepting]]
+
+    def step(self, state: int, char: str) -> int:
+        """
+        Returns the state reached by consuming `char`, or -1 if no match is possible.
+        """
+        atom: Optional[int] = self._atom_index.get(char)
+        if state < 0 or atom is None:
+            return -1
+        return self.transitions[state][atom]
+
+    def accepts(self, string: str) -> bool:
+        state: int = 0
+        for char in string:
+            state = self.step(state, char)
+            if state < 0:
+                return False
+        return self.accepting[state]
+
+    def counts(self, length: int) -> List[int]:
+        """
+        Returns the number of strings of `length` accepted from each state,
+        extending the memoised table as required.
+        """
+        while len(self._counts) <= length:
+            previous: List[int] = self._counts[-1]
+            self._counts.append(
+                [
+                    sum(
+                        [
+                            size * previous[target]
+                            for size, target in zip(self.atom_sizes, row)
+                            if target >= 0
+                        ]
+                    )
+                    for row in self.transitions
+                ]
+            )
+        return self._counts[length]
+
+    def count(self, length: int) -> int:
+        """
+        Returns the number of matching strings of `length`.
+        """
+        return self.counts(length)[0]
+
+    def lengths(self, max_length: int = MAX_SAMPLE_LENGTH) -> List[int]:
+        """
+        Returns the lengths (up to `max_length`) for which matching strings exist.
+        """
+        return [n for n in range(max_length + 1) if self.count(n)]
+
+    def sample(
+        self,
+        length: Optional[int] = None,
+        max_length: int = MAX_SAMPLE_LENGTH,
+    ) -> str:
+        """
+        Draws a matching string uniformly at random from all matching strings of
+        `length`. If no length is given, one is chosen uniformly from the lengths
+        (up to `max_length`) that have matching strings.
+        """
+        if length is None:
+            lengths: List[int] = self.lengths(max_length)
+            if not lengths:
+                raise NotFoundError(f"No matching strings up to length {max_length}")
+            length = choice(lengths)
+
+        total: int = self.count(length)
+        if not total:
+            raise NotFoundError(f"No matching strings of length {length}")
+
+        return self._walk(length, total, self.counts)
+
+    def complement_counts(self, length: int) -> List[int]:
+        """
+        Returns the number of strings of `length` rejected from each state.
+        """
+        total: int = len(self.alphabet) ** length
+        return [total - count for count in self.counts(length)]
+
+    def complement_count(self, length: int) -> int:
+        """
+        Returns the number of non-matching strings of `length`.
+        """
+        return len(self.alphabet) ** length - self.count(length)
+
+    def sample_complement(
+        self,
+        length: Optional[int] = None,
+        max_length: int = MAX_SAMPLE_LENGTH,
+    ) -> str:
+        """
+        Draws a non-matching string uniformly at random from all non-matching
+        strings of `length`, by walking the complement of the automaton. If no
+        length is given, one is chosen uniformly from `0` to `max_length`.
+        """
+        if length is None:
+            lengths: List[int] = [
+                n for n in range(max_length + 1) if self.complement_count(n)
+            ]
+            if not lengths:
+                raise NotFoundError(
+                    f"No non-matching strings up to length {max_length}"
+                )
+            length = choice(lengths)
+
+        total: int = self.complement_count(length)
+        if not total:
+            raise NotFoundError(f"No non-matching strings of length {length}")
+        return self._walk(length, total, self.complement_counts, complement=True)
+
+    def near_miss(self, string: str, max_tries: int = MAX_VALID_TRIES) -> str:
+        """
+        Returns a non-matching string one edit (substitution, insertion or
+        deletion) away from `string`, checked against the automaton. If no
+        random edit misses within `max_tries`, a non-matching string of the same
+        length is sampled from the complement instead.
+        """
+        for _ in range(max_tries):
+            i: int = randrange(len(string) + 1)
+            edit: int = randrange(3) if i < len(string) else 1
+            if edit == 0:
+                out: str = string[:i] + choice(self.alphabet.chars) + string[i + 1 :]
+            elif edit == 1:
+                out = string[:i] + choice(self.alphabet.chars) + string[i:]
+            else:
+                out = string[:i] + string[i + 1 :]
+            if not self.accepts(out):
+                return out
+
+        return self.sample_complement(len(string))
+
+    def _walk(
+        self,
+        length: int,
+        total: int,
+        counts: Callable[[int], List[int]],
+        complement: bool = False,
+    ) -> str:
+        """
+        Draws one of the `total` strings of `length` counted by `counts`, choosing
+        each character in proportion to the number of completions it leaves. In
+        the complement, the dead state (-1) completes every string.
+        """
+        out: List[str] = []
+        state: int = 0
+        for remaining in range(length, 0, -1):
+            following: List[int] = counts(remaining - 1)
+            dead: int = len(self.alphabet) ** (remaining - 1) if complement else 0
+            r: int = randrange(total)
+            for i, target in enumerate(self.transitions[state]):
+                completions: int = following[target] if target >= 0 else dead
+                weight: int = self.atom_sizes[i] * completions
+                if r < weight:
+                    out.append(self.atom_tables[i][r // completions])
+                    state, total = target, completions
+                    break
+                r -= weight
+
+            # every string passing through the dead state is rejected
+            if state < 0:
+                out.extend([choice(self.alphabet.chars) for _ in range(remaining - 1)])
+                break
+        return "".join(out)
@@ -25,6 +25,12 @@ P_MODIFIER: float = 0.1
 # default probability of a additional node being added during random node set creation
 P_EXTEND: float = 0.76
 
+# maximum % of the initial population filled with seed regexes and their mutated variants
+P_SEED: float = 0.2
+
+# ranking penalty per node in a candidate, so that smaller candidates win ties (0 disables)
+P_PARSIMONY: float = 0.0
+
 
 ##### Settings #####
 
@@ -34,18 +40,82 @@ MAX_GEN: int = 500
 # default population size
 POP_SIZE: int = 500
 
+# number of offspring bred and scored per step of steady-state evolution
+STEADY_BATCH_SIZE: int = 20
+
+# default number of populations (one per process) evolved by the island model
+ISLANDS: int = 4
+
+# number of generations between migrations of candidates between islands
+MIGRATION_INTERVAL: int = 10
+
+# number of top candidates sent by each island per migration
+MIGRANTS: int = 5
+
+# default number of differently configured evolutions raced in a portfolio
+PORTFOLIO_SIZE: int = 8
+
+# number of generations between progress reports from each portfolio evolution
+PROGRESS_INTERVAL: int = 10
+
 # default number of rows to generate in dataset
 SIZE_DATASET: int = 300
 
+# number of rows generated per seeded chunk when generating datasets in parallel
+GEN_CHUNK_SIZE: int = 1000
+
+# number of uniform floats drawn at a time by generators of random batches
+RANDOM_BLOCK_SIZE: int = 4096
+
+# number of rows buffered before each write when streaming a dataset to disk
+WRITE_BATCH_SIZE: int = 10000
+
+# number of rows read at a time when scoring against a file-backed dataset
+SCORE_CHUNK_SIZE: int = 100000
+
 # maximum number of words that can be generated in a testing data item
 MAX_WORDS: int = 5
 
 # maximum number of children to be generated in a regex node (eg set)
 MAX_CHILDREN: int = 5
 
+# maximum number of nodes (including children and modifiers) in a generated node set
+MAX_NODES: int = 64
+
+# maximum depth of nested children in a generated node (eg 3 for a range in a set)
+MAX_DEPTH: int = 8
+
+# maximum attempts at regenerating a random node's children until the node is valid
+MAX_VALID_TRIES: int = 10
+
 # maximum times regex modifiers (*, ?, +, {}) can multiply characters on compilation
 MAX_COMPILE_MUTLIPLE: int = 5
 
+# maximum length of matching strings sampled from a regex's automaton
+MAX_SAMPLE_LENGTH: int = 32
+
+# maximum number of states built when converting a regex into an automaton
+MAX_DFA_STATES: int = 5000
+
+# maximum number of regex strings remembered as failing to compile during scoring
+MAX_INVALID_CACHE: int = 10000
+
+# maximum number of parsed regex strings and rxspecs remembered by each parse cache
+MAX_PARSE_CACHE: int = 1000
+
+# nesting levels copied recursively when freezing and thawing specs, before
+# switching to an explicit stack
+MAX_RECURSIVE_DEPTH: int = 32
+
+# maximum number of seed regexes built from the positive examples of a dataset
+MAX_DATA_SEEDS: int = 10
+
+# maximum number of positive examples sampled when building seed regexes
+MAX_SEED_POSITIVES: int = 1000
+
+# maximum number of distinct characters listed in a seed's set before using a range
+MAX_SEED_SET_CHARS: int = 3
+
 # wildcard matches newlines
 DOT_ALL: bool = False
 
@@ -66,7 +136,7 @@ NodeSpec = Mapping[str, Union[str, "NodeSpec", List["NodeSpec"]]]
 
 # Dataset type definitions
 DatasetRow = Tuple[str, bool]
-Dataset = List[DatasetRow]
+Dataset = Sequence[DatasetRow]
 
 ##### Constants #####
 RAND: int = -1
@@ -85,8 +155,9 @@ CHAR_SETS: Dict[str, str] = {
     "punctuation": PUNCTUATION_CHARS,
 }
 
+# sorted so that seeded generation does not depend on string hash randomisation
 CHAR_SETS["printable"] = "".join(
-    [char_set for char_set in set("".join([value for value in CHAR_SETS.values()]))]
+    sorted(set("".join([value for value in CHAR_SETS.values()])))
 )
 
 # RxWrapper settings
@@ -106,7 +177,7 @@ RXTYPE_SETTINGS: List[dict] = [
     {"name": "range", "is_modifiable": False},
     {"name": "integer", "is_modifiable": False},
     {"name": "cset", "parent_name": "re"},
-    {"name": "cset*", "parent_name": "re"},
+    {"name": "cset*", "parent_name": "re", "is_modifiable": False},
     {"name": "printable", "parent_name": "re"},
     {"name": "punctuation", "parent_name": "printable"},
     {"name": "meta", "parent_name": "punctuation"},
@@ -0,0 +1,547 @@
+from __future__ import annotations
+from array import array
+from collections.abc import Sequence
+from contextlib import ExitStack
+from random import sample
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Optional,
+    Pattern,
+    Dict,
+    List,
+    Tuple,
+    Union,
+)
+import struct
+import mmap
+import csv
+import sys
+import shutil
+import tempfile
+
+from itertools import islice
+
+from evolver.config import DatasetRow, SCORE_CHUNK_SIZE, WRITE_BATCH_SIZE
+from evolver.scoring import string_mask
+
+# weighted dataset masks are split into their low and high 64 bits, with the
+# high bits of strings that have characters outside of the alphabet (which has
+# fewer than 127 characters) set to a bit that no excluded mask can contain
+LOW_BITS: int = (1 << 64) - 1
+UNCOVERED: int = 1 << 63
+
+# binary dataset layout: header, row offsets (uint64), label bitmap, UTF-8 blob
+BINARY_MAGIC: bytes = b"RXDS"
+BINARY_VERSION: int = 1
+BINARY_HEADER: struct.Struct = struct.Struct(
+    "<4sIQQ"
+)  # magic, version, rows, blob size
+
+
+class RxDataset(Sequence):
+    """
+    A compact, columnar dataset of `(string, label)` rows.
+
+    The strings are stored end to end in a single UTF-8 buffer indexed by an
+    array of offsets, and the labels are packed into a bit array, avoiding the
+    per-row tuple and string objects of a `List[DatasetRow]`. Rows are decoded
+    into `(str, bool)` tuples only when accessed, so the dataset can be used
+    anywhere a list of rows is expected (eg scoring and `safe_sample`).
+
+    Datasets saved with `save_binary` can be reopened with `open_binary`, which
+    memory-maps the file rather than reading it, so opening is near-instant and
+    the pages are shared between processes. Memory-mapped datasets are read-only,
+    and can be used as context managers to unmap them on exit.
+    """
+
+    def __init__(self, rows: Optional[Iterable[DatasetRow]] = None) -> None:
+        self._buffer: Union[bytearray, memoryview] = bytearray()
+        self._offsets: Union[array, memoryview] = array("Q", [0])
+        self._labels: Union[bytearray, memoryview] = bytearray()
+        self._mmap: Optional[mmap.mmap] = None
+        self._path: Optional[str] = None
+        if rows is not None:
+            self.extend(rows)
+
+    @classmethod
+    def open_binary(cls, filepath: str) -> RxDataset:
+        """
+        Opens a dataset saved by `save_binary` by memory-mapping the file.
+        """
+        with open(filepath, "rb") as f:
+            mapped: mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        rows, blob_size = read_binary_header(mapped[: BINARY_HEADER.size])
+        offsets_end: int = BINARY_HEADER.size + (rows + 1) * 8
+        labels_end: int = offsets_end + (rows + 7) // 8
+
+        view: memoryview = memoryview(mapped)
+        dataset: RxDataset = cls()
+        dataset._offsets = view[BINARY_HEADER.size : offsets_end].cast("Q")
+        if sys.byteorder != "little":
+            dataset._offsets = array("Q", dataset._offsets)
+            dataset._offsets.byteswap()
+        dataset._labels = view[offsets_end:labels_end]
+        dataset._buffer = view[labels_end : labels_end + blob_size]
+        dataset._mmap = mapped
+        dataset._path = filepath
+        return dataset
+
+    def save_binary(self, filepath: str) -> None:
+        """
+        Writes the dataset to `filepath` in the binary format read by `open_binary`.
+        """
+        offsets: array = array("Q", self._offsets)
+        if sys.byteorder != "little":
+            offsets.byteswap()
+
+        with open(filepath, "wb") as f:
+            f.write(
+                BINARY_HEADER.pack(
+                    BINARY_MAGIC, BINARY_VERSION, len(self), len(self._buffer)
+                )
+            )
+            f.write(offsets.tobytes())
+            f.write(self._labels)
+            f.write(self._buffer)
+
+    def is_mapped(self) -> bool:
+        return self._mmap is not None
+
+    def close(self) -> None:
+        """
+        Unmaps a dataset opened by `open_binary`, leaving it empty.
+        """
+        if self._mmap is None:
+            return
+        for view in (self._buffer, self._offsets, self._labels):
+            if isinstance(view, memoryview):
+                view.release()
+        self._mmap.close()
+        self.__init__()
+
+    def __enter__(self) -> RxDataset:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __reduce__(self) -> Tuple:
+        # memory-mapped datasets are reopened (sharing pages) rather than copied
+        if self._path is not None:
+            return (RxDataset.open_binary, (self._path,))
+        return (RxDataset, (), self.__dict__)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[DatasetRow, RxDataset]:
+        if isinstance(index, slice):
+            return RxDataset([self.row(i) for i in range(*index.indices(len(self)))])
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("dataset index out of range")
+        return self.row(index)
+
+    def __iter__(self) -> Iterator[DatasetRow]:
+        buffer: Union[bytearray, memoryview] = self._buffer
+        offsets: Union[array, memoryview] = self._offsets
+        for i in range(len(self)):
+            yield (str(buffer[offsets[i] : offsets[i + 1]], "utf-8"), self.label(i))
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, RxDataset):
+            return (
+                memoryview(self._offsets) == memoryview(other._offsets)
+                and memoryview(self._buffer) == memoryview(other._buffer)
+                and memoryview(self._labels) == memoryview(other._labels)
+            )
+        if not isinstance(other, Sequence) or len(other) != len(self):
+            return False
+        return all([tuple(other_row) == row for row, other_row in zip(self, other)])
+
+    def __repr__(self) -> str:
+        return f"RxDataset({len(self)} rows, {self.nbytes()} bytes)"
+
+    def string(self, index: int) -> str:
+        return str(
+            self._buffer[self._offsets[index] : self._offsets[index + 1]], "utf-8"
+        )
+
+    def label(self, index: int) -> bool:
+        return bool(self._labels[index >> 3] >> (index & 7) & 1)
+
+    def row(self, index: int) -> DatasetRow:
+        return (self.string(index), self.label(index))
+
+    def strings(self) -> Iterator[str]:
+        for row in self:
+            yield row[0]
+
+    def labels(self) -> Iterator[bool]:
+        for i in range(len(self)):
+            yield self.label(i)
+
+    def append(self, row: DatasetRow) -> None:
+        if self._mmap is not None:
+            raise TypeError("memory-mapped datasets are read-only")
+
+        index: int = len(self)
+        if not index & 7:
+            self._labels.append(0)
+        if row[1]:
+            self._labels[index >> 3] |= 1 << (index & 7)
+
+        self._buffer += row[0].encode()
+        self._offsets.append(len(self._buffer))
+
+    def extend(self, rows: Iterable[DatasetRow]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def sample(self, size: int) -> List[DatasetRow]:
+        """
+        Returns `size` rows chosen at random, decoding only the chosen rows.
+        """
+        return [self.row(i) for i in sample(range(len(self)), size)]
+
+    def nbytes(self) -> int:
+        """
+        Returns the number of bytes used to store the rows.
+        """
+        return (
+            len(self._buffer)
+            + len(self._offsets) * self._offsets.itemsize
+            + len(self._labels)
+        )
+
+
+class RxWeightedDataset:
+    """
+    The unique strings of a dataset, each with the number of times it appears
+    labelled as a match and as a non-match. Scoring evaluates each unique string
+    once and adds the weight of the label it agrees with, which gives exactly the
+    same number of correct rows as scoring every row.
+
+    The weights and character masks are stored in arrays, and the unique strings
+    of an `RxDataset` are kept in another `RxDataset`, so that collapsing a
+    compact dataset does not create an object per string. Unique strings are
+    found through an open addressing table of their indexes (see `find`) rather
+    than a dictionary of the strings.
+    """
+
+    def __init__(self, rows: Optional[Iterable[DatasetRow]] = None) -> None:
+        self.strings: Union[List[str], RxDataset] = (
+            RxDataset() if isinstance(rows, RxDataset) else []
+        )
+        self.match_weights: array = array("Q")
+        self.no_match_weights: array = array("Q")
+        # the hash of each unique string, and a table of their indexes (or -1 for
+        # free slots) kept at most half full
+        self._hashes: array = array("q")
+        self._table: array = array("q", [-1]) * 8
+        self._masks: Optional[Tuple[array, array]] = None
+        if rows is not None:
+            self.extend(rows)
+
+    def __len__(self) -> int:
+        return len(self.match_weights)
+
+    def string(self, index: int) -> str:
+        if isinstance(self.strings, RxDataset):
+            return self.strings.string(index)
+        return self.strings[index]
+
+    def unique_strings(self) -> Iterable[str]:
+        if isinstance(self.strings, RxDataset):
+            return self.strings.strings()
+        return self.strings
+
+    def find(self, string: str, key: int) -> int:
+        """
+        Returns the table slot holding the index of `string` (whose hash is
+        `key`), or the free slot where it would be added, by linear probing.
+        """
+        table: array = self._table
+        mask: int = len(table) - 1
+        slot: int = key & mask
+        while True:
+            i: int = table[slot]
+            if i < 0 or (self._hashes[i] == key and self.string(i) == string):
+                return slot
+            slot = (slot + 1) & mask
+
+    def add(self, row: DatasetRow, weight: int = 1) -> None:
+        string: str = row[0]
+        key: int = hash(string)
+        slot: int = self.find(string, key)
+        i: int = self._table[slot]
+        if i < 0:
+            i = len(self)
+            self._table[slot] = i
+            self._hashes.append(key)
+            self.strings.append(
+                (string, False) if isinstance(self.strings, RxDataset) else string
+            )
+            self.match_weights.append(0)
+            self.no_match_weights.append(0)
+            self._masks = None
+            if 2 * len(self) > len(self._table):
+                self._grow()
+
+        if row[1]:
+            self.match_weights[i] += weight
+        else:
+            self.no_match_weights[i] += weight
+
+    def extend(self, rows: Iterable[DatasetRow]) -> None:
+        for row in rows:
+            self.add(row)
+
+    def _grow(self) -> None:
+        table: array = array("q", [-1]) * (2 * len(self._table))
+        mask: int = len(table) - 1
+        for i, key in enumerate(self._hashes):
+            slot: int = key & mask
+            while table[slot] >= 0:
+                slot = (slot + 1) & mask
+            table[slot] = i
+        self._table = table
+
+    def total(self) -> int:
+        """
+        Returns the number of rows in the original dataset.
+        """
+        return sum(self.match_weights) + sum(self.no_match_weights)
+
+    def conflicts(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Returns the strings that appear with both labels, along with the number of
+        times they are labelled as a match and as a non-match.
+        """
+        return {
+            self.string(i): (match_weight, no_match_weight)
+            for i, (match_weight, no_match_weight) in enumerate(
+                zip(self.match_weights, self.no_match_weights)
+            )
+            if match_weight and no_match_weight
+        }
+
+    def masks(self) -> Tuple[array, array]:
+        """
+        Returns the character masks of the unique strings (see `string_mask`),
+        split into arrays of their low and high 64 bits. Strings with characters
+        outside of the alphabet are flagged by `UNCOVERED` in the high bits.
+        """
+        if self._masks is None:
+            low: array = array("Q")
+            high: array = array("Q")
+            for string in self.unique_strings():
+                mask: Optional[int] = string_mask(string)
+                if mask is None:
+                    low.append(0)
+                    high.append(UNCOVERED)
+                else:
+                    low.append(mask & LOW_BITS)
+                    high.append(mask >> 64)
+            self._masks = (low, high)
+        return self._masks
+
+    def count_correct(self, pattern: Pattern, excluded: int = 0) -> int:
+        """
+        Returns the number of rows whose label agrees with whether `pattern` fully
+        matches their string. Strings containing `excluded` characters are known
+        not to match without calling the regex.
+        """
+        return self.count_correct_all([pattern], [excluded])[0]
+
+    def count_correct_all(
+        self,
+        patterns: Sequence[Optional[Pattern]],
+        excluded: Sequence[int],
+        block_size: int = SCORE_CHUNK_SIZE,
+    ) -> List[int]:
+        """
+        Returns `count_correct` for each pattern (zero for None), with its
+        `excluded` characters. The unique strings are decoded once for every
+        pattern, `block_size` strings at a time.
+        """
+        correct: List[int] = [0] * len(patterns)
+        low_masks, high_masks = self.masks()
+        for start in range(0, len(self), block_size):
+            stop: int = min(start + block_size, len(self))
+            block: List[Tuple[str, int, int, int, int]] = list(
+                zip(
+                    self.block_strings(start, stop),
+                    low_masks[start:stop],
+                    high_masks[start:stop],
+                    self.match_weights[start:stop],
+                    self.no_match_weights[start:stop],
+                )
+            )
+            for i, (pattern, pattern_excluded) in enumerate(zip(patterns, excluded)):
+                if pattern is None:
+                    continue
+                fullmatch: Callable = pattern.fullmatch
+                excluded_low: int = pattern_excluded & LOW_BITS
+                excluded_high: int = pattern_excluded >> 64
+                count: int = 0
+                for string, low, high, match_weight, no_match_weight in block:
+                    if (
+                        not (low & excluded_low or high & excluded_high)
+                        and fullmatch(string) is not None
+                    ):
+                        count += match_weight
+                    else:
+                        count += no_match_weight
+                correct[i] += count
+        return correct
+
+    def block_strings(self, start: int, stop: int) -> List[str]:
+        if isinstance(self.strings, RxDataset):
+            return [self.strings.string(i) for i in range(start, stop)]
+        return self.strings[start:stop]
+
+
+class RxDataStream:
+    """
+    A dataset read from a (binary or csv) file in chunks of rows rather than held
+    in memory, for datasets larger than RAM. Every pass over the chunks reads
+    the file from the start, so memory use does not depend on the dataset size.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        chunk_size: int = SCORE_CHUNK_SIZE,
+        delimiter: str = ",",
+        quotechar: str = "|",
+    ) -> None:
+        self.filepath: str = filepath
+        self.chunk_size: int = chunk_size
+        self.delimiter: str = delimiter
+        self.quotechar: str = quotechar
+        self.is_binary: bool = is_binary_dataset(filepath)
+        self._rows: Optional[int] = None
+
+    def __len__(self) -> int:
+        if self._rows is None:
+            self._rows = sum([len(chunk) for chunk in self.chunks()])
+        return self._rows
+
+    def chunks(self) -> Iterator[List[DatasetRow]]:
+        """
+        Lazily reads the dataset as lists of at most `chunk_size` rows.
+        """
+        rows: int = 0
+        if self.is_binary:
+            with RxDataset.open_binary(self.filepath) as dataset:
+                for start in range(0, len(dataset), self.chunk_size):
+                    chunk: List[DatasetRow] = [
+                        dataset.row(i)
+                        for i in range(
+                            start, min(start + self.chunk_size, len(dataset))
+                        )
+                    ]
+                    rows += len(chunk)
+                    yield chunk
+
+        else:
+            reader: Iterator[DatasetRow] = read_csv_rows(
+                self.filepath, self.delimiter, self.quotechar
+            )
+            chunk = list(islice(reader, self.chunk_size))
+            while chunk:
+                rows += len(chunk)
+                yield chunk
+                chunk = list(islice(reader, self.chunk_size))
+
+        self._rows = rows
+
+
+def read_binary_header(header: bytes) -> Tuple[int, int]:
+    """
+    Validates a binary dataset header, returning its row count and blob size.
+    """
+    if len(header) < BINARY_HEADER.size:
+        raise ValueError("not a binary dataset file")
+
+    magic, version, rows, blob_size = BINARY_HEADER.unpack(header)
+    if magic != BINARY_MAGIC:
+        raise ValueError("not a binary dataset file")
+    if version != BINARY_VERSION:
+        raise ValueError(f"unsupported binary dataset version ({version})")
+    return rows, blob_size
+
+
+def is_binary_dataset(filepath: str) -> bool:
+    with open(filepath, "rb") as f:
+        return f.read(len(BINARY_MAGIC)) == BINARY_MAGIC
+
+
+def read_csv_rows(
+    filepath: str,
+    delimiter: str = ",",
+    quotechar: str = "|",
+) -> Iterator[DatasetRow]:
+    """
+    Lazily reads the rows of a csv dataset (as written by `RxDataGen.write_data`).
+    """
+    with open(filepath, newline="") as f:
+        csvreader = csv.reader(f, delimiter=delimiter, quotechar=quotechar)
+        for row in csvreader:
+            yield (row[0], row[1].strip().lower() in ["true", "t"])
+
+
+def csv_to_binary(
+    csv_filepath: str,
+    binary_filepath: str,
+    delimiter: str = ",",
+    quotechar: str = "|",
+    chunk_size: int = WRITE_BATCH_SIZE,
+) -> int:
+    """
+    Converts a csv dataset into the binary format, returning the number of rows.
+
+    The csv is read in chunks of `chunk_size` rows (rounded up to a multiple
+    of 8), with the offsets, labels and strings of each chunk spooled to
+    temporary files and joined once the row count is known, so memory use does
+    not depend on the dataset size.
+    """
+    # whole bytes of labels per chunk, so that the label bitmaps can be joined
+    chunk_size = max(chunk_size + -chunk_size % 8, 8)
+
+    reader: Iterator[DatasetRow] = read_csv_rows(csv_filepath, delimiter, quotechar)
+    rows: int = 0
+    blob_size: int = 0
+    with ExitStack() as stack:
+        offsets_file, labels_file, blob_file = [
+            stack.enter_context(tempfile.TemporaryFile()) for _ in range(3)
+        ]
+        chunk: RxDataset = RxDataset(islice(reader, chunk_size))
+        while len(chunk):
+            offsets: array = array(
+                "Q", [blob_size + offset for offset in chunk._offsets[1:]]
+            )
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            offsets_file.write(offsets.tobytes())
+            labels_file.write(chunk._labels)
+            blob_file.write(chunk._buffer)
+
+            rows += len(chunk)
+            blob_size += len(chunk._buffer)
+            chunk = RxDataset(islice(reader, chunk_size))
+
+        with open(binary_filepath, "wb") as f:
+            f.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, rows, blob_size))
+            f.write(bytes(8))  # the first row's offset
+            for spooled in (offsets_file, labels_file, blob_file):
+                spooled.seek(0)
+                shutil.copyfileobj(spooled, f)
+    return rows
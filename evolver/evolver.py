@@ -1,18 +1,53 @@
-from random import random, randint, sample, choice
-from typing import Any, Iterable, Sequence, Optional, List, Tuple
+from random import random, randint, sample, choice, choices
+from random import getrandbits, getstate, setstate
+from random import seed as seed_random
+from concurrent.futures import ProcessPoolExecutor, Future
+from collections import deque
+from bisect import insort
+from itertools import chain
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    Deque,
+    Hashable,
+    Pattern,
+    Union,
+    Sequence,
+    Optional,
+    Dict,
+    List,
+    Tuple,
+)
 from math import log
+from time import perf_counter
 import string
 import csv
 import re
 
 from evolver.nodes import RxNodeSetFactory, RxNodeSet
-from evolver.exceptions import NotFoundError
+from evolver.seeding import Seed, seed_population, data_seeds
+from evolver.analysis import RxDataProfile
+from evolver.scoring import RxPatternCache
+from evolver.types import ALPHABET
+from evolver.automata import RxAutomaton
+from evolver.dataset import (
+    RxDataset,
+    RxDataStream,
+    RxWeightedDataset,
+    is_binary_dataset,
+    read_csv_rows,
+)
+from evolver.exceptions import NotFoundError, AutomatonError
 
 from evolver.helpers import (
     safe_sample,
     select_index,
     check_match,
     callable_get,
+    freeze_rxspec,
+    derive_seed,
     postcode_test_data_settings,
 )
 
@@ -23,12 +58,23 @@ from evolver.config import (
     MUTATION_RATE,
     CROSSOVER_RATE,
     P_EXP,
+    P_EXTEND,
     P_NEW_UPPER,
     P_NEW_LOWER,
+    P_SEED,
+    P_PARSIMONY,
+    MAX_NODES,
+    MAX_DEPTH,
+    STEADY_BATCH_SIZE,
+    MAX_DATA_SEEDS,
+    MAX_SEED_POSITIVES,
     DISPLAY_MESSAGES,
     CHAR_SETS,
     RAND,
     MAX_WORDS,
+    WRITE_BATCH_SIZE,
+    GEN_CHUNK_SIZE,
+    SCORE_CHUNK_SIZE,
     DatasetRow,
     Dataset,
     RxSpec,
@@ -37,17 +83,139 @@ from evolver.config import (
 RankedNode = Tuple[float, RxNodeSet]
 RankedPop = Sequence[RankedNode]
 
+# called with the generation number and ranked population, returns immigrants
+Migration = Callable[[int, RankedPop], Sequence[RxNodeSet]]
+
+# called with the generation number and ranked population, eg to report progress
+Observer = Callable[[int, RankedPop], None]
+
+# (regex, rows, data_format, probabilities, char_sets, seed)
+DataChunk = Tuple[
+    RxSpec, int, Optional[dict], Optional[dict], Optional[Sequence[str]], int
+]
+
 
 class RxEvolver:
-    def __init__(self, dataset: Optional[Dataset] = None) -> None:
+    def __init__(
+        self,
+        dataset: Optional[Union[Dataset, RxDataStream]] = None,
+        prune_search: bool = False,
+        seed: Optional[int] = None,
+    ) -> None:
         self._population: Sequence[RxNodeSet] = []
+        self._data_stream: Optional[RxDataStream] = None
+        if isinstance(dataset, RxDataStream):
+            self._data_stream = dataset
+            dataset = None
         self._dataset: Dataset = dataset or []
-        self._rxnode_set_factory: RxNodeSetFactory = RxNodeSetFactory()
+        # seeds the generator for batches of random candidates (see RxNodeSetFactory)
+        self._seed: Optional[int] = seed
+        self._rxnode_set_factory: RxNodeSetFactory = RxNodeSetFactory(seed=seed)
+        self._patterns: RxPatternCache = RxPatternCache()
+        self._weighted_dataset: Optional[RxWeightedDataset] = None
+        self._profile: Optional[RxDataProfile] = None
+        self._prob_extend: float = P_EXTEND
+        if prune_search:
+            self.prune_search_space()
 
-    def generate_population(self, size: int = 10) -> None:
-        self._population = [
-            self._rxnode_set_factory.random_node_set() for _ in range(size)
-        ]
+    def data_profile(self) -> RxDataProfile:
+        """
+        Returns the character groups and positive example lengths found in the
+        (whole) dataset, analysed on first use.
+        """
+        if self._profile is None:
+            rows: Iterable[DatasetRow] = self._dataset
+            if self._data_stream is not None:
+                rows = chain.from_iterable(self._data_stream.chunks())
+            self._profile = RxDataProfile(rows)
+        return self._profile
+
+    def prune_search_space(self) -> RxDataProfile:
+        """
+        Restricts the node set factory to the characters, classes and repeat
+        counts that could be useful for the dataset (see `RxDataProfile`), and
+        shortens random candidates when the positive examples are short.
+        """
+        profile: RxDataProfile = self.data_profile()
+        self._rxnode_set_factory = RxNodeSetFactory(
+            profile.printable_subset(), self._seed
+        )
+        self._rxnode_set_factory.set_omit(profile.omit_types(), profile.omit_wrappers())
+        self._prob_extend = profile.prob_extend()
+        return profile
+
+    def node_set_factory(self) -> RxNodeSetFactory:
+        """
+        Returns the factory that candidates are generated by and bound to.
+        """
+        return self._rxnode_set_factory
+
+    def compile_failures(self) -> Dict[str, int]:
+        """
+        Returns the number of candidates scored that failed to compile, by reason.
+        """
+        return self._patterns.failures()
+
+    def is_mapped(self) -> bool:
+        """
+        Whether the dataset is memory-mapped from a binary file (see
+        `RxDataset.open_binary`).
+        """
+        return isinstance(self._dataset, RxDataset) and self._dataset.is_mapped()
+
+    def weighted_dataset(self) -> RxWeightedDataset:
+        """
+        Returns the dataset's unique strings with their label weights, built on
+        first use. Memory-mapped datasets are not collapsed when scoring, since
+        that would copy their strings into every process that shares them.
+        """
+        if self._weighted_dataset is None:
+            self._weighted_dataset = RxWeightedDataset(self._dataset)
+        return self._weighted_dataset
+
+    def label_conflicts(self) -> Dict[str, Tuple[int, int]]:
+        """
+        Returns the strings in the dataset labelled both as a match and as a
+        non-match, with the number of rows carrying each label.
+        """
+        return self.weighted_dataset().conflicts()
+
+    def generate_population(
+        self,
+        size: int = 10,
+        seeds: Optional[Sequence[Seed]] = None,
+        seed_fraction: float = P_SEED,
+        mutation_rate: float = MUTATION_RATE,
+    ) -> None:
+        """
+        Generates a population of `size` random node sets. If `seeds` (regex
+        strings, RxSpecs or node sets) are given, up to `seed_fraction` of the
+        population is instead made of the seeds and mutated variants of them.
+        """
+        seeded: List[RxNodeSet] = []
+        if seeds:
+            seeded = seed_population(
+                seeds, size, self._rxnode_set_factory, seed_fraction, mutation_rate
+            )
+        self._population = seeded + self._rxnode_set_factory.random_node_sets(
+            size - len(seeded), self._prob_extend
+        )
+
+    def data_seeds(self, max_seeds: int = MAX_DATA_SEEDS) -> List[RxNodeSet]:
+        """
+        Returns seed node sets generalized from (a sample of up to
+        `MAX_SEED_POSITIVES` of) the dataset's positive examples, read from the
+        first chunk of a file-backed dataset.
+        """
+        rows: Iterable[DatasetRow] = self._dataset
+        if self._data_stream is not None:
+            rows = next(iter(self._data_stream.chunks()), [])
+        positives: List[str] = [row[0] for row in rows if row[1]]
+        return data_seeds(
+            safe_sample(positives, MAX_SEED_POSITIVES),
+            self._rxnode_set_factory,
+            max_seeds,
+        )
 
     def sample_dataset(self, size: int = None) -> List[Tuple[str, bool]]:
         return safe_sample(self._dataset, size)
@@ -68,13 +236,34 @@ class RxEvolver:
                 return 1
             regex_string = node_set.display()
 
+        # compile once per candidate, invalid candidates get the worst score
+        pattern: Optional[Pattern] = self._patterns.compile(regex_string)
+        if pattern is None:
+            if verbose:
+                print(f"> {regex_string} is an invalid regex")
+            return 1
+
         if verbose:
             print("> [regex] [test_string] [expected] [actual]")
-        dataset = self.sample_dataset(sample_size)
+        # file-backed datasets are always scored in full, a chunk at a time
+        dataset: Iterable[DatasetRow]
+        if self._data_stream is not None:
+            dataset = chain.from_iterable(self._data_stream.chunks())
+        else:
+            dataset = self.sample_dataset(sample_size)
+
+        # the full dataset is scored once per unique string, adding its weights
+        if dataset is self._dataset and not verbose and not self.is_mapped():
+            excluded: int = ALPHABET.invert(node_set.char_mask()) if node_set else 0
+            weighted: RxWeightedDataset = self.weighted_dataset()
+            return 1 - weighted.count_correct(pattern, excluded) / weighted.total()
+
+        total: int = 0
         for row in dataset:
-            res = check_match(regex_string, row[0])
+            res = pattern.fullmatch(row[0]) is not None
             if res == row[1]:
                 correct += 1
+            total += 1
             if verbose:
                 print("> ", regex_string, row[0], row[1], res)
         if verbose:
@@ -82,22 +271,84 @@ class RxEvolver:
             print(
                 ">> ",
                 correct,
-                len(dataset),
-                correct / len(dataset),
-                1 - correct / len(dataset),
+                total,
+                correct / total,
+                1 - correct / total,
             )
             print()
-        return 1 - correct / len(dataset)
+        return 1 - correct / total
+
+    def score_population(
+        self,
+        node_sets: Sequence[RxNodeSet],
+        chunks: Optional[Iterable[Sequence[DatasetRow]]] = None,
+    ) -> List[float]:
+        """
+        Scores every candidate in `node_sets` as `score_func` does, against
+        `chunks` of rows (by default the chunks of the file-backed dataset, or
+        else the whole dataset). All candidates are evaluated on each chunk before
+        the next is read, so each chunk is read once and only one is held in memory.
+        Memory-mapped datasets are scored in chunks of `SCORE_CHUNK_SIZE` rows.
+        """
+        if chunks is None and self._data_stream is not None:
+            chunks = self._data_stream.chunks()
+        elif chunks is None and self.is_mapped():
+            chunks = (
+                self._dataset[start : start + SCORE_CHUNK_SIZE]
+                for start in range(0, len(self._dataset), SCORE_CHUNK_SIZE)
+            )
+
+        weighted_chunks: Iterable[RxWeightedDataset]
+        if chunks is not None:
+            weighted_chunks = (RxWeightedDataset(chunk) for chunk in chunks)
+        else:
+            weighted_chunks = [self.weighted_dataset()]
+
+        # compile every candidate once, invalid candidates get the worst score
+        patterns: List[Optional[Pattern]] = [
+            self._patterns.compile(node_set.display()) for node_set in node_sets
+        ]
+        excluded: List[int] = [
+            ALPHABET.invert(node_set.char_mask()) if pattern else 0
+            for node_set, pattern in zip(node_sets, patterns)
+        ]
+
+        # duplicate strings within a chunk are only evaluated once
+        correct: List[int] = [0] * len(node_sets)
+        total: int = 0
+        for weighted in weighted_chunks:
+            for i, count in enumerate(weighted.count_correct_all(patterns, excluded)):
+                correct[i] += count
+            total += weighted.total()
+
+        return [
+            1 - count / total if pattern else 1
+            for count, pattern in zip(correct, patterns)
+        ]
 
     def rank_population(
-        self, sample_size: Optional[int] = None, verbose: bool = False
+        self,
+        sample_size: Optional[int] = None,
+        verbose: bool = False,
+        parsimony: float = P_PARSIMONY,
     ) -> RankedPop:
+        """
+        Scores (a sample of) the population, best first. With `parsimony`, each
+        candidate's score is penalized by that much per node for ranking, so that
+        smaller candidates rank above equally accurate ones, but perfect candidates
+        always rank first. The unpenalized scores are returned.
+        """
         population_sample: Sequence[RxNodeSet] = self.sample_population(sample_size)
-        scores: RankedPop = [
-            (self.score_func(node_set, verbose), node_set)
-            for node_set in population_sample
-        ]
-        return sorted(scores, key=lambda s: s[0])
+        if self._data_stream is not None:
+            scores: RankedPop = list(
+                zip(self.score_population(population_sample), population_sample)
+            )
+        else:
+            scores = [
+                (self.score_func(node_set, verbose=verbose), node_set)
+                for node_set in population_sample
+            ]
+        return sorted(scores, key=rank_key(parsimony))
 
     def print_population(self, lim: int = 10) -> None:
         for i in range(len(self._population[:lim])):
@@ -114,36 +365,90 @@ class RxEvolver:
         pnew_upper: float = P_NEW_UPPER,
         pnew_lower: float = P_NEW_LOWER,
         verbose: bool = DISPLAY_MESSAGES,
+        seeds: Optional[Sequence[Seed]] = None,
+        seed_fraction: float = P_SEED,
+        seed_from_data: bool = False,
+        parsimony: float = P_PARSIMONY,
+        max_nodes: int = MAX_NODES,
+        max_depth: int = MAX_DEPTH,
+        steady_state: bool = False,
+        batch_size: int = STEADY_BATCH_SIZE,
+        migrate: Optional[Migration] = None,
+        stop: Optional[Callable[[], bool]] = None,
+        observe: Optional[Observer] = None,
     ) -> RxNodeSet:
+        """
+        Evolves a population of `pop_size` candidates for up to `max_gen`
+        generations, returning the best candidate found. Candidates are kept within
+        `max_nodes` nodes and `max_depth` levels of nesting, and ranked with a
+        `parsimony` penalty per node (see `rank_population`).
+
+        With `steady_state`, the population is instead updated `batch_size`
+        offspring at a time (see `evolve_steady_state`).
+
+        Each generation, `observe` (if given) is called with the generation number
+        and the ranked population, including the final generation. `migrate` is
+        then called with the same arguments, and returns candidates to add to the
+        next generation (eg from another population). Evolution ends early once
+        `stop` returns True.
+        """
+        self._rxnode_set_factory.set_limits(max_nodes, max_depth)
+
+        if seed_from_data:
+            seeds = list(seeds or []) + self.data_seeds()
+        self.generate_population(pop_size, seeds, seed_fraction, mutation_rate)
+        if steady_state:
+            return self.evolve_steady_state(
+                max_gen,
+                batch_size,
+                mutation_rate,
+                crossover_rate,
+                pexp,
+                pnew_upper,
+                pnew_lower,
+                verbose,
+                parsimony,
+                migrate,
+                stop,
+                observe,
+            )
 
-        self.generate_population(pop_size)
         pnew_dec: float = (pnew_upper - pnew_lower) / max_gen
         pnew: float = pnew_upper
 
         for i in range(max_gen):
-            scores: RankedPop = self.rank_population()
+            scores: RankedPop = self.rank_population(parsimony=parsimony)
             if verbose:
                 print(i, round(scores[0][0], 4), scores[0][1].display(), round(pnew, 4))
-            if scores[0][0] == 0:
+            if observe:
+                observe(i, scores)
+            if scores[0][0] == 0 or (stop and stop()):
                 break
 
             new_pop: List[RxNodeSet] = [scores[0][1], scores[1][1]]
+            if migrate:
+                new_pop.extend(migrate(i, scores)[: pop_size - len(new_pop)])
+
+            # decide how many slots are filled at random, then generate them as one batch
+            num_new: int = sum(
+                [1 for _ in range(pop_size - len(new_pop)) if random() < pnew]
+            )
+            new_pop.extend(
+                self._rxnode_set_factory.random_node_sets(num_new, self._prob_extend)
+            )
 
             while len(new_pop) < pop_size:
-                if random() < pnew:
-                    new_pop.append(self._rxnode_set_factory.random_node_set())
-                else:
-                    ixs: List[int] = [
-                        select_index(len(self._population) - 1) for i in range(2)
-                    ]
-                    crossed: RxNodeSet = scores[ixs[0]][1].crossover(
-                        scores[ixs[1]][1], crossover_rate
-                    )
-                    mutated: RxNodeSet = crossed.mutate(mutation_rate)
-                    new_pop.append(mutated)
+                ixs: List[int] = [
+                    select_index(len(self._population) - 1, pexp) for i in range(2)
+                ]
+                crossed: RxNodeSet = scores[ixs[0]][1].crossover(
+                    scores[ixs[1]][1], crossover_rate
+                )
+                mutated: RxNodeSet = crossed.mutate(mutation_rate)
+                new_pop.append(mutated)
 
             if verbose:
-                new_scores: RankedPop = self.rank_population()
+                new_scores: RankedPop = self.rank_population(parsimony=parsimony)
                 for i in range(10):
                     print(
                         "> ", i, round(new_scores[i][0], 4), new_scores[i][1].display()
@@ -162,21 +467,166 @@ class RxEvolver:
                 print()
             self._population = new_pop
             pnew -= pnew_dec
-        print(scores[0][1].display())
+        if verbose:
+            print(scores[0][1].display())
         return scores[0][1]
 
+    def evolve_steady_state(
+        self,
+        max_gen: int = MAX_GEN,
+        batch_size: int = STEADY_BATCH_SIZE,
+        mutation_rate: float = MUTATION_RATE,
+        crossover_rate: float = CROSSOVER_RATE,
+        pexp: float = P_EXP,
+        pnew_upper: float = P_NEW_UPPER,
+        pnew_lower: float = P_NEW_LOWER,
+        verbose: bool = DISPLAY_MESSAGES,
+        parsimony: float = P_PARSIMONY,
+        migrate: Optional[Migration] = None,
+        stop: Optional[Callable[[], bool]] = None,
+        observe: Optional[Observer] = None,
+    ) -> RxNodeSet:
+        """
+        Evolves the current population in steady state, returning the best
+        candidate found. The population is scored once and kept sorted best first.
+        Each step breeds `batch_size` offspring, scores only them, and inserts them
+        in place of the worst members, discarding offspring already in the
+        population. Runs for up to `max_gen` generations' worth of offspring (the
+        population size per generation). `observe`, `migrate` and `stop` are
+        called once per generation's worth, as in `evolve`, and migrants are
+        inserted as offspring.
+        """
+        key: Callable[[RankedNode], Any] = rank_key(parsimony)
+        ranked: List[RankedNode] = sorted(
+            zip(self.score_population(self._population), self._population), key=key
+        )
+        pop_size: int = len(ranked)
+        displays: set = set([node_set.display() for _, node_set in ranked])
+
+        steps_per_gen: int = max(1, pop_size // batch_size)
+        max_steps: int = max_gen * steps_per_gen
+        pnew_dec: float = (pnew_upper - pnew_lower) / max_steps
+        pnew: float = pnew_upper
+
+        for step in range(max_steps):
+            generation: Optional[int] = None
+            if step % steps_per_gen == 0:
+                generation = step // steps_per_gen
+                if verbose:
+                    print(
+                        generation,
+                        round(ranked[0][0], 4),
+                        ranked[0][1].display(),
+                        round(pnew, 4),
+                    )
+                if observe:
+                    observe(generation, ranked)
+            if ranked[0][0] == 0 or (generation is not None and stop and stop()):
+                break
+
+            num_new: int = sum([1 for _ in range(batch_size) if random() < pnew])
+            offspring: List[RxNodeSet] = self._rxnode_set_factory.random_node_sets(
+                num_new, self._prob_extend
+            )
+            while len(offspring) < batch_size:
+                ixs: List[int] = [select_index(pop_size - 1, pexp) for i in range(2)]
+                crossed: RxNodeSet = ranked[ixs[0]][1].crossover(
+                    ranked[ixs[1]][1], crossover_rate
+                )
+                offspring.append(crossed.mutate(mutation_rate))
+            if migrate and generation is not None:
+                offspring.extend(migrate(generation, ranked))
+
+            new: List[RxNodeSet] = []
+            for node_set in offspring:
+                display: str = node_set.display()
+                if display not in displays:
+                    displays.add(display)
+                    new.append(node_set)
+
+            for ranked_node in zip(self.score_population(new), new):
+                insort(ranked, ranked_node, key=key)
+            while len(ranked) > pop_size:
+                displays.discard(ranked.pop()[1].display())
+            pnew -= pnew_dec
+
+        self._population = [node_set for _, node_set in ranked]
+        if verbose:
+            print(ranked[0][1].display())
+        return ranked[0][1]
+
+
+def rank_key(parsimony: float = 0) -> Callable[[RankedNode], Any]:
+    """
+    Returns the sort key ranking scored candidates best first. With `parsimony`,
+    scores are penalized by that much per node, but perfect candidates always
+    rank first.
+    """
+    if parsimony:
+        return lambda ranked: (
+            ranked[0] > 0,
+            ranked[0] + parsimony * ranked[1].size(),
+        )
+    return lambda ranked: ranked[0]
+
+
+class CompiledRxSpec:
+    """
+    An RxSpec built into a node set, along with its display string, compiled
+    verification pattern and (where the regex can be represented as one) its
+    automaton, so that they can be reused for every generated row.
+    """
+
+    def __init__(self, node_set: RxNodeSet) -> None:
+        self.node_set: RxNodeSet = node_set
+        self.regex_string: str = node_set.display()
+        self.pattern: Pattern = re.compile(self.regex_string)
+        self.automaton: Optional[RxAutomaton] = None
+        try:
+            self.automaton = RxAutomaton(node_set)
+        except AutomatonError:
+            pass
+
+    def check_match(self, comparator: str) -> bool:
+        if self.automaton is not None:
+            return self.automaton.accepts(comparator)
+        return self.pattern.fullmatch(comparator) is not None
+
 
 class RxDataGen:
     def __init__(self, settings: Optional[dict] = None) -> None:
         self._rxnode_set_factory: RxNodeSetFactory = RxNodeSetFactory()
         self._settings: Optional[dict] = settings
-        self._dataset: Dataset = []
+        self._dataset: RxDataset = RxDataset()
+        self._compiled_specs: Dict[Hashable, CompiledRxSpec] = {}
+
+    def compile_spec(self, regex: Union[RxSpec, CompiledRxSpec]) -> CompiledRxSpec:
+        """
+        Parses and builds `regex` on first use, returning the cached result after.
+        """
+        if isinstance(regex, CompiledRxSpec):
+            return regex
+
+        key: Hashable = freeze_rxspec(regex)
+        compiled: Optional[CompiledRxSpec] = self._compiled_specs.get(key)
+        if compiled is None:
+            compiled = CompiledRxSpec(self._rxnode_set_factory.make_node_set(regex))
+            self._compiled_specs[key] = compiled
+        return compiled
 
     def export(self) -> Dataset:
         return self._dataset
 
+    def export_weighted(self) -> RxWeightedDataset:
+        """
+        Returns the loaded dataset with identical strings collapsed into unique
+        entries weighted by their number of rows with each label. Strings loaded
+        with both labels are reported by its `conflicts` method.
+        """
+        return RxWeightedDataset(self._dataset)
+
     def reset(self) -> None:
-        self._dataset = []
+        self._dataset = RxDataset()
 
     def apply_settings(self, settings: dict):
         self._settings = settings
@@ -191,30 +641,45 @@ class RxDataGen:
         if not filepath:
             raise ValueError("must provide filepath")
 
-        dataset: Dataset = []
-        with open(filepath, newline="") as f:
-            csvreader = csv.reader(f, delimiter=delimiter, quotechar=quotechar)
-            for row in csvreader:
-                dataset.append((row[0], row[1].strip().lower() in ["true", "t"]))
+        if self._dataset.is_mapped():
+            self._dataset = RxDataset(self._dataset)
 
-        self._dataset.extend(dataset)
+        if is_binary_dataset(filepath):
+            # memory-map the file directly when nothing else has been loaded
+            if not len(self._dataset):
+                self._dataset = RxDataset.open_binary(filepath)
+                return
+            with RxDataset.open_binary(filepath) as rows:
+                self._dataset.extend(rows)
+        else:
+            self._dataset.extend(read_csv_rows(filepath, delimiter, quotechar))
 
     def gen_test_match(
         self,
-        regex: RxSpec,
+        regex: Union[RxSpec, CompiledRxSpec],
         max_tries: int = 10,
     ) -> str:
+        """
+        Returns a string matching `regex`. Where the regex has an automaton, the
+        string is drawn uniformly from the matching strings of a random length and
+        needs no verification. Otherwise the node set is compiled until its output
+        matches, up to `max_tries` times.
+        """
+        compiled: CompiledRxSpec = self.compile_spec(regex)
+        if compiled.automaton is not None:
+            return compiled.automaton.sample()
+
         match_found: bool = False
         count: int = 0
         while not match_found:
 
-            node_set: RxNodeSet = self._rxnode_set_factory.make_node_set(regex)
-            node_regex: str = node_set.display()
-            node_output: Optional[str] = node_set.compile()
-            if node_output and check_match(node_regex, node_output):
+            node_output: Optional[str] = compiled.node_set.compile()
+            if node_output and compiled.check_match(node_output):
                 match_found = True
             if count > max_tries:
-                raise NotFoundError(f"Could not compile match for regex '{node_regex}'")
+                raise NotFoundError(
+                    f"Could not compile match for regex '{compiled.regex_string}'"
+                )
             count += 1
 
         return node_output
@@ -226,7 +691,24 @@ class RxDataGen:
         data_format: Optional[dict] = None,
         char_sets: Optional[Sequence[str]] = None,
     ) -> str:
+        return self.gen_test_no_match_batch(
+            1, prob_alphanum, prob_data_format, data_format, char_sets
+        )[0]
 
+    def gen_test_no_match_batch(
+        self,
+        size: int,
+        prob_alphanum: Optional[float] = None,
+        prob_data_format: Optional[float] = None,
+        data_format: Optional[dict] = None,
+        char_sets: Optional[Sequence[str]] = None,
+    ) -> List[str]:
+        """
+        Generates `size` random (typically non-matching) strings at once. The
+        word lengths and character set of every row are drawn first, then the
+        characters for each character set are drawn in a single bulk call and
+        sliced into words.
+        """
         prob_alphanum = prob_alphanum or 0.5
         prob_data_format = prob_data_format or 0.5
 
@@ -237,45 +719,116 @@ class RxDataGen:
         if not char_sets:
             char_sets = list(CHAR_SETS.keys())
 
-        use_data_format: bool = random() < prob_data_format
-        num_words: int = select_index(MAX_WORDS) + 1
-        if random() < prob_alphanum:
-            char_set_name: str = "alphanum"
-        else:
-            char_set_name = choice(char_sets)
+        format_num_words: Any = data_format.get("num_words", None)
+        format_char_set: Any = data_format.get("char_set", None)
+        format_word_length: Any = data_format.get("word_length", None)
 
-        if use_data_format:
-            num_words = callable_get(data_format.get("num_words", None)) or num_words
-            char_set_name = (
-                callable_get(data_format.get("char_set", None)) or char_set_name
-            )
+        # the character set and word lengths of each row
+        row_char_sets: List[str] = []
+        row_word_lengths: List[List[int]] = []
+        totals: Dict[str, int] = {}
 
-        char_set: str = CHAR_SETS[char_set_name]
-        res: List[str] = []
+        for _ in range(size):
+            use_data_format: bool = random() < prob_data_format
+            num_words: int = select_index(MAX_WORDS) + 1
+            if random() < prob_alphanum:
+                char_set_name: str = "alphanum"
+            else:
+                char_set_name = choice(char_sets)
 
-        for i in range(num_words):
-            num_chars: int = select_index(10) + 1
             if use_data_format:
-                num_chars = (
-                    callable_get(data_format.get("word_length", None), i) or num_chars
-                )
-            res.append("".join([choice(char_set) for i in range(num_chars)]))
+                num_words = callable_get(format_num_words) or num_words
+                char_set_name = callable_get(format_char_set) or char_set_name
+                word_lengths: List[int] = [
+                    callable_get(format_word_length, i) or select_index(10) + 1
+                    for i in range(num_words)
+                ]
+            else:
+                word_lengths = [select_index(10) + 1 for i in range(num_words)]
+
+            row_char_sets.append(char_set_name)
+            row_word_lengths.append(word_lengths)
+            totals[char_set_name] = totals.get(char_set_name, 0) + sum(word_lengths)
 
-        return " ".join(res)
+        pools: Dict[str, str] = {
+            name: "".join(choices(CHAR_SETS[name], k=total))
+            for name, total in totals.items()
+        }
+        offsets: Dict[str, int] = {name: 0 for name in totals}
+
+        res: List[str] = []
+        for char_set_name, word_lengths in zip(row_char_sets, row_word_lengths):
+            pool: str = pools[char_set_name]
+            offset: int = offsets[char_set_name]
+            words: List[str] = []
+            for word_length in word_lengths:
+                words.append(pool[offset : offset + word_length])
+                offset += word_length
+            offsets[char_set_name] = offset
+            res.append(" ".join(words))
+
+        return res
+
+    def gen_test_complement(self, regex: Union[RxSpec, CompiledRxSpec]) -> str:
+        """
+        Returns a string drawn uniformly from the strings (of a random length)
+        that do not match `regex`, by walking the complement of its automaton.
+        """
+        compiled: CompiledRxSpec = self.compile_spec(regex)
+        if compiled.automaton is None:
+            raise NotFoundError(
+                f"Cannot sample the complement of regex '{compiled.regex_string}'"
+            )
+        return compiled.automaton.sample_complement()
+
+    def gen_test_near_miss(self, regex: Union[RxSpec, CompiledRxSpec]) -> str:
+        """
+        Returns a string that does not match `regex`, one edit away from a
+        uniformly sampled match where possible. Misses are checked against the
+        regex's automaton, so need no verification.
+        """
+        compiled: CompiledRxSpec = self.compile_spec(regex)
+        if compiled.automaton is None:
+            raise NotFoundError(
+                f"Cannot generate near misses for regex '{compiled.regex_string}'"
+            )
+
+        try:
+            positive: str = compiled.automaton.sample()
+        except NotFoundError:
+            return compiled.automaton.sample_complement()
+        return compiled.automaton.near_miss(positive)
 
     def gen_test_datum(
         self,
-        regex: RxSpec,
+        regex: Union[RxSpec, CompiledRxSpec],
         data_format: Optional[dict] = None,
         probabilities: Optional[dict] = None,
         char_sets: Optional[Sequence[str]] = None,
     ) -> DatasetRow:
 
-        verification_node_set: RxNodeSet = self._rxnode_set_factory.make_node_set(regex)
+        compiled: CompiledRxSpec = self.compile_spec(regex)
         probabilities = probabilities or {}
 
+        prob_near_miss: float = probabilities.get("near_miss", 0)
+        prob_complement: float = probabilities.get("complement", 0)
+
         if random() < probabilities.get("match", 0.5):
-            res: str = self.gen_test_match(regex)
+            res: str = self.gen_test_match(compiled)
+            if compiled.automaton is not None:
+                return (res, True)
+        elif (
+            compiled.automaton is not None
+            and prob_near_miss
+            and random() < prob_near_miss
+        ):
+            return (self.gen_test_near_miss(compiled), False)
+        elif (
+            compiled.automaton is not None
+            and prob_complement
+            and random() < prob_complement
+        ):
+            return (self.gen_test_complement(compiled), False)
         else:
             res = self.gen_test_no_match(
                 probabilities.get("alphanum"),
@@ -284,9 +837,73 @@ class RxDataGen:
                 char_sets,
             )
 
-        is_match: bool = check_match(verification_node_set.display(), res)
+        is_match: bool = compiled.check_match(res)
         return (res, is_match)
 
+    def gen_test_data_batch(
+        self,
+        regex: Union[RxSpec, CompiledRxSpec],
+        rows: int,
+        data_format: Optional[dict] = None,
+        probabilities: Optional[dict] = None,
+        char_sets: Optional[Sequence[str]] = None,
+    ) -> Dataset:
+        """
+        Generates `rows` test data rows as `gen_test_datum` would, but with the
+        random (typically non-matching) strings generated together by
+        `gen_test_no_match_batch`.
+        """
+        compiled: CompiledRxSpec = self.compile_spec(regex)
+        probabilities = probabilities or {}
+        prob_match: float = probabilities.get("match", 0.5)
+        prob_near_miss: float = 0
+        prob_complement: float = 0
+        if compiled.automaton is not None:
+            prob_near_miss = probabilities.get("near_miss", 0)
+            prob_complement = probabilities.get("complement", 0)
+
+        is_matches: List[bool] = [random() < prob_match for i in range(rows)]
+        is_near_misses: List[bool] = [
+            not is_match and bool(prob_near_miss) and random() < prob_near_miss
+            for is_match in is_matches
+        ]
+        is_complements: List[bool] = [
+            not (is_match or is_near_miss)
+            and bool(prob_complement)
+            and random() < prob_complement
+            for is_match, is_near_miss in zip(is_matches, is_near_misses)
+        ]
+        no_matches: Iterator[str] = iter(
+            self.gen_test_no_match_batch(
+                rows - sum(is_matches) - sum(is_near_misses) - sum(is_complements),
+                probabilities.get("alphanum"),
+                probabilities.get("data_format"),
+                data_format,
+                char_sets,
+            )
+        )
+
+        dataset: Dataset = []
+        for is_match, is_near_miss, is_complement in zip(
+            is_matches, is_near_misses, is_complements
+        ):
+            if is_match:
+                res: str = self.gen_test_match(compiled)
+                if compiled.automaton is not None:
+                    dataset.append((res, True))
+                    continue
+            elif is_near_miss:
+                dataset.append((self.gen_test_near_miss(compiled), False))
+                continue
+            elif is_complement:
+                dataset.append((self.gen_test_complement(compiled), False))
+                continue
+            else:
+                res = next(no_matches)
+            dataset.append((res, compiled.check_match(res)))
+
+        return dataset
+
     def gen_test_data(
         self,
         regex: RxSpec,
@@ -294,21 +911,174 @@ class RxDataGen:
         data_format: Optional[dict] = None,
         probabilities: Optional[dict] = None,
         char_sets: Optional[Sequence[str]] = None,
+        workers: int = 1,
+        seed: Optional[int] = None,
     ) -> Dataset:
-        return [
-            self.gen_test_datum(regex, data_format, probabilities, char_sets=char_sets)
-            for i in range(rows)
-        ]
+        return list(
+            self.iter_test_data(
+                regex, rows, data_format, probabilities, char_sets, workers, seed
+            )
+        )
+
+    def iter_test_data(
+        self,
+        regex: RxSpec,
+        rows: int = 10,
+        data_format: Optional[dict] = None,
+        probabilities: Optional[dict] = None,
+        char_sets: Optional[Sequence[str]] = None,
+        workers: int = 1,
+        seed: Optional[int] = None,
+    ) -> Iterator[DatasetRow]:
+        """
+        Lazily generates `rows` test data rows, in batches of `GEN_CHUNK_SIZE`.
+
+        If `seed` is given or `workers` is greater than 1, rows are generated in
+        chunks of `GEN_CHUNK_SIZE`, each with its own random stream derived from
+        `seed`, so the output is reproducible regardless of the number of workers.
+        With multiple workers the chunks are generated in a process pool and
+        streamed back in order. Callables in `data_format` must then be picklable.
+        """
+        compiled: CompiledRxSpec = self.compile_spec(regex)
+        if workers <= 1 and seed is None:
+            for start in range(0, rows, GEN_CHUNK_SIZE):
+                yield from self.gen_test_data_batch(
+                    compiled,
+                    min(GEN_CHUNK_SIZE, rows - start),
+                    data_format,
+                    probabilities,
+                    char_sets,
+                )
+            return
+
+        if seed is None:
+            seed = getrandbits(64)
+
+        chunks: Iterator[DataChunk] = (
+            (
+                regex,
+                min(GEN_CHUNK_SIZE, rows - start),
+                data_format,
+                probabilities,
+                char_sets,
+                derive_seed(seed, i),
+            )
+            for i, start in enumerate(range(0, rows, GEN_CHUNK_SIZE))
+        )
+
+        if workers <= 1:
+            for chunk in chunks:
+                yield from self.gen_test_data_chunk(chunk)
+            return
+
+        # keep a bounded number of chunks in flight so memory use stays constant
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending: Deque[Future] = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_gen_test_data_chunk, chunk))
+                if len(pending) >= workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def gen_test_data_chunk(self, chunk: DataChunk) -> Dataset:
+        """
+        Generates a chunk of rows from its own seeded random stream, leaving the
+        state of the global random module untouched.
+        """
+        regex, rows, data_format, probabilities, char_sets, chunk_seed = chunk
+        compiled: CompiledRxSpec = self.compile_spec(regex)
+
+        state: tuple = getstate()
+        seed_random(chunk_seed)
+        try:
+            return self.gen_test_data_batch(
+                compiled, rows, data_format, probabilities, char_sets
+            )
+        finally:
+            setstate(state)
+
+    def write_data(
+        self,
+        filepath: str,
+        rows: Optional[Iterable[DatasetRow]] = None,
+        delimiter: str = ",",
+        quotechar: str = "|",
+        batch_size: int = WRITE_BATCH_SIZE,
+        callback: Optional[Callable[[int, float], Any]] = None,
+    ) -> int:
+        """
+        Streams `rows` (or the loaded dataset) to a csv file readable by `load_data`,
+        writing in batches of `batch_size` rows so that memory use stays constant.
+
+        `callback` is called after every batch with the number of rows written so
+        far and the throughput in rows per second.
+
+        Returns the number of rows written.
+        """
+        if rows is None:
+            rows = self._dataset
+
+        written: int = 0
+        start: float = perf_counter()
+        with open(filepath, "w", newline="") as f:
+            csvwriter = csv.writer(f, delimiter=delimiter, quotechar=quotechar)
+            batch: List[Tuple[str, str]] = []
+            for row in rows:
+                batch.append((row[0], "true" if row[1] else "false"))
+                if len(batch) >= batch_size:
+                    csvwriter.writerows(batch)
+                    written += len(batch)
+                    batch = []
+                    if callback:
+                        callback(written, written / (perf_counter() - start))
+            if batch:
+                csvwriter.writerows(batch)
+                written += len(batch)
+                if callback:
+                    callback(written, written / (perf_counter() - start))
+        return written
 
     def generate(self):
         if self._settings:
             return self.gen_test_data(**self._settings)
         return None  # should raise error
 
+    def generate_to_file(
+        self,
+        filepath: str,
+        batch_size: int = WRITE_BATCH_SIZE,
+        callback: Optional[Callable[[int, float], Any]] = None,
+        workers: int = 1,
+        seed: Optional[int] = None,
+    ) -> int:
+        """
+        Streams a dataset generated from the active settings straight to disk.
+        """
+        if not self._settings:
+            raise ValueError("must provide settings")
+        return self.write_data(
+            filepath,
+            self.iter_test_data(**self._settings, workers=workers, seed=seed),
+            batch_size=batch_size,
+            callback=callback,
+        )
+
     def get_pct_data_correct(self) -> float:
         return sum([1 for row in self._dataset if row[1]]) / len(self._dataset)
 
 
+# data generator reused by every chunk generated in a worker process
+_worker_data_gen: Optional[RxDataGen] = None
+
+
+def _gen_test_data_chunk(chunk: DataChunk) -> Dataset:
+    global _worker_data_gen
+    if _worker_data_gen is None:
+        _worker_data_gen = RxDataGen()
+    return _worker_data_gen.gen_test_data_chunk(chunk)
+
+
 if __name__ == "__main__":
     test_data_settings = postcode_test_data_settings(SIZE_DATASET)
     data_gen = RxDataGen(test_data_settings)
@@ -8,3 +8,9 @@ class NotFoundError(Exception):
     """Raised when no valid regex match can be compiled"""
 
     pass
+
+
+class AutomatonError(Exception):
+    """Raised when a regex cannot be represented as a finite automaton"""
+
+    pass
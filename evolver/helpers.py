@@ -1,10 +1,19 @@
 from __future__ import annotations
-from typing import Any, Callable, Union, Optional, Sequence, List, Tuple
+from typing import Any, Callable, Hashable, Union, Optional, Sequence, Dict, List, Tuple
+from collections import OrderedDict
+from types import MappingProxyType
 from math import log
-from random import random, randint, sample
+from random import Random, random, randint, sample
 import csv
 import re
 
+from evolver.config import MAX_RECURSIVE_DEPTH, RANDOM_BLOCK_SIZE
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional, batches fall back to `random.Random`
+    np = None
+
 
 def _d(value: str) -> Callable[[Any], str]:
     return lambda node: value
@@ -23,6 +32,90 @@ def select_index(limit: int, pexp: float = 0.7) -> int:
     return min(int(log(random()) / log(pexp)), limit)
 
 
+def _rebuild(
+    value: Any,
+    sequence_types: tuple,
+    mapping_types: tuple,
+    make_sequence: Callable[[List[Any]], Any],
+    make_mapping: Callable[[Dict[Any, Any]], Any],
+) -> Any:
+    """
+    Returns a copy of nested sequences and mappings rebuilt with `make_sequence`
+    and `make_mapping`. Containers are visited with an explicit stack and rebuilt
+    innermost first, so that deeply nested specs do not hit the recursion limit.
+    """
+    # (container, is_sequence) in depth-first order, parents before children
+    order: List[Tuple[Any, bool]] = []
+    stack: List[Any] = [value]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, sequence_types):
+            order.append((item, True))
+            stack.extend(item)
+        elif isinstance(item, mapping_types):
+            order.append((item, False))
+            stack.extend(item.values())
+    if not order:
+        return value
+
+    # keyed by id, as the containers are not hashable (and stay alive in `order`)
+    rebuilt: Dict[int, Any] = {}
+    get = rebuilt.get
+    for item, is_sequence in reversed(order):
+        if is_sequence:
+            rebuilt[id(item)] = make_sequence([get(id(child), child) for child in item])
+        else:
+            rebuilt[id(item)] = make_mapping(
+                {key: get(id(child), child) for key, child in item.items()}
+            )
+    return rebuilt[id(value)]
+
+
+def freeze_rxspec(rxspec: Any, depth: int = 0) -> Hashable:
+    """
+    Returns a hashable canonical form of an RxSpec, with nested lists as tuples.
+    """
+    if depth > MAX_RECURSIVE_DEPTH:
+        return _rebuild(rxspec, (list, tuple), (), tuple, dict)
+    if isinstance(rxspec, (list, tuple)):
+        return tuple([freeze_rxspec(spec, depth + 1) for spec in rxspec])
+    return rxspec
+
+
+def freeze_node_spec(node_spec: Any, depth: int = 0) -> Any:
+    """
+    Returns a read-only copy of a NodeSpec (or a list of them), with dicts as
+    mapping proxies and lists as tuples, so that cached specs cannot be modified.
+    """
+    if depth > MAX_RECURSIVE_DEPTH:
+        return _rebuild(node_spec, (list, tuple), (dict,), tuple, MappingProxyType)
+    if isinstance(node_spec, (list, tuple)):
+        return tuple([freeze_node_spec(spec, depth + 1) for spec in node_spec])
+    if isinstance(node_spec, dict):
+        return MappingProxyType(
+            {
+                key: freeze_node_spec(value, depth + 1)
+                for key, value in node_spec.items()
+            }
+        )
+    return node_spec
+
+
+def thaw_node_spec(node_spec: Any, depth: int = 0) -> Any:
+    """
+    Returns a mutable copy of a NodeSpec frozen by `freeze_node_spec`.
+    """
+    if depth > MAX_RECURSIVE_DEPTH:
+        return _rebuild(node_spec, (list, tuple), (dict, MappingProxyType), list, dict)
+    if isinstance(node_spec, (list, tuple)):
+        return [thaw_node_spec(spec, depth + 1) for spec in node_spec]
+    if isinstance(node_spec, (dict, MappingProxyType)):
+        return {
+            key: thaw_node_spec(value, depth + 1) for key, value in node_spec.items()
+        }
+    return node_spec
+
+
 def check_match(pattern: str, comparator: str) -> bool:
     m = re.fullmatch(pattern, comparator)
     return m is not None
@@ -40,13 +133,142 @@ def safe_sample(collection: Sequence[Any], size: Optional[int] = None) -> Sequen
     return collection
 
 
+class LRUCache:
+    """
+    A bounded mapping that evicts its least recently used entry once full,
+    keeping count of lookup hits and misses.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize: int = maxsize
+        self.hits: int = 0
+        self.misses: int = 0
+        self._entries: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def info(self) -> Dict[str, Union[int, float]]:
+        lookups: int = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
+
+
+def batch_rng(seed: Optional[int] = None) -> Any:
+    """
+    Returns a dedicated random number generator for drawing batches of values,
+    backed by NumPy when it is available.
+    """
+    if np is not None:
+        return np.random.default_rng(seed)
+    return Random(seed)
+
+
+def uniform_batch(rng: Any, size: int) -> List[float]:
+    """
+    Draws `size` floats in the range [0, 1) from a generator made by `batch_rng`.
+    """
+    if np is not None and isinstance(rng, np.random.Generator):
+        return rng.random(size).tolist()
+    return [rng.random() for _ in range(size)]
+
+
+def index_batch(rng: Any, limit: int, size: int) -> List[int]:
+    """
+    Draws `size` indexes in the range [0, limit) from a generator made by `batch_rng`.
+    """
+    if np is not None and isinstance(rng, np.random.Generator):
+        return rng.integers(0, limit, size).tolist()
+    return [int(rng.random() * limit) for _ in range(size)]
+
+
+def geometric_batch(rng: Any, prob_extend: float, size: int) -> List[int]:
+    """
+    Draws `size` counts of at least 1, where each count is extended by one with
+    probability `prob_extend` (eg the number of nodes in a random node set).
+    """
+    if prob_extend <= 0:
+        return [1] * size
+    if np is not None and isinstance(rng, np.random.Generator):
+        return rng.geometric(1 - prob_extend, size).tolist()
+    return [
+        1 + int(log(1 - value) / log(prob_extend)) for value in uniform_batch(rng, size)
+    ]
+
+
+class BatchRandom:
+    """
+    Draws random values as the `random` module's `random`, `randint` and `choice`
+    do, from uniform floats drawn in blocks of `block_size` from a generator made
+    by `batch_rng`, so that the values are drawn in batches wherever they are used.
+    """
+
+    def __init__(self, rng: Any, block_size: int = RANDOM_BLOCK_SIZE) -> None:
+        self.rng: Any = rng
+        self.block_size: int = block_size
+        self._values: List[float] = []
+        self._index: int = 0
+
+    def random(self) -> float:
+        if self._index >= len(self._values):
+            self._values = uniform_batch(self.rng, self.block_size)
+            self._index = 0
+        self._index += 1
+        return self._values[self._index - 1]
+
+    def randint(self, a: int, b: int) -> int:
+        return a + int(self.random() * (b - a + 1))
+
+    def choice(self, values: Sequence[Any]) -> Any:
+        return values[int(self.random() * len(values))]
+
+
+def derive_seed(seed: int, index: int) -> int:
+    """
+    Derives an independent seed for the `index`th random stream of a master `seed`.
+    """
+    return Random(f"{seed}:{index}").getrandbits(64)
+
+
+def postcode_word_length(i: int) -> int:
+    # module level (rather than a lambda) so that settings can be sent to worker processes
+    return [randint(3, 4), 3][i]
+
+
 def postcode_test_data_settings(rows=10):
     out = {}
     out["rows"] = rows
     out["data_format"] = {}
     out["data_format"]["num_words"] = 2
     out["data_format"]["char_set"] = "printable"
-    out["data_format"]["word_length"] = lambda i: [randint(3, 4), 3][i]
+    out["data_format"]["word_length"] = postcode_word_length
     out["probabilities"] = {}
     out["probabilities"]["data_format"] = 0.5
     out["probabilities"]["alphanum"] = 0.5
@@ -88,4 +310,4 @@ def postcode_test_data_settings(rows=10):
             ],
         ],
     ]
-    return out
\ No newline at end of file
+    return out
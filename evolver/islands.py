@@ -0,0 +1,151 @@
+from concurrent.futures import ProcessPoolExecutor, Future
+from multiprocessing import Manager
+from queue import Empty, Queue
+from random import getrandbits
+from random import seed as seed_random
+from typing import Any, Optional, Sequence, Dict, List
+
+from evolver.evolver import RxEvolver, RankedPop
+from evolver.nodes import RxNodeSet, RxNodeSetFactory
+from evolver.exceptions import InvalidRegexError
+from evolver.helpers import derive_seed
+from evolver.config import ISLANDS, MIGRATION_INTERVAL, MIGRANTS, Dataset
+
+# the best `score` and `regex` found by an island, the `generations` it evolved
+# and the number of `immigrants` it received
+IslandResult = Dict[str, Any]
+
+
+class RxMigration:
+    """
+    Exchanges candidates between islands, as the `migrate` hook of
+    `RxEvolver.evolve`. Every `interval` generations the top `migrants`
+    candidates are sent to `outbox` as regex strings, and the regexes received
+    in `inbox` are parsed back into node sets to join the population. Regexes
+    that cannot be parsed are skipped.
+
+    Used as the `observe` hook as well (see `observe`), it counts the
+    generations evolved.
+    """
+
+    def __init__(
+        self,
+        inbox: Queue,
+        outbox: Queue,
+        node_set_factory: RxNodeSetFactory,
+        interval: int = MIGRATION_INTERVAL,
+        migrants: int = MIGRANTS,
+    ) -> None:
+        self.inbox: Queue = inbox
+        self.outbox: Queue = outbox
+        self.node_set_factory: RxNodeSetFactory = node_set_factory
+        self.interval: int = interval
+        self.migrants: int = migrants
+        self.generations: int = 0
+        self.immigrants: int = 0
+
+    def observe(self, generation: int, scores: RankedPop) -> None:
+        self.generations = generation + 1
+
+    def __call__(self, generation: int, scores: RankedPop) -> List[RxNodeSet]:
+        if not generation or generation % self.interval:
+            return []
+        self.outbox.put([node_set.display() for _, node_set in scores[: self.migrants]])
+        return self.receive()
+
+    def receive(self) -> List[RxNodeSet]:
+        """
+        Returns the node sets parsed from every batch of regexes waiting in the
+        inbox, without blocking.
+        """
+        immigrants: List[RxNodeSet] = []
+        while True:
+            try:
+                regexes: List[str] = self.inbox.get_nowait()
+            except Empty:
+                return immigrants
+            for regex in regexes:
+                try:
+                    immigrants.append(self.node_set_factory.parse_node_set(regex))
+                except InvalidRegexError:
+                    continue
+                self.immigrants += 1
+
+
+def evolve_islands(
+    dataset: Dataset,
+    islands: int = ISLANDS,
+    params: Optional[Sequence[dict]] = None,
+    migration_interval: int = MIGRATION_INTERVAL,
+    migrants: int = MIGRANTS,
+    seed: Optional[int] = None,
+) -> List[IslandResult]:
+    """
+    Evolves `islands` populations for the dataset in parallel, one per process.
+    Each island runs `RxEvolver.evolve` with its own keyword arguments (cycling
+    through `params`) and its own random streams, seeded from `seed`.
+
+    Every `migration_interval` generations, each island sends its top `migrants`
+    candidates to the next island in a ring. Once any island finds a perfect
+    regex, the others stop at their next generation.
+
+    Returns the outcome of each island, in island order: its best `score` and
+    `regex`, the `generations` it evolved and the number of `immigrants` it
+    received.
+    """
+    if seed is None:
+        seed = getrandbits(64)
+    island_params: List[dict] = list(params or [{}])
+
+    with Manager() as manager:
+        inboxes: List[Any] = [manager.Queue() for _ in range(islands)]
+        stop: Any = manager.Event()
+        with ProcessPoolExecutor(max_workers=islands) as executor:
+            futures: List[Future] = [
+                executor.submit(
+                    _evolve_island,
+                    dataset,
+                    island_params[i % len(island_params)],
+                    derive_seed(seed, i),
+                    inboxes[i],
+                    inboxes[(i + 1) % islands],
+                    stop,
+                    migration_interval,
+                    migrants,
+                )
+                for i in range(islands)
+            ]
+            return [future.result() for future in futures]
+
+
+def _evolve_island(
+    dataset: Dataset,
+    params: dict,
+    seed: int,
+    inbox: Queue,
+    outbox: Queue,
+    stop: Any,
+    migration_interval: int,
+    migrants: int,
+) -> IslandResult:
+    seed_random(seed)
+    evolver: RxEvolver = RxEvolver(dataset, seed=seed)
+    migration: RxMigration = RxMigration(
+        inbox, outbox, evolver.node_set_factory(), migration_interval, migrants
+    )
+
+    result: RxNodeSet = evolver.evolve(
+        **{"verbose": False, **params},
+        migrate=migration,
+        stop=stop.is_set,
+        observe=migration.observe,
+    )
+    score: float = evolver.score_func(result)
+    if score == 0:
+        stop.set()
+    return {
+        "score": score,
+        "regex": result.display(),
+        "generations": migration.generations,
+        "immigrants": migration.immigrants,
+    }
@@ -1,10 +1,12 @@
 from __future__ import annotations
-from random import random, randint, sample, choice
+from random import random, randint
+import random as random_module
 from copy import deepcopy
 from typing import (
     Any,
     Union,
     Callable,
+    Hashable,
     Optional,
     Mapping,
     Iterable,
@@ -12,14 +14,33 @@ from typing import (
     Dict,
     List,
     Set,
+    Tuple,
+    Type,
 )
 
 from evolver.exceptions import InvalidRegexError
-from evolver.helpers import first_nested
-from evolver.types import RxTypeSet, RxType, CharSets
+from evolver.helpers import (
+    LRUCache,
+    first_nested,
+    freeze_rxspec,
+    freeze_node_spec,
+    thaw_node_spec,
+    batch_rng,
+    uniform_batch,
+    index_batch,
+    geometric_batch,
+    BatchRandom,
+)
+from evolver.parser import regex_to_nodes
+from evolver.types import RxTypeSet, RxType, CharSets, BitCharSets
 from evolver.wrappers import RxWrapperSet, RxWrapper
+from evolver.wrapper_functions import set_table, node_mask
 from evolver.config import (
     RAND,
+    MAX_VALID_TRIES,
+    MAX_PARSE_CACHE,
+    MAX_NODES,
+    MAX_DEPTH,
     P_MODIFIER,
     P_EXTEND,
     SUPPRESS_ROOT_CHARS,
@@ -47,6 +68,7 @@ class RxNode:
         self.strip_child_mods: bool = wrapper.strip_child_mods
         self.strip_mod: bool = False
         self.char_sets: CharSets = char_sets
+        self.char_table: Optional[str] = None
 
         for child in self.children:
             if self.strip_child_mods:
@@ -101,8 +123,69 @@ class RxNode:
             )
         return res
 
+    def is_zero_width(self) -> bool:
+        """
+        Determines whether the node can only ever match the empty string
+        (eg `\\b`, `x{0}` or an `or` of such nodes).
+        """
+        if self.rxtype.is_type_name("cset*"):
+            return True
+
+        if self.name == "or":
+            return all([child.is_zero_width() for child in self.children])
+
+        modifier: Optional[RxNode] = None if self.strip_mod else self.modifier
+        if modifier and modifier.name in ["count", "count2"]:
+            return all([child.compile() == "0" for child in modifier.children])
+
+        return False
+
+    def size(self) -> int:
+        """
+        Returns the number of nodes in the node's tree, including its modifier.
+        """
+        size: int = 1 + sum([child.size() for child in self.children])
+        if self.modifier:
+            size += self.modifier.size()
+        return size
+
+    def depth(self) -> int:
+        """
+        Returns the depth of the node's nested children, 1 for a node without any.
+        Modifiers are not counted.
+        """
+        return 1 + max([child.depth() for child in self.children], default=0)
+
+    def is_valid(self, recursive: bool = True) -> bool:
+        """
+        Checks the structural constraints that are required for the node to display
+        as a compilable, non-degenerate regex. Cheap enough to be run on every node
+        produced by generation, mutation and crossover.
+
+        The `recursive` parameter can be disabled to skip checking the modifier and
+        children, when they are already known to be valid.
+        """
+        if self.modifier and not self.strip_mod:
+            if self.rxtype.is_type_name("cset*"):
+                return False
+            if recursive and not self.modifier.is_valid():
+                return False
+
+        if self.name in ["set", "!set"]:
+            if not set_table(self, invert=self.name == "!set"):
+                return False
+
+        if self.name == "or":
+            if any([child.is_zero_width() for child in self.children]):
+                return False
+
+        return not recursive or all([child.is_valid() for child in self.children])
+
     def mutate(self, node_factory: RxNodeFactory, prob_change: float) -> RxNode:
-        if random() < prob_change:
+        # nodes with no generatable replacement (eg parsed root characters) are kept
+        if random() < prob_change and node_factory.wrapper_table(
+            self.rxtype.name, self.is_child
+        ):
             return node_factory.make_random_node(
                 type_name=self.rxtype.name, is_child=self.is_child
             )
@@ -113,16 +196,32 @@ class RxNode:
 
             new_node = deepcopy(self)
             new_node.children = new_children
+            new_node.char_table = None
+            for child in new_children:
+                if new_node.strip_child_mods:
+                    child.strip_mod = True
+
+            # keep the original node if mutating its children has invalidated it
+            if new_children and not new_node.is_valid(recursive=False):
+                return deepcopy(self)
             return new_node
 
 
 class RxNodeFactory:
-    def __init__(self, printable_subset: Optional[Iterable[str]] = None) -> None:
+    def __init__(
+        self,
+        printable_subset: Optional[Iterable[str]] = None,
+        char_sets_type: Type[CharSets] = BitCharSets,
+    ) -> None:
         self.omit_types: Set[str] = set()
         self.omit_wrappers: Set[str] = set()
+        self.max_nodes: int = MAX_NODES
+        self.max_depth: int = MAX_DEPTH
         self._rxtypes = RxTypeSet()
-        self._char_sets = CharSets(self._rxtypes)
+        self._char_sets = char_sets_type(self._rxtypes)
         self._rxwrappers = RxWrapperSet(self._char_sets, printable_subset)
+        self._wrapper_tables: Dict[Tuple[str, bool, bool], Tuple[RxWrapper, ...]] = {}
+        self._rxspec_cache: LRUCache = LRUCache(MAX_PARSE_CACHE)
 
     def set_omit(
         self,
@@ -137,6 +236,7 @@ class RxNodeFactory:
         if wrappers and not isinstance(wrappers, set):
             wrappers = set(wrappers)
         self.omit_wrappers = wrappers or set()
+        self._wrapper_tables.clear()
 
     def clear_omit(self, types: bool = False, wrappers: bool = False) -> None:
         if not (types and wrappers):
@@ -146,18 +246,55 @@ class RxNodeFactory:
             self.omit_types.clear()
         if wrappers:
             self.omit_wrappers.clear()
+        self._wrapper_tables.clear()
+
+    def set_limits(
+        self, max_nodes: int = MAX_NODES, max_depth: int = MAX_DEPTH
+    ) -> None:
+        """
+        Sets the maximum size and depth of generated nodes and node sets, which
+        mutation and crossover will not grow candidates beyond.
+        """
+        self.max_nodes = max_nodes
+        self.max_depth = max_depth
+
+    def within_limits(self, node: RxNode) -> bool:
+        # a node without children or a modifier is within any limits
+        if not node.children and not node.modifier:
+            return True
+        return node.size() <= self.max_nodes and node.depth() <= self.max_depth
 
     def parse_rxspec(self, rxspec: RxSpec) -> NodeSpec:
+        return thaw_node_spec(self.parse_rxspec_frozen(rxspec))
+
+    def parse_rxspec_frozen(self, rxspec: RxSpec) -> NodeSpec:
+        """
+        Returns the node spec parsed from `rxspec` as a read-only mapping (see
+        `freeze_node_spec`). Results are kept in a bounded cache keyed by the
+        rxspec's canonical form, so that rxspecs parsed repeatedly are only
+        parsed once.
+        """
+        key: Hashable = freeze_rxspec(rxspec if isinstance(rxspec, list) else [rxspec])
+        node_spec: Optional[NodeSpec] = self._rxspec_cache.get(key)
+        if node_spec is None:
+            node_spec = freeze_node_spec(self._parse_rxspec(rxspec))
+            self._rxspec_cache.put(key, node_spec)
+        return node_spec
+
+    def parse_cache_info(self) -> Dict[str, Union[int, float]]:
+        return self._rxspec_cache.info()
+
+    def _parse_rxspec(self, rxspec: RxSpec) -> NodeSpec:
         if not isinstance(rxspec, list):
             rxspec = [rxspec]
 
         node_spec = {"rw_name": rxspec[0]}
         for spec in rxspec[1:]:
             if self._rxwrappers.wrapper_is_type(first_nested(spec), "mod"):
-                node_spec["modifier"] = self.parse_rxspec(spec)
+                node_spec["modifier"] = self._parse_rxspec(spec)
 
             else:
-                node_spec["children"] = [self.parse_rxspec(child) for child in spec]
+                node_spec["children"] = [self._parse_rxspec(child) for child in spec]
 
         return node_spec
 
@@ -169,8 +306,12 @@ class RxNodeFactory:
         rxwrapper: Optional[RxWrapper] = None,
         is_child: bool = False,
         strict_type_match: bool = False,
+        rng: Any = random_module,
     ) -> RxNode:
         """
+        Random children and modifiers are drawn from `rng`, which provides the
+        `random` module's `random`, `randint` and `choice` (see `BatchRandom`).
+
         children format: [{'rw_name': regex_wrapper_name, 'children': [<children>]})]
         modifier format: {'rw_name': <modifier_name>, 'children': <children>, 'modifier': <modifier>}
         """
@@ -194,11 +335,26 @@ class RxNodeFactory:
                 )
 
                 if rxwrapper.uniform_child_types:
-                    child_types = sample(rxwrapper.child_types, 1)
-                child_nodes = [
-                    self.make_random_node(choice(child_types), is_child=True)
-                    for i in range(rxwrapper.get_child_count())
-                ]
+                    child_types = [rng.choice(child_types)]
+
+                # ranges and counts have their bounds in ascending order
+                is_bounded: bool = rxwrapper.uniform_child_types or (
+                    rxwrapper.rxtype.is_type_name("mod")
+                )
+
+                # regenerate the children until they form a valid node
+                for _ in range(MAX_VALID_TRIES):
+                    child_nodes = [
+                        self.make_random_node(
+                            rng.choice(child_types), is_child=True, rng=rng
+                        )
+                        for i in range(rxwrapper.get_child_count(rng))
+                    ]
+                    if is_bounded:
+                        child_nodes.sort(key=lambda child: child.display())
+                    candidate = RxNode(self._char_sets, rxwrapper, child_nodes)
+                    if candidate.is_valid(recursive=False):
+                        break
             else:
                 for child in children:
                     child_nodes.append(self.make_node(**child, is_child=True))
@@ -221,7 +377,7 @@ class RxNodeFactory:
                 # print(">> ", omit_types)
                 if mod_type not in self.omit_types:
                     modifier_node: RxNode = self.make_random_node(
-                        mod_type, strict_typing=True
+                        mod_type, strict_typing=True, rng=rng
                     )
                     node.set_modifier(modifier_node)
                 # print("-- ", modifier)
@@ -231,13 +387,61 @@ class RxNodeFactory:
 
         return node
 
-    def make_random_node(
+    def make_parsed_node(
+        self,
+        rw_name: str,
+        children: Optional[List[RxNode]] = None,
+        modifier: Optional[RxNode] = None,
+        is_child: bool = False,
+    ) -> RxNode:
+        """
+        Builds a node from a wrapper name and its already built children and
+        modifier, as when a regex string is compiled directly to nodes. Nothing is
+        parsed from node specs or generated at random.
+
+        Raises `InvalidRegexError` if the wrapper does not exist or cannot take the
+        given children or modifier. As with `make_node`, the node itself is not
+        validated (see `RxNode.is_valid`).
+        """
+        try:
+            rxwrapper: RxWrapper = self._rxwrappers[rw_name]
+        except KeyError:
+            raise InvalidRegexError(f"No regex component named '{rw_name}'")
+
+        if children and rxwrapper.child_count == 0:
+            raise InvalidRegexError(f"'{rw_name}' cannot have children")
+        if modifier and not rxwrapper.is_modifiable:
+            raise InvalidRegexError(f"'{rw_name}' cannot be modified")
+
+        node: RxNode = RxNode(self._char_sets, rxwrapper, children, is_child)
+        if modifier:
+            node.set_modifier(modifier)
+        return node
+
+    def wrapper_table(
         self,
         type_name: str = "re",
         is_child: bool = False,
-        prob_modifier: float = P_MODIFIER,
         strict_typing: bool = False,
-    ) -> RxNode:
+    ) -> Tuple[RxWrapper, ...]:
+        """
+        Returns the wrappers that can be generated for a node of type `type_name`,
+        respecting the active omissions. Tables are computed once and cached until
+        the omissions change.
+        """
+        key: Tuple[str, bool, bool] = (type_name, is_child, strict_typing)
+        table: Optional[Tuple[RxWrapper, ...]] = self._wrapper_tables.get(key)
+        if table is None:
+            table = self._filter_wrappers(type_name, is_child, strict_typing)
+            self._wrapper_tables[key] = table
+        return table
+
+    def _filter_wrappers(
+        self,
+        type_name: str,
+        is_child: bool,
+        strict_typing: bool,
+    ) -> Tuple[RxWrapper, ...]:
         rxtype: RxType = self._rxtypes[type_name]
 
         # filter RxWrapper.wrappers with items that match rxtype
@@ -277,22 +481,54 @@ class RxNodeFactory:
                 filter(lambda rxwrapper: rxwrapper.name != omit, filtered_wrappers)
             )
 
-        rxwrapper: RxWrapper = choice(filtered_wrappers)
-        modifier: Optional[int] = None
-        if rxwrapper.is_modifiable and random() < prob_modifier:
-            modifier = RAND
+        return tuple(filtered_wrappers)
 
-        return self.make_node(
-            rxwrapper=rxwrapper,
-            modifier=modifier,
-            is_child=is_child,
+    def make_random_node(
+        self,
+        type_name: str = "re",
+        is_child: bool = False,
+        prob_modifier: float = P_MODIFIER,
+        strict_typing: bool = False,
+        rng: Any = random_module,
+    ) -> RxNode:
+        table: Tuple[RxWrapper, ...] = self.wrapper_table(
+            type_name, is_child, strict_typing
         )
 
+        # pick another wrapper if no valid children (within the size and depth
+        # limits) could be generated for the first
+        for _ in range(MAX_VALID_TRIES):
+            rxwrapper: RxWrapper = rng.choice(table)
+            modifier: Optional[int] = None
+            if rxwrapper.is_modifiable and rng.random() < prob_modifier:
+                modifier = RAND
+
+            node: RxNode = self.make_node(
+                rxwrapper=rxwrapper,
+                modifier=modifier,
+                is_child=is_child,
+                rng=rng,
+            )
+            if node.is_valid(recursive=False) and self.within_limits(node):
+                break
+        return node
+
 
 class RxNodeSet:
     def __init__(self, nodes: List[RxNode], node_factory: RxNodeFactory) -> None:
         self.node_factory: RxNodeFactory = node_factory
-        self.nodes: List = nodes
+        self.nodes = nodes
+
+    @property
+    def nodes(self) -> List[RxNode]:
+        return self._nodes
+
+    @nodes.setter
+    def nodes(self, nodes: List[RxNode]) -> None:
+        # node sets are replaced rather than changed in place by the genetic
+        # operators, so the size only needs counting when `nodes` is assigned
+        self._nodes: List[RxNode] = nodes
+        self._size: int = sum([node.size() for node in nodes])
 
     def __repr__(self) -> str:
         return ", ".join([str(node) for node in self.nodes])
@@ -300,6 +536,49 @@ class RxNodeSet:
     def display(self) -> str:
         return "".join([node.display() for node in self.nodes])
 
+    def is_valid(self) -> bool:
+        return bool(self.nodes) and all([node.is_valid() for node in self.nodes])
+
+    def size(self) -> int:
+        """
+        Returns the total number of nodes (including children and modifiers),
+        counted when `nodes` is assigned.
+        """
+        return self._size
+
+    def depth(self) -> int:
+        return max([node.depth() for node in self.nodes], default=0)
+
+    def within_limits(self) -> bool:
+        return (
+            self.size() <= self.node_factory.max_nodes
+            and self.depth() <= self.node_factory.max_depth
+        )
+
+    def exceeds(self, node_set: RxNodeSet) -> bool:
+        """
+        Determines whether the node set is over the factory's size or depth limit
+        and larger (or deeper) than `node_set`, so is an offspring that should be
+        rejected. Node sets that were already over the limits (eg parsed seeds)
+        can still vary without growing.
+        """
+        return (
+            self.size() > self.node_factory.max_nodes and self.size() > node_set.size()
+        ) or (
+            self.depth() > self.node_factory.max_depth
+            and self.depth() > node_set.depth()
+        )
+
+    def char_mask(self) -> int:
+        """
+        Returns the bitmask (over `ALPHABET`) of every character the regex can
+        consume. Strings containing any other characters cannot be matched.
+        """
+        mask: int = 0
+        for node in self.nodes:
+            mask |= node_mask(node)
+        return mask
+
     def compile(self) -> Optional[str]:
         try:
             return "".join([node.compile() for node in self.nodes])
@@ -324,7 +603,11 @@ class RxNodeSet:
                     + [self.node_factory.make_random_node()]
                     + new_nodes[ix:]
                 )
-        return RxNodeSet(new_nodes, self.node_factory)
+
+        mutated: RxNodeSet = RxNodeSet(new_nodes, self.node_factory)
+        if mutated.exceeds(self):
+            return RxNodeSet([deepcopy(node) for node in self.nodes], self.node_factory)
+        return mutated
 
     def crossover(self, node_set: RxNodeSet, probswap: float) -> RxNodeSet:
         new_nodes: List[RxNode] = self.nodes
@@ -336,12 +619,24 @@ class RxNodeSet:
                 + node_set.nodes[cuts[0] : cuts[1]]
                 + self.nodes[cuts[1] :]
             )
+            # an empty crossover only matches the empty string, and an oversized one
+            # is bloat, so keep the original
+            if not new_nodes or RxNodeSet(new_nodes, self.node_factory).exceeds(self):
+                new_nodes = self.nodes
         return RxNodeSet([deepcopy(node) for node in new_nodes], self.node_factory)
 
 
 class RxNodeSetFactory:
-    def __init__(self, printable_subset: Optional[Iterable[str]] = None) -> None:
-        self.node_factory: RxNodeFactory = RxNodeFactory(printable_subset)
+    def __init__(
+        self,
+        printable_subset: Optional[Iterable[str]] = None,
+        seed: Optional[int] = None,
+        char_sets_type: Type[CharSets] = BitCharSets,
+    ) -> None:
+        self.node_factory: RxNodeFactory = RxNodeFactory(
+            printable_subset, char_sets_type
+        )
+        self._rng: Any = batch_rng(seed)
 
     def set_omit(
         self,
@@ -353,6 +648,11 @@ class RxNodeSetFactory:
     def clear_omit(self, types: bool = False, wrappers: bool = False) -> None:
         self.node_factory.clear_omit(types, wrappers)
 
+    def set_limits(
+        self, max_nodes: int = MAX_NODES, max_depth: int = MAX_DEPTH
+    ) -> None:
+        self.node_factory.set_limits(max_nodes, max_depth)
+
     def make_node_set(self, regex_specification: RxSpec) -> RxNodeSet:
         """
         format: [
@@ -368,7 +668,8 @@ class RxNodeSetFactory:
         """
 
         node_specs: List[NodeSpec] = [
-            self.node_factory.parse_rxspec(rxspec) for rxspec in regex_specification
+            self.node_factory.parse_rxspec_frozen(rxspec)
+            for rxspec in regex_specification
         ]
 
         return RxNodeSet(
@@ -376,8 +677,88 @@ class RxNodeSetFactory:
             self.node_factory,
         )
 
+    def parse_node_set(self, regex_string: str) -> RxNodeSet:
+        """
+        Compiles a regex string directly to a node set bound to the factory,
+        without building intermediate regex or node specifications.
+        """
+        return RxNodeSet(
+            regex_to_nodes(regex_string, self.node_factory), self.node_factory
+        )
+
     def random_node_set(self, prob_extend: float = P_EXTEND) -> RxNodeSet:
         nodes: List[RxNode] = [self.node_factory.make_random_node()]
         while random() < prob_extend:
             nodes.append(self.node_factory.make_random_node())
-        return RxNodeSet(nodes, self.node_factory)
+        return RxNodeSet(
+            limit_nodes(nodes, self.node_factory.max_nodes), self.node_factory
+        )
+
+    def random_node_sets(
+        self,
+        size: int,
+        prob_extend: float = P_EXTEND,
+        prob_modifier: float = P_MODIFIER,
+    ) -> List[RxNodeSet]:
+        """
+        Generates `size` random node sets from the factory's own seeded generator,
+        so that a population can be reproduced from the factory's `seed`.
+
+        The node counts, root wrappers and root modifier decisions are drawn for
+        the whole batch at once, but children and modifiers are still built node
+        by node (drawing from the same generator, see `BatchRandom`). Building the
+        nodes dominates, so this is only slightly faster than calling
+        `random_node_set` repeatedly.
+        """
+        if size <= 0:
+            return []
+
+        table: Tuple[RxWrapper, ...] = self.node_factory.wrapper_table()
+        counts: List[int] = geometric_batch(self._rng, prob_extend, size)
+        total: int = sum(counts)
+        wrapper_ixs: List[int] = index_batch(self._rng, len(table), total)
+        modifier_draws: List[float] = uniform_batch(self._rng, total)
+        rng: BatchRandom = BatchRandom(self._rng)
+
+        nodes: List[RxNode] = []
+        for ix, draw in zip(wrapper_ixs, modifier_draws):
+            rxwrapper: RxWrapper = table[ix]
+            modifier: Optional[int] = None
+            if rxwrapper.is_modifiable and draw < prob_modifier:
+                modifier = RAND
+            node: RxNode = self.node_factory.make_node(
+                rxwrapper=rxwrapper, modifier=modifier, rng=rng
+            )
+            if not (
+                node.is_valid(recursive=False) and self.node_factory.within_limits(node)
+            ):
+                node = self.node_factory.make_random_node(rng=rng)
+            nodes.append(node)
+
+        # node sets over the size limit are cut short
+        node_sets: List[RxNodeSet] = []
+        start: int = 0
+        for count in counts:
+            node_sets.append(
+                RxNodeSet(
+                    limit_nodes(
+                        nodes[start : start + count], self.node_factory.max_nodes
+                    ),
+                    self.node_factory,
+                )
+            )
+            start += count
+        return node_sets
+
+
+def limit_nodes(nodes: List[RxNode], max_nodes: int) -> List[RxNode]:
+    """
+    Returns the longest prefix of `nodes` (but at least the first node) with no
+    more than `max_nodes` nodes in total, including children and modifiers.
+    """
+    size: int = 0
+    for i, node in enumerate(nodes):
+        size += node.size()
+        if size > max_nodes:
+            return nodes[: max(i, 1)]
+    return nodes
@@ -1,5 +1,11 @@
-from evolver.config import CHAR_SETS
-from evolver.helpers import first_nested
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
+
+from evolver.config import CHAR_SETS, MAX_PARSE_CACHE
+from evolver.exceptions import InvalidRegexError
+from evolver.helpers import LRUCache, first_nested, freeze_node_spec, thaw_node_spec
+
+if TYPE_CHECKING:
+    from evolver.nodes import RxNode, RxNodeFactory
 
 ESCAPE = "\\"
 NAME = 0
@@ -8,7 +14,6 @@ CHILDREN = 2
 KIND = 0
 LEVEL = 1
 VALUE = 2
-SKIP = 1
 
 csets = {
     "A": "start",
@@ -25,6 +30,8 @@ csets = {
 metas = {
     ".": "wildcard",
 }
+class_escapes = "bBdDsSwW"
+range_sets = ["digit", "alpha_upper", "alpha_lower"]
 mods = {
     "?": "0/1",
     "*": "0+",
@@ -46,138 +53,204 @@ def get_literal(char):
 
 
 def extract_symbols(regex_string, level=0):
+    """
+    Tokenizes a regex string into a flat list of `(kind, level, value)` symbols,
+    returning them along with the index after the closing bracket of the outermost
+    group (or -1 if the string ends first).
+
+    The string is scanned once by a single cursor shared by every group, and all
+    groups append their symbols to one list, so the time taken is linear in the
+    length of the regex regardless of how deeply it is grouped. Groups that are
+    never closed, and groups opened after unbalanced `]` or `}` brackets, raise
+    an `InvalidRegexError` rather than being scanned again.
+    """
+    shift = 0
+    if level == 0:
+        regex_string = f"({regex_string})"
+        shift = 1
+
+    symbols = []
+    end = _extract_group(regex_string, 0, level, symbols, shift)
+    return [symbol for symbol in symbols if symbol is not None], end
+
+
+def _segment_index(symbols, segment_start, position):
+    """
+    Returns the index in `symbols` of the `position`th (negative, from the end)
+    symbol of the current alternation segment, skipping unfilled group markers.
+    """
+    i = len(symbols)
+    while position < 0:
+        i -= 1
+        if i < segment_start:
+            raise IndexError("list index out of range")
+        if symbols[i] is not None:
+            position += 1
+    return i
+
+
+def _extract_group(regex_string, i, level, symbols, shift=0):
+    """
+    Appends the symbols of the group starting at index `i` to `symbols`, returning
+    the index after its closing bracket, or -1 if the string ends first. `shift`
+    is the number of brackets wrapped around the regex, to report errors at
+    their positions in the original regex.
+
+    Slots are reserved for the group's marker (`group` or `or`) and for the
+    marker of its first alternative, and are filled once the group is closed.
+    Slots left unfilled stay `None`, and are removed by `extract_symbols`.
+    """
     is_inverted = False
     is_escaped = False
     is_count = False
     is_mod = False
     is_set = False
-    or_groups = []
-    symbols = []
-    skips = []
+    is_or = False
 
-    if level == 0:
-        regex_string = f"({regex_string})"
+    group_index = len(symbols)
+    marker_index = group_index + 1
+    symbols.extend([None, None])
+    segment_start = len(symbols)
 
-    for i in range(len(regex_string)):
+    while i < len(regex_string):
         c = regex_string[i]
 
-        if skips:
-            skips.pop()
-        else:
-            if c not in mods and is_mod:
-                is_mod = False
-
-            if is_escaped:
-                if c in csets:
-                    symbols.append(("RE", level, [csets[c], None, []]))
-                elif c in CHAR_SETS["digit"]:
-                    symbols.append(("RE", level, [f"#match({c})", None, []]))
-                elif c in CHAR_SETS["meta"]:
-                    symbols.append(("RE", level, [f"printable({c})", None, []]))
-
-                is_escaped = False
-
-            elif c in metas:
-                symbols.append(("RE", level, [metas[c], None, []]))
-
-            elif c == "|":
-                or_groups.append(("RE", level - 0.5, ["group", None, []]))
-                or_groups.extend(symbols)
-                symbols = []
-
-            elif c == "(":
-                group, offset = extract_symbols(regex_string[i + 1 :], level + 1)
-                symbols.extend(group)
-                for i in range(offset):
-                    skips.append(SKIP)
-
-            elif c == ")":
-                if or_groups:
-                    or_groups.append(("RE", level - 0.5, ["group", None, []]))
-                    or_groups.extend(symbols)
-                    return [("RE", level - 1, ["or", None, []])] + or_groups, i + 1
-                else:
-                    return [("RE", level - 1, ["group", None, []])] + symbols, i + 1
-
-            elif c in set(["[", "{"]):
-                if c == "[":
-                    if regex_string[i + 1] == "^":
-                        symbols.append(("RE", level, ["!set", None, []]))
-                        skips.append(SKIP)
-                    else:
-                        symbols.append(("RE", level, ["set", None, []]))
-                    is_set = True
-
-                elif c == "{":
-                    symbols.append(("MOD", level, ["count", None, []]))
-                    is_count = True
-                level += 1
-
-            elif c in set(["]", "}"]):
-                if c == "]":
-                    is_set = False
-                if c == "}":
-                    is_count = False
-                    is_mod = True
-                level -= 1
-
-            elif is_set:
-                if c == "-":
-                    if (
-                        regex_string[i - 1] in CHAR_SETS["alphanum"]
-                        and regex_string[i + 1] in CHAR_SETS["alphanum"]
-                    ):
-                        symbols.pop()
-                        symbols.extend(
-                            [
-                                ("RE", level, ["range", None, []]),
-                                (
-                                    "RE",
-                                    level + 1,
-                                    [get_literal(regex_string[i - 1]), None, []],
-                                ),
-                                (
-                                    "RE",
-                                    level + 1,
-                                    [get_literal(regex_string[i + 1]), None, []],
-                                ),
-                            ]
-                        )
-                        skips.append(SKIP)
-                    elif regex_string[i + 1] not in CHAR_SETS["alphanum"]:
-                        raise ValueError("invalid hyphen literal placement in set")
-
-                else:
-                    symbols.append(("RE", level, [get_literal(c), None, []]))
-
-            elif is_count:
-                if c == ",":
-                    assert symbols[-2][VALUE][NAME] == "count"
-                    symbols[-2][VALUE][NAME] = "count2"
-                elif c in CHAR_SETS["digit"]:
-                    symbols.append(("RE", level, [f"int({c})", None, []]))
+        if c not in mods and is_mod:
+            is_mod = False
+
+        if is_escaped:
+            if c in csets:
+                symbols.append(("RE", level, [csets[c], None, []]))
+            elif c in CHAR_SETS["digit"]:
+                symbols.append(("RE", level, [f"#match({c})", None, []]))
+            elif c in CHAR_SETS["meta"]:
+                symbols.append(("RE", level, [f"printable({c})", None, []]))
+
+            is_escaped = False
+
+        elif c in metas:
+            symbols.append(("RE", level, [metas[c], None, []]))
+
+        elif c == "|":
+            # each alternative is preceded by a group marker, leveled at its end
+            symbols[marker_index] = ("RE", level - 0.5, ["group", None, []])
+            marker_index = len(symbols)
+            symbols.append(None)
+            segment_start = len(symbols)
+            is_or = True
+
+        elif c == "(":
+            # both would have to be tokenized again from the bracket onwards
+            if level + 1 == 0:
+                raise _regex_error(
+                    _unshifted(regex_string, shift),
+                    i - shift,
+                    "Group below the top level",
+                )
+
+            end = _extract_group(regex_string, i + 1, level + 1, symbols, shift)
+            if end < 0:
+                raise _regex_error(
+                    _unshifted(regex_string, shift), i - shift, "Unbalanced '('"
+                )
+            i = end
+            continue
+
+        elif c == ")":
+            if is_or:
+                symbols[marker_index] = ("RE", level - 0.5, ["group", None, []])
+                symbols[group_index] = ("RE", level - 1, ["or", None, []])
+            else:
+                symbols[group_index] = ("RE", level - 1, ["group", None, []])
+            return i + 1
+
+        elif c in set(["[", "{"]):
+            if c == "[":
+                if regex_string[i + 1] == "^":
+                    symbols.append(("RE", level, ["!set", None, []]))
+                    i += 1
                 else:
-                    raise ValueError(f"invalid value '{c}' in count parameters")
+                    symbols.append(("RE", level, ["set", None, []]))
+                is_set = True
+
+            elif c == "{":
+                symbols.append(("MOD", level, ["count", None, []]))
+                is_count = True
+            level += 1
+
+        elif c in set(["]", "}"]):
+            if c == "]":
+                is_set = False
+            if c == "}":
+                is_count = False
+                is_mod = True
+            level -= 1
+
+        elif is_set:
+            if c == "-":
+                if (
+                    regex_string[i - 1] in CHAR_SETS["alphanum"]
+                    and regex_string[i + 1] in CHAR_SETS["alphanum"]
+                ):
+                    del symbols[_segment_index(symbols, segment_start, -1)]
+                    symbols.extend(
+                        [
+                            ("RE", level, ["range", None, []]),
+                            (
+                                "RE",
+                                level + 1,
+                                [get_literal(regex_string[i - 1]), None, []],
+                            ),
+                            (
+                                "RE",
+                                level + 1,
+                                [get_literal(regex_string[i + 1]), None, []],
+                            ),
+                        ]
+                    )
+                    i += 1
+                elif regex_string[i + 1] not in CHAR_SETS["alphanum"]:
+                    raise ValueError("invalid hyphen literal placement in set")
 
-            elif c in mods:
-                if is_mod:
-                    if c == "?":
-                        symbols.append(("MOD", level, ["greedy", None, []]))
-                        is_mod = False
-                    else:
-                        raise ValueError(f"cannot modify a modifier with'{c}'")
+            else:
+                symbols.append(("RE", level, [get_literal(c), None, []]))
+
+        elif is_count:
+            if c == ",":
+                count = symbols[_segment_index(symbols, segment_start, -2)]
+                assert count[VALUE][NAME] == "count"
+                count[VALUE][NAME] = "count2"
+            elif c in CHAR_SETS["digit"]:
+                symbols.append(("RE", level, [f"int({c})", None, []]))
+            else:
+                raise ValueError(f"invalid value '{c}' in count parameters")
 
+        elif c in mods:
+            if is_mod:
+                if c == "?":
+                    symbols.append(("MOD", level, ["greedy", None, []]))
+                    is_mod = False
                 else:
-                    symbols.append(("MOD", level, [mods[c], None, []]))
-                    is_mod = True
+                    raise ValueError(f"cannot modify a modifier with'{c}'")
 
             else:
-                is_escaped = False
-                if c == "\\":
-                    is_escaped = True
-                else:
-                    symbols.append(("RE", level, [get_literal(c), None, []]))
-    return symbols, -1
+                symbols.append(("MOD", level, [mods[c], None, []]))
+                is_mod = True
+
+        else:
+            is_escaped = False
+            if c == "\\":
+                is_escaped = True
+            else:
+                symbols.append(("RE", level, [get_literal(c), None, []]))
+
+        i += 1
+
+    # an unclosed group only keeps the symbols of its final alternative
+    symbols[group_index] = None
+    symbols[group_index + 1] = None
+    del symbols[group_index + 2 : segment_start]
+    return -1
 
 
 def construct_rxspec(symbols):
@@ -242,7 +315,250 @@ def parse_rxspec(rxspec):
     return node_spec
 
 
+_parse_cache = LRUCache(MAX_PARSE_CACHE)
+
+
 def parse_regex(regex_string):
-    symbols, _ = extract_symbols(regex_string)
-    rxspec = construct_rxspec(symbols)
-    return [parse_rxspec(spec) for spec in rxspec]
+    return thaw_node_spec(parse_regex_frozen(regex_string))
+
+
+def parse_regex_frozen(regex_string):
+    """
+    Returns the node specs parsed from `regex_string` as a read-only tuple (see
+    `freeze_node_spec`). Results are kept in a bounded cache keyed by the regex
+    string, so that regexes parsed repeatedly are only parsed once.
+    """
+    node_specs = _parse_cache.get(regex_string)
+    if node_specs is None:
+        symbols, _ = extract_symbols(regex_string)
+        rxspec = construct_rxspec(symbols)
+        node_specs = freeze_node_spec([parse_rxspec(spec) for spec in rxspec])
+        _parse_cache.put(regex_string, node_specs)
+    return node_specs
+
+
+def parse_cache_info() -> Dict[str, Union[int, float]]:
+    return _parse_cache.info()
+
+
+def clear_parse_cache() -> None:
+    _parse_cache.clear()
+
+
+def regex_to_nodes(regex_string: str, node_factory: "RxNodeFactory") -> List["RxNode"]:
+    """
+    Compiles a regex string directly to nodes made by `node_factory`, in a single
+    pass with one cursor and without building intermediate symbols or specs.
+
+    Only regexes that nodes can represent are supported: groups must be
+    alternations of single components (nested to the right when there are more
+    than two), and counts take single digits. Anything else (eg anchors,
+    backreferences or plain groups) raises `InvalidRegexError`.
+    """
+    branches, i = _compile_branches(regex_string, 0, node_factory)
+    if i < len(regex_string):
+        raise _regex_error(regex_string, i, "Unbalanced ')'")
+    if len(branches) > 1:
+        children = _or_children(regex_string, i, branches, node_factory)
+        return [node_factory.make_parsed_node("or", children)]
+    if not branches[0]:
+        raise _regex_error(regex_string, i, "Empty regex")
+    return branches[0]
+
+
+def _regex_error(regex_string: str, i: int, message: str) -> InvalidRegexError:
+    return InvalidRegexError(f"{message} at {i} in {regex_string!r}")
+
+
+def _unshifted(regex_string: str, shift: int) -> str:
+    # only sliced when raising, so that tokenizing stays linear
+    return regex_string[shift : len(regex_string) - shift]
+
+
+def _compile_branches(
+    regex_string: str, i: int, node_factory: "RxNodeFactory"
+) -> Tuple[List[List["RxNode"]], int]:
+    """
+    Compiles the `|` separated branches starting at index `i`, up to the end of
+    the string or an unmatched `)`, returning them with the index reached.
+    """
+    branches: List[List["RxNode"]] = [[]]
+    while i < len(regex_string):
+        c = regex_string[i]
+        if c == ")":
+            break
+        if c == "|":
+            branches.append([])
+            i += 1
+            continue
+
+        rw_name, children, i = _compile_atom(regex_string, i, node_factory)
+        modifier, i = _compile_modifier(regex_string, i, node_factory)
+        branches[-1].append(node_factory.make_parsed_node(rw_name, children, modifier))
+    return branches, i
+
+
+def _or_children(
+    regex_string: str,
+    i: int,
+    branches: List[List["RxNode"]],
+    node_factory: "RxNodeFactory",
+) -> List["RxNode"]:
+    """
+    Returns the two children of an `or` node over branches of single components,
+    nesting further `or` nodes to the right for more than two branches.
+    """
+    for branch in branches:
+        if len(branch) != 1:
+            raise _regex_error(
+                regex_string, i, "Alternatives must be single components"
+            )
+        branch[0].is_child = True
+
+    children = [branches[-2][0], branches[-1][0]]
+    for branch in reversed(branches[:-2]):
+        nested = node_factory.make_parsed_node("or", children, is_child=True)
+        children = [branch[0], nested]
+    return children
+
+
+def _compile_atom(
+    regex_string: str, i: int, node_factory: "RxNodeFactory"
+) -> Tuple[str, List["RxNode"], int]:
+    """
+    Compiles the component starting at index `i`, returning its wrapper name,
+    its children and the index after it.
+    """
+    c = regex_string[i]
+    if c == "(":
+        if regex_string.startswith("(?", i):
+            raise _regex_error(regex_string, i, "Unsupported group extension")
+        branches, end = _compile_branches(regex_string, i + 1, node_factory)
+        if end >= len(regex_string):
+            raise _regex_error(regex_string, i, "Unbalanced '('")
+        if len(branches) < 2:
+            raise _regex_error(regex_string, i, "Groups must be alternations")
+        return "or", _or_children(regex_string, i, branches, node_factory), end + 1
+
+    if c == "[":
+        return _compile_set(regex_string, i + 1, node_factory)
+
+    if c == "\\":
+        return _compile_escape(regex_string, i, class_escapes), [], i + 2
+
+    if c in metas:
+        return metas[c], [], i + 1
+
+    if c in "^$":
+        raise _regex_error(regex_string, i, "Unsupported anchor")
+    if c in "*+?{":
+        raise _regex_error(regex_string, i, "Nothing to repeat")
+    return get_literal(c), [], i + 1
+
+
+def _compile_escape(regex_string: str, i: int, classes: str) -> str:
+    """
+    Returns the wrapper name of the escape sequence at index `i`, which may be
+    one of the character `classes` or an escaped punctuation character.
+    """
+    if i + 1 >= len(regex_string):
+        raise _regex_error(regex_string, i, "Trailing escape")
+
+    c = regex_string[i + 1]
+    if c in classes:
+        return csets[c]
+    if c in CHAR_SETS["meta"] or c in CHAR_SETS["punctuation"]:
+        return get_literal(c)
+    raise _regex_error(regex_string, i, f"Unsupported escape '\\{c}'")
+
+
+def _compile_set(
+    regex_string: str, i: int, node_factory: "RxNodeFactory"
+) -> Tuple[str, List["RxNode"], int]:
+    """
+    Compiles the set whose contents start at index `i`, returning its wrapper name,
+    its children and the index after its closing bracket.
+    """
+    rw_name = "set"
+    if regex_string.startswith("^", i):
+        rw_name = "!set"
+        i += 1
+
+    children: List["RxNode"] = []
+    while True:
+        if i >= len(regex_string):
+            raise _regex_error(regex_string, i, "Unbalanced '['")
+
+        c = regex_string[i]
+        if c == "]" and children:
+            return rw_name, children, i + 1
+
+        if c == "\\":
+            child_name = _compile_escape(regex_string, i, class_escapes[2:])
+            c = regex_string[i + 1]
+            i += 2
+        else:
+            child_name = get_literal(c)
+            i += 1
+
+        # a hyphen between two characters (rather than before the end) is a range
+        if not regex_string.startswith("-", i) or regex_string.startswith("]", i + 1):
+            children.append(node_factory.make_parsed_node(child_name, is_child=True))
+            continue
+
+        end = regex_string[i + 1 : i + 2]
+        if child_name in csets.values() or not any(
+            [c in CHAR_SETS[key] and end in CHAR_SETS[key] for key in range_sets]
+        ):
+            raise _regex_error(regex_string, i, "Unsupported range")
+        if end < c:
+            raise _regex_error(regex_string, i, "Reversed range")
+
+        bounds = [
+            node_factory.make_parsed_node(get_literal(bound), is_child=True)
+            for bound in (c, end)
+        ]
+        children.append(node_factory.make_parsed_node("range", bounds, is_child=True))
+        i += 2
+
+
+def _compile_modifier(
+    regex_string: str, i: int, node_factory: "RxNodeFactory"
+) -> Tuple[Optional["RxNode"], int]:
+    """
+    Compiles the modifier (if any) starting at index `i`, returning it with the
+    index after it.
+    """
+    if i >= len(regex_string) or regex_string[i] not in "*+?{":
+        return None, i
+
+    c = regex_string[i]
+    if c == "{":
+        end = regex_string.find("}", i)
+        counts = regex_string[i + 1 : end].split(",") if end > 0 else []
+        if len(counts) not in (1, 2) or not all(
+            [len(count) == 1 and count in CHAR_SETS["digit"] for count in counts]
+        ):
+            raise _regex_error(regex_string, i, "Unsupported count")
+        if counts != sorted(counts):
+            raise _regex_error(regex_string, i, "Reversed count")
+
+        modifier = node_factory.make_parsed_node(
+            "count" if len(counts) == 1 else "count2",
+            [
+                node_factory.make_parsed_node(f"int({count})", is_child=True)
+                for count in counts
+            ],
+        )
+        i = end + 1
+    else:
+        modifier = node_factory.make_parsed_node(mods[c])
+        i += 1
+
+    if regex_string.startswith("?", i):
+        modifier.set_modifier(node_factory.make_parsed_node("!greedy"))
+        i += 1
+
+    if i < len(regex_string) and regex_string[i] in "*+?{":
+        raise _regex_error(regex_string, i, "Multiple repeat")
+    return modifier, i
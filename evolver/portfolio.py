@@ -0,0 +1,209 @@
+from concurrent.futures import ProcessPoolExecutor, Future, FIRST_COMPLETED, wait
+from multiprocessing import Manager
+from queue import Empty, Queue
+from random import random, getrandbits
+from random import seed as seed_random
+from time import perf_counter
+from typing import Any, Callable, Optional, Sequence, Union, Dict, List, Set, Tuple
+import json
+
+from evolver.evolver import RxEvolver, RankedPop
+from evolver.nodes import RxNodeSet
+from evolver.helpers import derive_seed
+from evolver.config import PORTFOLIO_SIZE, PROGRESS_INTERVAL, Dataset
+
+# (configuration index, generation, best score, best regex)
+Progress = Tuple[int, int, float, str]
+
+# seconds to wait for an evolution to finish before reporting progress again
+POLL_INTERVAL: float = 0.1
+
+
+def gen_random_params() -> dict:
+    """
+    Returns random `RxEvolver.evolve` parameters, with the proportion of random
+    candidates decreasing (from `pnew_upper` to `pnew_lower`) over generations.
+    """
+    pnew: List[float] = sorted([random(), random()])
+    return {
+        "mutation_rate": random(),
+        "crossover_rate": random(),
+        "pexp": random(),
+        "pnew_upper": pnew[1],
+        "pnew_lower": pnew[0],
+    }
+
+
+class RxProgress:
+    """
+    Reports an evolution's best candidate to a queue every `interval`
+    generations, as the `observe` hook of `RxEvolver.evolve`. Every generation
+    is counted.
+    """
+
+    def __init__(
+        self, queue: Queue, index: int, interval: int = PROGRESS_INTERVAL
+    ) -> None:
+        self.queue: Queue = queue
+        self.index: int = index
+        self.interval: int = interval
+        self.generations: int = 0
+
+    def __call__(self, generation: int, scores: RankedPop) -> None:
+        self.generations = generation + 1
+        if generation % self.interval == 0:
+            score, node_set = scores[0]
+            self.queue.put((self.index, generation, score, node_set.display()))
+
+
+def race_portfolio(
+    dataset: Dataset,
+    configs: Union[int, Sequence[dict]] = PORTFOLIO_SIZE,
+    params: Optional[dict] = None,
+    workers: Optional[int] = None,
+    seed: Optional[int] = None,
+    on_progress: Optional[Callable[[Progress], None]] = None,
+    progress_interval: int = PROGRESS_INTERVAL,
+    record_path: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Races differently configured evolutions of the dataset in a pool of
+    `workers` processes (by default, one per configuration). `configs` is either
+    the `RxEvolver.evolve` parameters of each configuration, or a number of
+    configurations to draw with `gen_random_params`. `params` are shared by
+    every configuration (eg `pop_size` and `max_gen`), and each evolution gets
+    its own random seed derived from `seed`.
+
+    Progress reports are passed to `on_progress` as they arrive. Once one
+    configuration finds a perfect regex, the others stop at their next
+    generation and those not yet started are cancelled.
+
+    Returns the outcome of each configuration, in order: its `params`, best
+    `score` and `regex` (None if cancelled), `generations`, `seconds` and
+    whether it `won` (was the first to find a perfect regex). With
+    `record_path`, the winning configuration is appended to that file as a
+    JSON line.
+    """
+    if seed is None:
+        seed = getrandbits(64)
+    if isinstance(configs, int):
+        configs = [gen_random_params() for _ in range(configs)]
+
+    results: List[Dict[str, Any]] = [
+        {
+            "params": config,
+            "score": None,
+            "regex": None,
+            "generations": 0,
+            "seconds": 0,
+            "won": False,
+        }
+        for config in configs
+    ]
+    winner: Optional[int] = None
+
+    with Manager() as manager:
+        progress: Any = manager.Queue()
+        stop: Any = manager.Event()
+        with ProcessPoolExecutor(max_workers=workers or len(configs)) as executor:
+            futures: Dict[Future, int] = {
+                executor.submit(
+                    _race,
+                    i,
+                    dataset,
+                    {**(params or {}), **config},
+                    derive_seed(seed, i),
+                    progress,
+                    stop,
+                    progress_interval,
+                ): i
+                for i, config in enumerate(configs)
+            }
+
+            pending: Set[Future] = set(futures)
+            while pending:
+                done, pending = wait(
+                    pending, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED
+                )
+                _drain(progress, on_progress)
+
+                # evolutions finishing in the same poll are ordered by their time
+                finished: List[Tuple[int, Dict[str, Any]]] = sorted(
+                    [
+                        (futures[future], future.result())
+                        for future in done
+                        if not future.cancelled()
+                    ],
+                    key=lambda finish: finish[1]["seconds"],
+                )
+                for i, outcome in finished:
+                    results[i].update(outcome)
+                    if winner is None and outcome["score"] == 0:
+                        winner = i
+                        results[i]["won"] = True
+                        stop.set()
+                        for future in pending:
+                            future.cancel()
+            _drain(progress, on_progress)
+
+    if record_path and winner is not None:
+        record_winner(record_path, results[winner])
+    return results
+
+
+def record_winner(path: str, result: Dict[str, Any]) -> None:
+    """
+    Appends a winning configuration and its time to solution to a JSON lines
+    file, so that the settings that win can be compared across runs.
+    """
+    with open(path, "a") as file:
+        file.write(
+            json.dumps(
+                {
+                    "params": result["params"],
+                    "regex": result["regex"],
+                    "generations": result["generations"],
+                    "seconds": result["seconds"],
+                },
+                default=str,
+            )
+            + "\n"
+        )
+
+
+def _drain(queue: Queue, on_progress: Optional[Callable[[Progress], None]]) -> None:
+    while True:
+        try:
+            report: Progress = queue.get_nowait()
+        except Empty:
+            return
+        if on_progress:
+            on_progress(report)
+
+
+def _race(
+    index: int,
+    dataset: Dataset,
+    params: dict,
+    seed: int,
+    queue: Queue,
+    stop: Any,
+    progress_interval: int,
+) -> Dict[str, Any]:
+    seed_random(seed)
+    start: float = perf_counter()
+    evolver: RxEvolver = RxEvolver(dataset, seed=seed)
+    progress: RxProgress = RxProgress(queue, index, progress_interval)
+
+    result: RxNodeSet = evolver.evolve(
+        **{"verbose": False, **params}, observe=progress, stop=stop.is_set
+    )
+    score: float = evolver.score_func(result)
+    if score == 0:
+        stop.set()
+    return {
+        "score": score,
+        "regex": result.display(),
+        "generations": progress.generations,
+        "seconds": perf_counter() - start,
+    }
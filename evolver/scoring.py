@@ -0,0 +1,60 @@
+from typing import Optional, Pattern, Dict
+from collections import Counter
+import re
+
+from evolver.helpers import LRUCache
+from evolver.types import Alphabet, ALPHABET
+from evolver.config import MAX_INVALID_CACHE
+
+
+def string_mask(string: str, alphabet: Alphabet = ALPHABET) -> Optional[int]:
+    """
+    Returns the bitmask of the characters in `string`, or None if any of them
+    are outside of the alphabet.
+    """
+    return alphabet.mask(string) if alphabet.covers(string) else None
+
+
+class RxPatternCache:
+    """
+    Compiles candidate regex strings for scoring.
+
+    Strings that fail to compile are remembered in a bounded negative cache along
+    with the reason they failed, so that invalid candidates reappearing across
+    generations only ever cost a dictionary lookup.
+    """
+
+    def __init__(self, max_invalid: int = MAX_INVALID_CACHE) -> None:
+        self._invalid: LRUCache = LRUCache(max_invalid)
+        self._failures: Counter = Counter()
+
+    def compile(self, regex_string: str) -> Optional[Pattern]:
+        """
+        Returns the compiled pattern for `regex_string`, or None if it is invalid.
+        """
+        reason: Optional[str] = self._invalid.get(regex_string)
+        if reason is None:
+            try:
+                return re.compile(regex_string)
+            except re.error as e:
+                reason = e.msg
+                self._invalid.put(regex_string, reason)
+
+        self._failures[reason] += 1
+        return None
+
+    def is_invalid(self, regex_string: str) -> bool:
+        return regex_string in self._invalid
+
+    def failures(self) -> Dict[str, int]:
+        """
+        Returns the number of invalid candidates encountered, by failure reason.
+        """
+        return dict(self._failures)
+
+    def info(self) -> Dict[str, float]:
+        return self._invalid.info()
+
+    def clear(self) -> None:
+        self._invalid.clear()
+        self._failures.clear()
@@ -0,0 +1,213 @@
+from typing import Union, Iterable, Sequence, Optional, Dict, List, Set, Tuple
+from collections import defaultdict
+from copy import deepcopy
+
+from evolver.nodes import RxNodeSet, RxNodeSetFactory
+from evolver.exceptions import InvalidRegexError
+from evolver.config import (
+    MUTATION_RATE,
+    MAX_VALID_TRIES,
+    MAX_DATA_SEEDS,
+    MAX_SEED_SET_CHARS,
+    CHAR_SETS,
+    P_SEED,
+    RxSpec,
+)
+
+# a regex string, an RxSpec or a node set (eg the result of a previous run)
+Seed = Union[str, RxSpec, RxNodeSet]
+
+
+def parse_seed(seed: Seed, node_set_factory: RxNodeSetFactory) -> RxNodeSet:
+    """
+    Builds a seed into a node set bound to `node_set_factory`. Regex strings (and
+    node sets, by their display) are parsed with `evolver.parser`, raising
+    `InvalidRegexError` if they cannot be represented as nodes.
+    """
+    if isinstance(seed, RxNodeSet):
+        seed = seed.display()
+    if isinstance(seed, str):
+        return node_set_factory.parse_node_set(seed)
+    return node_set_factory.make_node_set(seed)
+
+
+def seed_population(
+    seeds: Sequence[Seed],
+    size: int,
+    node_set_factory: RxNodeSetFactory,
+    fraction: float = P_SEED,
+    mutation_rate: float = MUTATION_RATE,
+) -> List[RxNodeSet]:
+    """
+    Returns up to `fraction` of a population of `size` (but at least every seed,
+    while there is room) made of the parsed seeds followed by mutated variants of
+    them, taking each seed in turn. Variants that fail validation are redrawn, up
+    to `MAX_VALID_TRIES` times, after which a copy of the seed is used instead.
+    """
+    node_sets: List[RxNodeSet] = [
+        parse_seed(seed, node_set_factory) for seed in seeds[:size]
+    ]
+    count: int = min(size, max(len(node_sets), int(fraction * size)))
+
+    population: List[RxNodeSet] = list(node_sets)
+    i: int = 0
+    while node_sets and len(population) < count:
+        seed: RxNodeSet = node_sets[i % len(node_sets)]
+        for _ in range(MAX_VALID_TRIES):
+            variant: RxNodeSet = seed.mutate(mutation_rate)
+            if variant.is_valid():
+                break
+        else:
+            variant = RxNodeSet(
+                [deepcopy(node) for node in seed.nodes], seed.node_factory
+            )
+        population.append(variant)
+        i += 1
+    return population
+
+
+def data_seeds(
+    positives: Iterable[str],
+    node_set_factory: RxNodeSetFactory,
+    max_seeds: int = MAX_DATA_SEEDS,
+) -> List[RxNodeSet]:
+    """
+    Builds up to `max_seeds` node sets from hypotheses generalized from positive
+    examples (see `positive_regexes`), skipping any that cannot be parsed.
+    """
+    node_sets: List[RxNodeSet] = []
+    for regex_string in positive_regexes(positives, max_seeds):
+        try:
+            node_sets.append(node_set_factory.parse_node_set(regex_string))
+        except InvalidRegexError:
+            continue
+    return node_sets
+
+
+def positive_regexes(
+    positives: Iterable[str], max_seeds: int = MAX_DATA_SEEDS
+) -> List[str]:
+    """
+    Generalizes positive examples into up to `max_seeds` regex strings.
+
+    Each example is split into runs of digits, of letters and of repeated other
+    characters, and examples with the same sequence of runs are aligned. Aligned
+    runs whose text differs are generalized into a class (a set of the characters
+    seen, a range spanning them, or `\\d`), with a count covering their lengths.
+    The most common alignments come first, followed by a class around the
+    longest substring shared by every example, and a class covering everything.
+    """
+    positives = [positive for positive in positives if positive]
+    if not positives:
+        return []
+
+    shapes: Dict[Tuple[str, ...], List[List[str]]] = defaultdict(list)
+    for positive in positives:
+        runs: List[str] = _runs(positive)
+        shapes[tuple([_char_kind(run[0]) for run in runs])].append(runs)
+
+    regexes: List[str] = []
+    for aligned in sorted(shapes.values(), key=len, reverse=True):
+        regexes.append(
+            "".join(
+                [
+                    _generalize([runs[i] for runs in aligned])
+                    for i in range(len(aligned[0]))
+                ]
+            )
+        )
+
+    common: str = _common_substring(positives)
+    if common:
+        outside: Set[str] = set("".join(positives).replace(common, ""))
+        affix: str = _char_class(outside) + "*" if outside else ""
+        regexes.append(affix + _escape(common) + affix)
+    regexes.append(_char_class(set("".join(positives))) + "+")
+
+    return list(dict.fromkeys(regexes))[:max_seeds]
+
+
+def _char_kind(char: str) -> str:
+    if char in CHAR_SETS["digit"]:
+        return "digit"
+    if char in CHAR_SETS["alpha"]:
+        return "alpha"
+    return char
+
+
+def _runs(string: str) -> List[str]:
+    """
+    Splits a string into runs of characters of the same kind (see `_char_kind`).
+    """
+    runs: List[str] = []
+    for char in string:
+        if runs and _char_kind(runs[-1][-1]) == _char_kind(char):
+            runs[-1] += char
+        else:
+            runs.append(char)
+    return runs
+
+
+def _generalize(runs: Sequence[str]) -> str:
+    """
+    Returns a regex matching every one of a set of aligned runs, which is the run
+    itself if they are all identical.
+    """
+    if len(runs) > 1 and len(set(runs)) == 1:
+        return _escape(runs[0])
+
+    lengths: List[int] = [len(run) for run in runs]
+    return _char_class(set("".join(runs))) + _count(min(lengths), max(lengths))
+
+
+def _char_class(chars: Set[str]) -> str:
+    """
+    Returns a regex component matching any of `chars`: the characters themselves
+    if there are few, otherwise `\\d` or ranges spanning the letters seen.
+    """
+    if len(chars) == 1:
+        return _escape(next(iter(chars)))
+    if len(chars) <= MAX_SEED_SET_CHARS:
+        return "[" + "".join([_escape(char, True) for char in sorted(chars)]) + "]"
+
+    ranges: List[str] = []
+    for key in ["digit", "alpha_upper", "alpha_lower"]:
+        members: List[str] = sorted(chars & set(CHAR_SETS[key]))
+        if members:
+            ranges.append(f"{members[0]}-{members[-1]}")
+    others: List[str] = sorted(chars - set(CHAR_SETS["alphanum"]))
+
+    if ranges == ["0-9"] and not others:
+        return r"\d"
+    return "[" + "".join(ranges + [_escape(char, True) for char in others]) + "]"
+
+
+def _count(min_count: int, max_count: int) -> str:
+    """
+    Returns the modifier repeating a component between `min_count` and
+    `max_count` times, where counts are limited to single digits.
+    """
+    if max_count > 9:
+        return "+"
+    if min_count == max_count:
+        return "" if min_count == 1 else f"{{{min_count}}}"
+    return f"{{{min_count},{max_count}}}"
+
+
+def _escape(string: str, in_set: bool = False) -> str:
+    escaped: str = CHAR_SETS["meta"] + ("-" if in_set else "")
+    return "".join(["\\" + char if char in escaped else char for char in string])
+
+
+def _common_substring(strings: Sequence[str]) -> str:
+    """
+    Returns the longest substring (of at least two characters) that appears in
+    every string, or an empty string if there is none.
+    """
+    shortest: str = min(strings, key=len)
+    for length in range(len(shortest), 1, -1):
+        for start in range(len(shortest) - length + 1):
+            candidate: str = shortest[start : start + length]
+            if all([candidate in string for string in strings]):
+                return candidate
+    return ""
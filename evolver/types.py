@@ -1,7 +1,8 @@
 from __future__ import annotations
-from typing import Callable, Iterable, Optional, Dict, Set, List
+from itertools import compress
+from typing import Any, Callable, Hashable, Iterable, Optional, Dict, Set, List
 from evolver.helpers import _d
-from evolver.config import CHAR_SETS, RXTYPE_SETTINGS
+from evolver.config import CHAR_SETS, RXTYPE_SETTINGS, WHITESPACE_CHARS
 
 
 class RxType:
@@ -21,6 +22,11 @@ class RxType:
         self.parent = parent_rxtype
         self.is_modifiable = is_modifiable
 
+        # the names of the type and every type it inherits from
+        self.type_names: frozenset = frozenset([name]) | (
+            parent_rxtype.type_names if parent_rxtype else frozenset()
+        )
+
     def __repr__(self) -> str:
         parent_name = "-"
         if self.parent:
@@ -43,9 +49,9 @@ class RxType:
 
         The `strict` parameter ignores inheritence and only matches explicitly equivalent types.
         """
-        if not strict and self.parent:
-            return self.name == type_name or self.parent.is_type_name(type_name)
-        return self.name == type_name
+        if strict:
+            return self.name == type_name
+        return type_name in self.type_names
 
 
 class RxTypeSet:
@@ -112,6 +118,7 @@ class CharSets:
     def __init__(self, rxtypes: RxTypeSet) -> None:
         self._char_sets: Dict[str, Set[str]] = {c: set() for c in CHAR_SETS.keys()}
         self._rxtypes: RxTypeSet = rxtypes
+        self._tables: Dict[Hashable, str] = {}
 
     def __getitem__(self, key: str) -> Set[str]:
         return self._char_sets[key]
@@ -119,10 +126,32 @@ class CharSets:
     def __contains__(self, key: str) -> bool:
         return key in self._char_sets
 
+    def __deepcopy__(self, memo: Dict[int, Any]) -> CharSets:
+        # shared by every node made by the same factory, so copied nodes keep using it
+        return self
+
     def rxtypes(self) -> RxTypeSet:
         return self._rxtypes
 
+    def mask(self, key: str) -> int:
+        """
+        Returns the bitmask (over `ALPHABET`) of a character group.
+        """
+        return ALPHABET.mask(self[key])
+
+    def table(self, key: Hashable, build: Callable[[], Iterable[str]]) -> str:
+        """
+        Returns a sorted string of characters ready for indexed random choice.
+        The table is built by `build` on first use of `key`, then shared.
+        """
+        table: Optional[str] = self._tables.get(key)
+        if table is None:
+            table = "".join(sorted(build()))
+            self._tables[key] = table
+        return table
+
     def empty_sets(self) -> None:
+        self._tables.clear()
         for key in self._char_sets.keys():
             self._char_sets[key].clear()
 
@@ -153,6 +182,7 @@ class CharSets:
             required for subsets of a specific character set.
         """
         type_names = set(self._rxtypes.get_full_type_names(type_name))
+        self._tables.clear()
 
         # if type name is in printable subset, add characters from char set
         # into the relevant character containers.
@@ -160,4 +190,107 @@ class CharSets:
             for char in char_set:
                 for name in type_names:
                     if name in self._char_sets:
-                        self._char_sets[name].add(char)
\ No newline at end of file
+                        self._char_sets[name].add(char)
+
+
+class Alphabet:
+    """
+    An ordered set of characters over which groups of characters can be
+    represented as integer bitmasks (one bit per character), so that unions,
+    inversions and membership tests are single integer operations.
+    """
+
+    def __init__(self, chars: Iterable[str]) -> None:
+        self.chars: str = "".join(sorted(set(chars)))
+        self.full: int = (1 << len(self.chars)) - 1
+        self._bits: Dict[str, int] = {c: 1 << i for i, c in enumerate(self.chars)}
+
+    def __len__(self) -> int:
+        return len(self.chars)
+
+    def __contains__(self, char: str) -> bool:
+        return char in self._bits
+
+    def bit(self, char: str) -> int:
+        return self._bits.get(char, 0)
+
+    def mask(self, chars: Iterable[str]) -> int:
+        """
+        Returns the bitmask of `chars`, ignoring characters outside of the alphabet.
+        """
+        mask: int = 0
+        for char in chars:
+            mask |= self._bits.get(char, 0)
+        return mask
+
+    def covers(self, chars: Iterable[str]) -> bool:
+        return all([char in self._bits for char in chars])
+
+    def invert(self, mask: int, within: Optional[int] = None) -> int:
+        return (self.full if within is None else within) & ~mask
+
+    def chars_of(self, mask: int) -> str:
+        """
+        Returns the characters in `mask` as a sorted string, ready for sampling.
+        """
+        # the binary digits of `mask`, lowest first, select the characters
+        return "".join(compress(self.chars, map("1".__eq__, bin(mask)[:1:-1])))
+
+    @staticmethod
+    def count(mask: int) -> int:
+        return bin(mask).count("1")
+
+
+# every character that can be generated or matched by the evolver's regexes
+ALPHABET: Alphabet = Alphabet(CHAR_SETS["printable"] + WHITESPACE_CHARS)
+
+
+class BitCharSets(CharSets):
+    """
+    A `CharSets` implementation that stores each character group as an integer
+    bitmask over `ALPHABET` rather than as a set of characters, so that unions,
+    inversions and membership tests are single integer operations. The masks can
+    be shared with matching prefilters and static analysis, and are converted to
+    sets when required.
+    """
+
+    def __init__(self, rxtypes: RxTypeSet, alphabet: Alphabet = ALPHABET) -> None:
+        super().__init__(rxtypes)
+        self.alphabet: Alphabet = alphabet
+        self._masks: Dict[str, int] = {c: 0 for c in CHAR_SETS.keys()}
+        self._views: Dict[str, Set[str]] = {}
+
+    def __getitem__(self, key: str) -> Set[str]:
+        view: Optional[Set[str]] = self._views.get(key)
+        if view is None:
+            view = set(self.alphabet.chars_of(self._masks[key]))
+            self._views[key] = view
+        return view
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._masks
+
+    def mask(self, key: str) -> int:
+        return self._masks[key]
+
+    def empty_sets(self) -> None:
+        self._tables.clear()
+        self._views.clear()
+        for key in self._masks.keys():
+            self._masks[key] = 0
+
+    def init_char_set(
+        self,
+        type_name: str,
+        printable_subset: Set[str],
+        char_set: str,
+    ) -> None:
+        type_names = set(self._rxtypes.get_full_type_names(type_name))
+        self._tables.clear()
+        self._views.clear()
+
+        if type_names & printable_subset:
+            mask: int = self.alphabet.mask(char_set)
+            for name in type_names:
+                if name in self._masks:
+                    self._masks[name] |= mask
@@ -13,9 +13,14 @@ from typing import (
 )
 from random import choice, randint
 
-from evolver.config import WHITESPACE_CHARS, MAX_COMPILE_MUTLIPLE, DOT_ALL
+from evolver.config import (
+    CHAR_SETS,
+    WHITESPACE_CHARS,
+    MAX_COMPILE_MUTLIPLE,
+    DOT_ALL,
+)
 from evolver.exceptions import InvalidRegexError
-from evolver.types import CharSets
+from evolver.types import CharSets, Alphabet, ALPHABET
 
 if TYPE_CHECKING:
     from evolver.nodes import RxNode
@@ -52,18 +57,7 @@ def expand_set(node: "RxNode") -> Set[str]:
 
     # If the node is a character set, add all corresponding characters
     elif node.rxtype.is_type_name("cset"):
-        if "digit" in node.name:
-            char_set |= node.char_sets["digit"]
-
-        elif "whitespace" in node.name:
-            char_set |= set(WHITESPACE_CHARS)
-
-        elif "word" in node.name:
-            char_set |= node.char_sets["alphanum"]
-            char_set.add("_")
-
-        if "!" in node.name:
-            char_set = invert_set(node, char_set)
+        char_set |= class_chars(node, node.name)
 
     # If the node is not a range or a character set, it can simply be compiled
     else:
@@ -72,6 +66,104 @@ def expand_set(node: "RxNode") -> Set[str]:
     return set(char_set)
 
 
+def class_chars(node: "RxNode", class_name: str) -> Set[str]:
+    """
+    Returns the characters matched by one of the fixed character classes
+    (eg `digit`, `!word`, `wildcard`).
+    """
+    char_set: Set[str] = set()
+    if "digit" in class_name:
+        char_set |= node.char_sets["digit"]
+
+    elif "whitespace" in class_name:
+        char_set |= set(WHITESPACE_CHARS)
+
+    elif "word" in class_name:
+        char_set |= node.char_sets["alphanum"]
+        char_set.add("_")
+
+    elif class_name == "wildcard":
+        if DOT_ALL:
+            return set(node.char_sets["printable"])
+        return invert_set(node, {"\n"})
+
+    if "!" in class_name:
+        char_set = invert_set(node, char_set)
+    return char_set
+
+
+def class_char_mask(char_sets: CharSets, class_name: str) -> int:
+    """
+    Returns the bitmask of the active characters (see `class_chars`) matched by
+    one of the fixed character classes, with inverted classes inverted within
+    the active printable characters.
+    """
+    mask: int = 0
+    if "digit" in class_name:
+        mask = char_sets.mask("digit")
+
+    elif "whitespace" in class_name:
+        mask = ALPHABET.mask(WHITESPACE_CHARS)
+
+    elif "word" in class_name:
+        mask = char_sets.mask("alphanum") | ALPHABET.bit("_")
+
+    elif class_name == "wildcard":
+        if DOT_ALL:
+            return char_sets.mask("printable")
+        mask = ALPHABET.bit("\n")
+        class_name = "!wildcard"
+
+    if "!" in class_name:
+        mask = ALPHABET.invert(mask, within=char_sets.mask("printable"))
+    return mask
+
+
+def expand_mask(node: "RxNode") -> int:
+    """
+    Returns the bitmask of the characters matched by a member of a set node
+    (see `expand_set`).
+    """
+    if node.name == "range":
+        range_boundaries = sorted([ord(c.compile()) for c in node.children])
+        return ALPHABET.mask(
+            [chr(i) for i in range(range_boundaries[0], range_boundaries[1] + 1)]
+        )
+
+    if node.rxtype.is_type_name("cset"):
+        return class_char_mask(node.char_sets, node.name)
+    return ALPHABET.mask(node.compile())
+
+
+def class_table(node: "RxNode", class_name: str) -> str:
+    """
+    Returns the sampling table for a fixed character class, which is computed
+    once and shared by every node using the same character sets.
+    """
+    return node.char_sets.table(
+        class_name,
+        lambda: ALPHABET.chars_of(class_char_mask(node.char_sets, class_name)),
+    )
+
+
+def set_table(node: "RxNode", invert: bool = False) -> str:
+    """
+    Returns the sampling table of the characters matched by a set node's
+    children (or by their inversion), computed on first use and cached on the
+    node. The table is read off the union of the children's bitmasks.
+    """
+    table: Optional[str] = getattr(node, "char_table", None)
+    if table is None:
+        mask: int = 0
+        for child in node.children:
+            mask |= expand_mask(child)
+        if invert:
+            mask = ALPHABET.invert(mask, within=node.char_sets.mask("printable"))
+        table = ALPHABET.chars_of(mask)
+        node.char_table = table
+    return table
+
+
 def expand_sets(children: Sequence["RxNode"]) -> Set[str]:
     """
     Expands the set of characters that are matched by a series of regex nodes.
@@ -82,6 +174,57 @@ def expand_sets(children: Sequence["RxNode"]) -> Set[str]:
     return values
 
 
+def class_mask(class_name: str, alphabet: Alphabet = ALPHABET) -> int:
+    """
+    Returns the bitmask of the characters matched by a fixed character class
+    as `re` matches it, with inverted classes inverted within the whole alphabet.
+    """
+    mask: int = 0
+    if "digit" in class_name:
+        mask = alphabet.mask(CHAR_SETS["digit"])
+
+    elif "whitespace" in class_name:
+        mask = alphabet.mask(WHITESPACE_CHARS)
+
+    elif "word" in class_name:
+        mask = alphabet.mask(CHAR_SETS["alphanum"] + "_")
+
+    elif class_name == "wildcard":
+        return alphabet.full if DOT_ALL else alphabet.invert(alphabet.bit("\n"))
+
+    if "!" in class_name:
+        mask = alphabet.invert(mask)
+    return mask
+
+
+def node_mask(node: "RxNode", alphabet: Alphabet = ALPHABET) -> int:
+    """
+    Returns the bitmask of every character that a node can consume when matched
+    by `re`, regardless of its modifier (zero for zero-width nodes such as `\\b`).
+    """
+    if node.name in ["or", "set", "!set"]:
+        mask: int = 0
+        for child in node.children:
+            mask |= node_mask(child, alphabet)
+        if node.name == "!set":
+            mask = alphabet.invert(mask)
+        return mask
+
+    if node.name == "range":
+        range_boundaries = sorted([ord(c.compile()) for c in node.children])
+        return alphabet.mask(
+            [chr(i) for i in range(range_boundaries[0], range_boundaries[1] + 1)]
+        )
+
+    if node.rxtype.is_type_name("cset*"):
+        return 0
+
+    if node.rxtype.is_type_name("cset") or node.name == "wildcard":
+        return class_mask(node.name, alphabet)
+
+    return alphabet.mask(node.compile_function(node))
+
+
 def escape_nonrange_hyphen(displayed: str) -> str:
     """
     Function for escaping hyphens in sets that do not define a range.
@@ -130,12 +273,10 @@ def d_range(node: "RxNode") -> str:
 
 
 def c_set(node: "RxNode", invert: bool = False) -> str:
-    char_set = expand_sets(node.children)
-    if invert:
-        char_set = invert_set(node, char_set)
-    if not char_set:
+    table = set_table(node, invert)
+    if not table:
         raise InvalidRegexError(f"Invalid set ({node.children})")
-    return set_choice(char_set)
+    return choice(table)
 
 
 def c_nset(node: "RxNode") -> str:
@@ -151,9 +292,7 @@ def c_range(node: "RxNode") -> str:
 
 
 def c_wildcard(node: "RxNode") -> str:
-    if not DOT_ALL:
-        return set_choice(invert_set(node, {"\n"}))
-    return set_choice(node.char_sets["printable"])
+    return choice(class_table(node, "wildcard"))
 
 
 ## Modifiers
@@ -192,7 +331,7 @@ def c_whitespace(node: "RxNode") -> str:
 
 
 def c_nwhitespace(node: "RxNode") -> str:
-    return set_choice(invert_set(node, set(WHITESPACE_CHARS)))
+    return choice(class_table(node, "!whitespace"))
 
 
 def c_empty(node: "RxNode") -> str:
@@ -200,19 +339,19 @@ def c_empty(node: "RxNode") -> str:
 
 
 def c_digit(node: "RxNode") -> str:
-    return set_choice(node.char_sets["digit"])
+    return choice(class_table(node, "digit"))
 
 
 def c_ndigit(node: "RxNode") -> str:
-    return set_choice(invert_set(node, node.char_sets["digit"]))
+    return choice(class_table(node, "!digit"))
 
 
 def c_word(node: "RxNode") -> str:
-    return set_choice(node.char_sets["alphanum"] | {"_"})
+    return choice(class_table(node, "word"))
 
 
 def c_nword(node: "RxNode") -> str:
-    return set_choice(invert_set(node, node.char_sets["alphanum"] | {"_"}))
+    return choice(class_table(node, "!word"))
 
 
 rxwrapper_functions: Dict[str, Dict[str, Callable]] = {
@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import Callable, Optional, Iterable, Dict, List
+from typing import Any, Callable, Optional, Iterable, Dict, List
+import random as random_module
 
 from evolver.types import RxType, RxTypeSet, CharSets
 from evolver.wrapper_functions import *
@@ -65,9 +66,9 @@ class RxWrapper:
     def __repr__(self) -> str:
         return f"RxWrapper: {self.name}(children:{self.child_count}, mod:{self.is_modifiable})"
 
-    def get_child_count(self) -> int:
+    def get_child_count(self, rng: Any = random_module) -> int:
         if self.child_count == RAND:
-            return randint(1, MAX_CHILDREN)
+            return rng.randint(1, MAX_CHILDREN)
         return self.child_count
 
 
@@ -149,6 +150,11 @@ class RxWrapperSet:
                 raise TypeError("char set wrappers require a char value")
             name = f"{name}({char_value})"
 
+            # character constants always compile to their own (unescaped) value,
+            # rather than to a character set compile function sharing their name
+            if not compile_function_name:
+                compile_function = _d(char_value)
+
         return RxWrapper(
             name,
             display_function,
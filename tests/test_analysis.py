@@ -0,0 +1,89 @@
+import unittest
+
+from evolver.analysis import RxDataProfile, char_groups
+from evolver.nodes import RxNodeSetFactory
+
+
+class TestRxDataProfile(unittest.TestCase):
+    def setUp(self):
+        self.dataset = [("ab1", True), ("cd22", True), ("xyz", False), ("a-b", False)]
+        self.profile = RxDataProfile(self.dataset)
+
+    def test_char_groups(self):
+        self.assertEqual(char_groups("aB1"), {"alpha_lower", "alpha_upper", "digit"})
+        self.assertEqual(char_groups("-."), {"punctuation", "meta"})
+        self.assertEqual(char_groups(" \t"), set())
+
+    def test_profile(self):
+        self.assertEqual(self.profile.positive_groups, {"alpha_lower", "digit"})
+        self.assertEqual(self.profile.negative_groups, {"alpha_lower", "punctuation"})
+        self.assertTrue(self.profile.has_digits)
+        self.assertFalse(self.profile.has_whitespace)
+        self.assertEqual(self.profile.positives, 2)
+        self.assertEqual(self.profile.min_length, 3)
+        self.assertEqual(self.profile.max_length, 4)
+        self.assertEqual(self.profile.mean_length, 3.5)
+
+    def test_printable_subset(self):
+        self.assertEqual(
+            self.profile.printable_subset(), ["digit", "alpha_lower", "punctuation"]
+        )
+        self.assertIsNone(RxDataProfile([("aZ0-.", True)]).printable_subset())
+
+    def test_omit_types(self):
+        self.assertEqual(self.profile.omit_types(), {"alpha_upper", "meta"})
+        self.assertEqual(
+            RxDataProfile([("a.", True)]).omit_types(),
+            {"alpha_upper", "digit"},
+        )
+        self.assertEqual(
+            RxDataProfile([("\t", True)]).omit_types(),
+            {
+                "alpha_upper",
+                "alpha_lower",
+                "digit",
+                "punctuation",
+                "range",
+                "printable",
+            },
+        )
+
+    def test_omit_wrappers(self):
+        omit = self.profile.omit_wrappers()
+        for name in ["alpha(a)", "alpha(x)", "digit(2)", "printable(-)"]:
+            self.assertNotIn(name, omit)
+        for name in ["alpha(e)", "alpha(A)", "digit(3)", "space", "whitespace"]:
+            self.assertIn(name, omit)
+        self.assertEqual(
+            sorted([name for name in omit if name.startswith("int")]),
+            [f"int({i})" for i in range(5, 10)],
+        )
+        self.assertNotIn("digit", omit)
+        self.assertIn("digit", RxDataProfile([("a b", True)]).omit_wrappers())
+
+    def test_prob_extend(self):
+        self.assertAlmostEqual(self.profile.prob_extend(0.9), 1 - 1 / 3.5)
+        self.assertEqual(self.profile.prob_extend(0.5), 0.5)
+        self.assertEqual(RxDataProfile([]).prob_extend(0.5), 0.5)
+
+    def test_pruned_generation(self):
+        node_set_factory = RxNodeSetFactory(self.profile.printable_subset(), seed=0)
+        node_set_factory.set_omit(
+            self.profile.omit_types(), self.profile.omit_wrappers()
+        )
+        omit = self.profile.omit_wrappers()
+        for node_set in node_set_factory.random_node_sets(200):
+            for mutated in [node_set, node_set.mutate(0.5)]:
+                self.assertTrue(mutated.is_valid())
+                names = set()
+                for node in mutated.nodes:
+                    wrapper_names(node, names)
+                self.assertFalse(names & omit, mutated.display())
+
+
+def wrapper_names(node, names):
+    names.add(node.name)
+    for child in node.children:
+        wrapper_names(child, names)
+    if node.modifier:
+        wrapper_names(node.modifier, names)
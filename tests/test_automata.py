@@ -0,0 +1,122 @@
+import unittest
+import random
+import re
+from collections import Counter
+
+from evolver.automata import RxAutomaton, repeat_bounds
+from evolver.exceptions import AutomatonError, NotFoundError
+from evolver.helpers import postcode_test_data_settings
+from evolver.nodes import RxNodeSetFactory
+
+
+class TestRxAutomaton(unittest.TestCase):
+    def setUp(self):
+        self.factory = RxNodeSetFactory()
+
+    def automaton(self, rxspec):
+        return RxAutomaton(self.factory.make_node_set(rxspec))
+
+    def test_count(self):
+        automaton = self.automaton([["digit", ["count2", ["int(2)", "int(3)"]]]])
+        self.assertEqual([automaton.count(n) for n in range(5)], [0, 0, 100, 1000, 0])
+
+    def test_count_ambiguous(self):
+        # "a" can be matched by either branch, but is only counted once
+        automaton = self.automaton([["or", ["alpha(a)", ["alpha(a)", "0/1"]]]])
+        self.assertEqual([automaton.count(n) for n in range(3)], [1, 1, 0])
+
+    def test_count_postcode(self):
+        automaton = self.automaton(postcode_test_data_settings()["regex"])
+        self.assertEqual(automaton.lengths(), [6, 7, 8])
+        self.assertEqual(automaton.count(6), 52 * 12 * 10 * 52 * 52)
+
+    def test_count_unbounded(self):
+        automaton = self.automaton([["alpha(a)", "0+"]])
+        self.assertEqual(automaton.lengths(4), [0, 1, 2, 3, 4])
+
+    def test_accepts(self):
+        automaton = self.automaton(postcode_test_data_settings()["regex"])
+        self.assertTrue(automaton.accepts("AB1 2CD"))
+        self.assertTrue(automaton.accepts("a9r 2cd"))
+        self.assertFalse(automaton.accepts("AB1 2C"))
+        self.assertFalse(automaton.accepts("AB1 2Cé"))
+
+    def test_sample_matches(self):
+        random.seed(0)
+        for node_set in RxNodeSetFactory(seed=0).random_node_sets(200):
+            try:
+                automaton = RxAutomaton(node_set)
+            except AutomatonError:
+                continue
+            if not automaton.lengths():
+                continue
+            pattern = re.compile(node_set.display())
+            for _ in range(5):
+                self.assertIsNotNone(pattern.fullmatch(automaton.sample()))
+
+    def test_sample_uniform(self):
+        random.seed(0)
+        automaton = self.automaton(
+            [
+                ["or", ["alpha(a)", ["alpha(a)", "0/1"]]],
+                ["or", ["alpha(b)", "digit(1)"]],
+            ]
+        )
+        counts = Counter([automaton.sample(2) for _ in range(4000)])
+        self.assertEqual(set(counts), {"ab", "a1"})
+        self.assertLess(abs(counts["ab"] - counts["a1"]), 300)
+
+    def test_sample_no_match(self):
+        automaton = self.automaton([["digit", ["count", ["int(3)"]]]])
+        with self.assertRaises(NotFoundError):
+            automaton.sample(2)
+
+    def test_complement_count(self):
+        automaton = self.automaton([["digit", ["count2", ["int(1)", "int(2)"]]]])
+        size = len(automaton.alphabet)
+        self.assertEqual(automaton.complement_count(0), 1)
+        self.assertEqual(automaton.complement_count(1), size - 10)
+        self.assertEqual(automaton.complement_count(2), size**2 - 100)
+
+    def test_sample_complement(self):
+        random.seed(0)
+        rxspec = postcode_test_data_settings()["regex"]
+        automaton = self.automaton(rxspec)
+        pattern = re.compile(self.factory.make_node_set(rxspec).display())
+        for length in [None, 0, 3, 6, 7]:
+            for _ in range(20):
+                result = automaton.sample_complement(length)
+                self.assertIsNone(pattern.fullmatch(result))
+                if length is not None:
+                    self.assertEqual(len(result), length)
+
+    def test_sample_complement_near_match(self):
+        # nearly every string of length 2 is a match, so the walk must avoid them
+        random.seed(0)
+        automaton = self.automaton([["!set", ["alpha(a)"]], "wildcard"])
+        for _ in range(20):
+            self.assertFalse(automaton.accepts(automaton.sample_complement(2)))
+
+    def test_near_miss(self):
+        random.seed(0)
+        automaton = self.automaton(postcode_test_data_settings()["regex"])
+        for _ in range(50):
+            positive = automaton.sample()
+            result = automaton.near_miss(positive)
+            self.assertFalse(automaton.accepts(result))
+            self.assertLessEqual(abs(len(result) - len(positive)), 1)
+
+    def test_zero_width_unsupported(self):
+        with self.assertRaises(AutomatonError):
+            self.automaton(["emptyterm"])
+
+    def test_repeat_bounds(self):
+        node_set = self.factory.make_node_set(
+            [
+                "space",
+                ["space", "1+"],
+                ["space", ["count2", ["int(4)", "int(2)"]]],
+            ]
+        )
+        result = [repeat_bounds(node) for node in node_set.nodes]
+        self.assertEqual(result, [(1, 1), (1, None), (2, 4)])
@@ -0,0 +1,221 @@
+import unittest
+import tempfile
+import random
+import pickle
+import os
+import re
+
+from evolver.dataset import (
+    RxDataset,
+    RxDataStream,
+    RxWeightedDataset,
+    csv_to_binary,
+    is_binary_dataset,
+)
+from evolver.types import ALPHABET
+from evolver.evolver import RxDataGen
+from evolver.helpers import safe_sample
+
+
+class TestRxDataset(unittest.TestCase):
+    def setUp(self):
+        self.rows = [(f"row {i} é", i % 3 == 0) for i in range(20)]
+        self.dataset = RxDataset(self.rows)
+
+    def test_len(self):
+        self.assertEqual(len(self.dataset), 20)
+        self.assertEqual(len(RxDataset()), 0)
+
+    def test_getitem(self):
+        for i, row in enumerate(self.rows):
+            self.assertEqual(self.dataset[i], row)
+        self.assertEqual(self.dataset[-1], self.rows[-1])
+
+    def test_getitem_out_of_range(self):
+        with self.assertRaises(IndexError):
+            self.dataset[20]
+
+    def test_getitem_slice(self):
+        result = self.dataset[2:10:3]
+        self.assertIsInstance(result, RxDataset)
+        self.assertEqual(list(result), self.rows[2:10:3])
+
+    def test_iter(self):
+        self.assertEqual(list(self.dataset), self.rows)
+        self.assertEqual(list(self.dataset.strings()), [row[0] for row in self.rows])
+        self.assertEqual(list(self.dataset.labels()), [row[1] for row in self.rows])
+
+    def test_eq(self):
+        self.assertEqual(self.dataset, self.rows)
+        self.assertEqual(self.dataset, RxDataset(self.rows))
+        self.assertNotEqual(self.dataset, self.rows[:-1])
+        self.assertNotEqual(self.dataset, self.rows[:-1] + [("row 19 é", True)])
+
+    def test_append(self):
+        dataset = RxDataset()
+        dataset.append(("", True))
+        dataset.append(("a", False))
+        self.assertEqual(list(dataset), [("", True), ("a", False)])
+
+    def test_sample(self):
+        random.seed(0)
+        result = self.dataset.sample(5)
+        self.assertEqual(len(result), 5)
+        for row in result:
+            self.assertIn(row, self.rows)
+
+    def test_safe_sample(self):
+        result = safe_sample(self.dataset, 5)
+        self.assertEqual(len(result), 5)
+        self.assertIs(safe_sample(self.dataset), self.dataset)
+
+    def test_nbytes(self):
+        text_bytes = sum([len(row[0].encode()) for row in self.rows])
+        self.assertEqual(self.dataset.nbytes(), text_bytes + 21 * 8 + 3)
+
+
+class TestBinaryDataset(unittest.TestCase):
+    def setUp(self):
+        self.rows = [(f"row {i} é", i % 3 == 0) for i in range(20)]
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.filepath = os.path.join(self.tempdir.name, "data.rxds")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_save_open_binary(self):
+        RxDataset(self.rows).save_binary(self.filepath)
+        dataset = RxDataset.open_binary(self.filepath)
+        self.assertTrue(dataset.is_mapped())
+        self.assertEqual(list(dataset), self.rows)
+        self.assertEqual(dataset[7], self.rows[7])
+        self.assertEqual(dataset, RxDataset(self.rows))
+        dataset.close()
+        self.assertEqual(len(dataset), 0)
+
+    def test_open_binary_context(self):
+        RxDataset(self.rows).save_binary(self.filepath)
+        with RxDataset.open_binary(self.filepath) as dataset:
+            self.assertEqual(list(dataset), self.rows)
+        self.assertFalse(dataset.is_mapped())
+        self.assertEqual(len(dataset), 0)
+
+    def test_open_binary_empty(self):
+        RxDataset().save_binary(self.filepath)
+        dataset = RxDataset.open_binary(self.filepath)
+        self.assertEqual(list(dataset), [])
+
+    def test_open_binary_read_only(self):
+        RxDataset(self.rows).save_binary(self.filepath)
+        dataset = RxDataset.open_binary(self.filepath)
+        with self.assertRaises(TypeError):
+            dataset.append(("a", True))
+
+    def test_open_binary_invalid(self):
+        with open(self.filepath, "w") as f:
+            f.write("a,true\n")
+        self.assertFalse(is_binary_dataset(self.filepath))
+        with self.assertRaises(ValueError):
+            RxDataset.open_binary(self.filepath)
+
+    def test_pickle_mapped(self):
+        RxDataset(self.rows).save_binary(self.filepath)
+        dataset = pickle.loads(pickle.dumps(RxDataset.open_binary(self.filepath)))
+        self.assertTrue(dataset.is_mapped())
+        self.assertEqual(list(dataset), self.rows)
+
+    def test_pickle(self):
+        dataset = pickle.loads(pickle.dumps(RxDataset(self.rows)))
+        self.assertEqual(list(dataset), self.rows)
+
+    def test_csv_to_binary(self):
+        csv_filepath = os.path.join(self.tempdir.name, "data.csv")
+        RxDataGen().write_data(csv_filepath, self.rows)
+        self.assertEqual(csv_to_binary(csv_filepath, self.filepath), 20)
+        self.assertTrue(is_binary_dataset(self.filepath))
+        self.assertEqual(list(RxDataset.open_binary(self.filepath)), self.rows)
+
+    def test_csv_to_binary_chunked(self):
+        csv_filepath = os.path.join(self.tempdir.name, "data.csv")
+        RxDataGen().write_data(csv_filepath, self.rows)
+        for chunk_size in [1, 8, 13]:
+            self.assertEqual(
+                csv_to_binary(csv_filepath, self.filepath, chunk_size=chunk_size), 20
+            )
+            with RxDataset.open_binary(self.filepath) as dataset:
+                self.assertEqual(dataset, RxDataset(self.rows))
+
+
+class TestRxDataStream(unittest.TestCase):
+    def setUp(self):
+        self.rows = [(f"row {i}", i % 3 == 0) for i in range(25)]
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.csv_filepath = os.path.join(self.tempdir.name, "data.csv")
+        self.binary_filepath = os.path.join(self.tempdir.name, "data.rxds")
+        RxDataGen().write_data(self.csv_filepath, self.rows)
+        RxDataset(self.rows).save_binary(self.binary_filepath)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_chunks(self):
+        for filepath in [self.csv_filepath, self.binary_filepath]:
+            stream = RxDataStream(filepath, chunk_size=10)
+            chunks = list(stream.chunks())
+            self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+            self.assertEqual([row for chunk in chunks for row in chunk], self.rows)
+
+    def test_len(self):
+        self.assertEqual(len(RxDataStream(self.csv_filepath, chunk_size=10)), 25)
+        self.assertEqual(len(RxDataStream(self.binary_filepath, chunk_size=10)), 25)
+
+
+class TestRxWeightedDataset(unittest.TestCase):
+    def setUp(self):
+        self.rows = [("a", True), ("b", False), ("a", True), ("c", True), ("c", False)]
+        self.weighted = RxWeightedDataset(self.rows)
+
+    def test_weights(self):
+        self.assertEqual(len(self.weighted), 3)
+        self.assertEqual(self.weighted.strings, ["a", "b", "c"])
+        self.assertEqual(list(self.weighted.match_weights), [2, 0, 1])
+        self.assertEqual(list(self.weighted.no_match_weights), [0, 1, 1])
+        self.assertEqual(self.weighted.total(), 5)
+
+    def test_compact(self):
+        weighted = RxWeightedDataset(RxDataset(self.rows))
+        self.assertIsInstance(weighted.strings, RxDataset)
+        self.assertEqual(list(weighted.unique_strings()), ["a", "b", "c"])
+        self.assertEqual(list(weighted.match_weights), [2, 0, 1])
+        self.assertEqual(weighted.conflicts(), {"c": (1, 1)})
+        self.assertEqual(weighted.count_correct(re.compile("a|c")), 4)
+
+    def test_hash_collisions(self):
+        class Colliding(str):
+            def __hash__(self):
+                return 0
+
+        rows = [(Colliding(string), label) for string, label in self.rows]
+        weighted = RxWeightedDataset(rows)
+        self.assertEqual(weighted.strings, ["a", "b", "c"])
+        self.assertEqual(list(weighted.match_weights), [2, 0, 1])
+        self.assertEqual(list(weighted.no_match_weights), [0, 1, 1])
+
+    def test_conflicts(self):
+        self.assertEqual(self.weighted.conflicts(), {"c": (1, 1)})
+
+    def test_count_correct(self):
+        self.assertEqual(self.weighted.count_correct(re.compile("a|c")), 4)
+        self.assertEqual(self.weighted.count_correct(re.compile("b")), 1)
+
+    def test_count_correct_excluded(self):
+        # excluding "c" skips the regex, so it is counted as not matching
+        excluded = ALPHABET.mask("c")
+        self.assertEqual(self.weighted.count_correct(re.compile("a|c"), excluded), 4)
+        self.assertEqual(self.weighted.count_correct(re.compile("c"), excluded), 2)
+
+    def test_count_correct_uncovered(self):
+        # strings with characters outside of the alphabet are always checked
+        weighted = RxWeightedDataset([("\u00e9", True), ("a", False)])
+        excluded = ALPHABET.invert(ALPHABET.mask("a"))
+        self.assertEqual(weighted.count_correct(re.compile("\u00e9|b"), excluded), 2)
@@ -1,12 +1,138 @@
 import unittest
+import tempfile
+import random
+import os
+import io
+from contextlib import redirect_stdout
+from copy import deepcopy
+from typing import Iterator
 
 from evolver.evolver import RxEvolver, RxDataGen
-from evolver.helpers import check_match
+from evolver.dataset import RxDataset, RxDataStream
+from evolver.config import MAX_WORDS
+from evolver.exceptions import NotFoundError
+from evolver.helpers import check_match, postcode_test_data_settings
 
 
 class TestRxEvolver(unittest.TestCase):
+    def setUp(self):
+        self.dataset = [("ab1", True), ("cd2", True), ("xyz", False), ("12", False)]
+
     def test_generate_population(self):
-        pass
+        evolver = RxEvolver(self.dataset)
+        evolver.generate_population(20)
+        self.assertEqual(len(evolver._population), 20)
+
+    def test_generate_population_seeds(self):
+        evolver = RxEvolver(self.dataset)
+        evolver.generate_population(20, seeds=[r"[a-z]{2}\d"], seed_fraction=0.25)
+        self.assertEqual(len(evolver._population), 20)
+        self.assertEqual(evolver._population[0].display(), r"[a-z]{2}\d")
+
+    def test_prune_search_space(self):
+        evolver = RxEvolver(self.dataset, prune_search=True)
+        profile = evolver.data_profile()
+        self.assertEqual(profile.positive_groups, {"alpha_lower", "digit"})
+        node_factory = evolver._rxnode_set_factory.node_factory
+        self.assertEqual(node_factory.omit_wrappers, profile.omit_wrappers())
+        self.assertIn("alpha_upper", node_factory.omit_types)
+
+        result = evolver.evolve(pop_size=10, max_gen=5, verbose=False, seeds=[r"\w+"])
+        self.assertLessEqual(evolver.score_func(result), 0.5)
+
+    def test_rank_population_parsimony(self):
+        evolver = RxEvolver(self.dataset)
+        evolver.generate_population(
+            3, seeds=[r"(a|c)[b-d]\d", r"\w", r"\w\w\d"], seed_fraction=1
+        )
+        ranked = evolver.rank_population()
+        self.assertEqual([score for score, _ in ranked], [0, 0, 0.5])
+
+        ranked = evolver.rank_population(parsimony=0.1)
+        self.assertEqual(
+            [node_set.display() for _, node_set in ranked],
+            [r"\w\w\d", r"(a|c)[b-d]\d", r"\w"],
+        )
+        self.assertEqual([score for score, _ in ranked], [0, 0, 0.5])
+
+    def test_evolve_limits(self):
+        evolver = RxEvolver(self.dataset)
+        evolver.evolve(
+            pop_size=20, max_gen=5, verbose=False, parsimony=0.01, max_nodes=8
+        )
+        self.assertEqual(evolver._rxnode_set_factory.node_factory.max_nodes, 8)
+        for node_set in evolver._population:
+            self.assertLessEqual(node_set.size(), 8)
+
+    def test_evolve_steady_state(self):
+        evolver = RxEvolver(self.dataset)
+        result = evolver.evolve(
+            pop_size=10,
+            max_gen=5,
+            verbose=False,
+            seeds=[r"[a-z]{2}\d"],
+            steady_state=True,
+            batch_size=4,
+        )
+        self.assertEqual(evolver.score_func(result), 0)
+        self.assertIs(evolver._population[0], result)
+
+    def test_evolve_steady_state_sorted(self):
+        evolver = RxEvolver(self.dataset)
+        evolver.generate_population(30, seeds=[r"\w+", r"\w+"], seed_fraction=0)
+        evolver.evolve_steady_state(max_gen=3, batch_size=5, verbose=False)
+
+        population = evolver._population
+        self.assertEqual(len(population), 30)
+        scores = evolver.score_population(population)
+        self.assertEqual(scores, sorted(scores))
+
+    def test_evolve_migrate(self):
+        evolver = RxEvolver(self.dataset)
+
+        def migrate(generation, scores):
+            return [evolver.node_set_factory().parse_node_set(r"[a-z]{2}\d")]
+
+        for steady_state in [False, True]:
+            result = evolver.evolve(
+                pop_size=10,
+                max_gen=5,
+                verbose=False,
+                steady_state=steady_state,
+                migrate=migrate,
+            )
+            self.assertEqual(evolver.score_func(result), 0)
+
+    def test_evolve_observe(self):
+        evolver = RxEvolver(self.dataset)
+        for steady_state in [False, True]:
+            generations = []
+            evolver.evolve(
+                pop_size=10,
+                max_gen=5,
+                verbose=False,
+                steady_state=steady_state,
+                observe=lambda generation, scores: generations.append(generation),
+            )
+            self.assertEqual(generations, list(range(len(generations))))
+            self.assertGreater(len(generations), 0)
+
+    def test_evolve_quiet(self):
+        evolver = RxEvolver(self.dataset)
+        for steady_state in [False, True]:
+            stdout = io.StringIO()
+            with redirect_stdout(stdout):
+                evolver.evolve(
+                    pop_size=10, max_gen=3, verbose=False, steady_state=steady_state
+                )
+            self.assertEqual(stdout.getvalue(), "")
+
+    def test_evolve_stop(self):
+        evolver = RxEvolver(self.dataset)
+        result = evolver.evolve(
+            pop_size=10, max_gen=100, verbose=False, stop=lambda: True
+        )
+        self.assertIn(result, evolver._population)
 
     def test_sample_dataset(self):
         pass
@@ -15,7 +141,79 @@ class TestRxEvolver(unittest.TestCase):
         pass
 
     def test_score_func(self):
-        pass
+        evolver = RxEvolver(self.dataset)
+        self.assertEqual(evolver.score_func(regex_string=r"[a-z]{2}\d"), 0)
+        self.assertEqual(evolver.score_func(regex_string=r"\w+"), 0.5)
+
+    def test_score_func_duplicates(self):
+        dataset = self.dataset * 3 + [("ab1", False), ("xyz", False)]
+        evolver = RxEvolver(dataset)
+        expected = 1 - sum(
+            [check_match(r"\w+", row[0]) == row[1] for row in dataset]
+        ) / len(dataset)
+        self.assertEqual(evolver.score_func(regex_string=r"\w+"), expected)
+        self.assertEqual(evolver.label_conflicts(), {"ab1": (3, 1)})
+
+    def test_score_func_invalid_regex(self):
+        evolver = RxEvolver(self.dataset)
+        self.assertEqual(evolver.score_func(regex_string=r"a**"), 1)
+        self.assertEqual(evolver.score_func(regex_string=r"a**"), 1)
+        self.assertEqual(evolver.compile_failures(), {"multiple repeat": 2})
+
+    def test_score_func_prefilter(self):
+        dataset = RxDataGen().gen_test_data(**postcode_test_data_settings(200), seed=0)
+        evolver = RxEvolver(dataset)
+        evolver.generate_population(50)
+        for node_set in evolver._population:
+            self.assertEqual(
+                evolver.score_func(node_set),
+                evolver.score_func(regex_string=node_set.display()),
+            )
+
+    def test_score_population(self):
+        dataset = RxDataGen().gen_test_data(**postcode_test_data_settings(200), seed=0)
+        evolver = RxEvolver(dataset)
+        evolver.generate_population(50)
+        result = evolver.score_population(evolver._population)
+        expected = [evolver.score_func(node_set) for node_set in evolver._population]
+        self.assertEqual(result, expected)
+
+    def test_score_data_stream(self):
+        dataset = RxDataGen().gen_test_data(**postcode_test_data_settings(200), seed=0)
+        evolver = RxEvolver(dataset)
+        evolver.generate_population(20)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "data.rxds")
+            RxDataset(dataset).save_binary(filepath)
+            stream_evolver = RxEvolver(RxDataStream(filepath, chunk_size=64))
+            stream_evolver._population = evolver._population
+
+            self.assertEqual(
+                stream_evolver.rank_population(), evolver.rank_population()
+            )
+            node_set = evolver._population[0]
+            self.assertEqual(
+                stream_evolver.score_func(node_set), evolver.score_func(node_set)
+            )
+
+    def test_score_mapped(self):
+        dataset = RxDataGen().gen_test_data(**postcode_test_data_settings(200), seed=0)
+        evolver = RxEvolver(dataset)
+        evolver.generate_population(20)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "data.rxds")
+            RxDataset(dataset).save_binary(filepath)
+            mapped_evolver = RxEvolver(RxDataset.open_binary(filepath))
+            self.assertTrue(mapped_evolver.is_mapped())
+            self.assertEqual(
+                mapped_evolver.score_population(evolver._population),
+                evolver.score_population(evolver._population),
+            )
+            node_set = evolver._population[0]
+            self.assertEqual(
+                mapped_evolver.score_func(node_set), evolver.score_func(node_set)
+            )
+            self.assertIsNone(mapped_evolver._weighted_dataset)
 
     def test_rank_population(self):
         pass
@@ -24,6 +222,25 @@ class TestRxEvolver(unittest.TestCase):
         # If possible
         pass
 
+    def test_data_seeds(self):
+        data_gen = RxDataGen()
+        data_gen.load_data("data/regex_golf_1.csv")
+        evolver = RxEvolver(data_gen.export())
+        seeds = [node_set.display() for node_set in evolver.data_seeds()]
+        self.assertIn("[a-y]*foo[a-y]*", seeds)
+
+        result = evolver.evolve(
+            pop_size=20, max_gen=5, verbose=False, seed_from_data=True
+        )
+        self.assertEqual(evolver.score_func(result), 0)
+
+    def test_evolve_seeded(self):
+        evolver = RxEvolver(self.dataset)
+        result = evolver.evolve(
+            pop_size=10, max_gen=5, verbose=False, seeds=[r"[a-z]{2}\d"]
+        )
+        self.assertEqual(evolver.score_func(result), 0)
+
 
 class TestRxDataGen(unittest.TestCase):
     def setUp(self):
@@ -47,8 +264,161 @@ class TestRxDataGen(unittest.TestCase):
         result = data_gen.gen_test_match(self.rxspec)
         self.assertRegex(result, self.regex)
 
+    def test_gen_test_match_compiled(self):
+        data_gen = RxDataGen()
+        compiled = data_gen.compile_spec(self.rxspec)
+        result = data_gen.gen_test_match(compiled)
+        self.assertRegex(result, self.regex)
+
+    def test_gen_test_match_zero_width(self):
+        data_gen = RxDataGen()
+        compiled = data_gen.compile_spec(["alpha(a)", "emptyterm"])
+        self.assertIsNone(compiled.automaton)
+        self.assertEqual(data_gen.gen_test_match(compiled), "a")
+
+    def test_gen_test_near_miss(self):
+        data_gen = RxDataGen()
+        for _ in range(20):
+            result = data_gen.gen_test_near_miss(self.rxspec)
+            self.assertFalse(check_match(self.regex, result))
+
+    def test_gen_test_complement(self):
+        data_gen = RxDataGen()
+        for _ in range(20):
+            result = data_gen.gen_test_complement(self.rxspec)
+            self.assertFalse(check_match(self.regex, result))
+
+    def test_gen_test_complement_unsupported(self):
+        data_gen = RxDataGen()
+        with self.assertRaises(NotFoundError):
+            data_gen.gen_test_complement(["alpha(a)", "emptyterm"])
+
+    def test_gen_test_near_miss_unsupported(self):
+        data_gen = RxDataGen()
+        with self.assertRaises(NotFoundError):
+            data_gen.gen_test_near_miss(["alpha(a)", "emptyterm"])
+
+    def test_compile_spec(self):
+        data_gen = RxDataGen()
+        compiled = data_gen.compile_spec(self.rxspec)
+        self.assertEqual(compiled.regex_string, self.regex)
+        self.assertTrue(compiled.check_match("Dxa!!!!"))
+        self.assertFalse(compiled.check_match("Dxa!!!"))
+        self.assertTrue(compiled.automaton.accepts("Dxa!!!!"))
+
+    def test_compile_spec_cached(self):
+        data_gen = RxDataGen()
+        compiled = data_gen.compile_spec(self.rxspec)
+        self.assertIs(data_gen.compile_spec(deepcopy(self.rxspec)), compiled)
+        self.assertIs(data_gen.compile_spec(compiled), compiled)
+
+    def test_gen_test_data_labels(self):
+        data_gen = RxDataGen()
+        for row in data_gen.gen_test_data(self.rxspec, rows=50):
+            self.assertEqual(row[1], check_match(self.regex, row[0]))
+
+    def test_gen_test_data_labels_near_miss(self):
+        data_gen = RxDataGen()
+        probabilities = {"match": 0.5, "near_miss": 0.5}
+        rows = data_gen.gen_test_data(self.rxspec, rows=50, probabilities=probabilities)
+        for row in rows:
+            self.assertEqual(row[1], check_match(self.regex, row[0]))
+
+    def test_gen_test_data_labels_complement(self):
+        data_gen = RxDataGen()
+        probabilities = {"match": 0.2, "complement": 1}
+        rows = data_gen.gen_test_data(self.rxspec, rows=50, probabilities=probabilities)
+        for row in rows:
+            self.assertEqual(row[1], check_match(self.regex, row[0]))
+
+    def test_iter_test_data(self):
+        data_gen = RxDataGen()
+        rows = data_gen.iter_test_data(self.rxspec, rows=5)
+        self.assertIsInstance(rows, Iterator)
+        self.assertEqual(len(list(rows)), 5)
+
+    def test_write_data_load_data(self):
+        data = [("a,b", True), ("c|d", False), ("e\nf", True), ("g h", False)]
+        data_gen = RxDataGen()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "data.csv")
+            written = data_gen.write_data(filepath, data, batch_size=3)
+            data_gen.load_data(filepath)
+        self.assertEqual(written, len(data))
+        self.assertEqual(data_gen.export(), data)
+
+    def test_load_data_binary(self):
+        data = [("a,b", True), ("c|d", False)]
+        data_gen = RxDataGen()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "data.rxds")
+            RxDataset(data).save_binary(filepath)
+            data_gen.load_data(filepath)
+            self.assertTrue(data_gen.export().is_mapped())
+            data_gen.load_data(filepath)
+            self.assertFalse(data_gen.export().is_mapped())
+            self.assertEqual(data_gen.export(), data + data)
+
+    def test_write_data_callback(self):
+        progress = []
+        data_gen = RxDataGen()
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            filepath = os.path.join(tmp_dir, "data.csv")
+            data_gen.write_data(
+                filepath,
+                data_gen.iter_test_data(self.rxspec, rows=25),
+                batch_size=10,
+                callback=lambda written, rate: progress.append(written),
+            )
+        self.assertEqual(progress, [10, 20, 25])
+
+    def test_gen_test_data_seeded(self):
+        data_gen = RxDataGen()
+        first = data_gen.gen_test_data(self.rxspec, rows=20, seed=1)
+        second = RxDataGen().gen_test_data(self.rxspec, rows=20, seed=1)
+        self.assertEqual(first, second)
+
+    def test_gen_test_data_seeded_preserves_random_state(self):
+        state = random.getstate()
+        RxDataGen().gen_test_data(self.rxspec, rows=5, seed=1)
+        self.assertEqual(random.getstate(), state)
+
+    def test_gen_test_data_workers_reproducible(self):
+        settings = postcode_test_data_settings(2500)
+        single = RxDataGen().gen_test_data(**settings, seed=3)
+        parallel = RxDataGen().gen_test_data(**settings, workers=2, seed=3)
+        self.assertEqual(len(parallel), 2500)
+        self.assertEqual(single, parallel)
+
     def test_gen_test_no_match(self):
-        pass
+        data_gen = RxDataGen()
+        self.assertIsInstance(data_gen.gen_test_no_match(), str)
+
+    def test_gen_test_no_match_batch(self):
+        data_gen = RxDataGen()
+        result = data_gen.gen_test_no_match_batch(100)
+        self.assertEqual(len(result), 100)
+        for res in result:
+            self.assertTrue(1 <= len(res.split(" ")) <= MAX_WORDS + 1)
+
+    def test_gen_test_no_match_batch_data_format(self):
+        data_gen = RxDataGen()
+        data_format = {
+            "num_words": 2,
+            "char_set": "digit",
+            "word_length": lambda i: [3, 1][i],
+        }
+        result = data_gen.gen_test_no_match_batch(50, 0.5, 1, data_format)
+        for res in result:
+            self.assertRegex(res, r"^\d{3} \d$")
+
+    def test_gen_test_data_batch(self):
+        data_gen = RxDataGen()
+        probabilities = {"match": 0.4, "near_miss": 0.3, "complement": 0.5}
+        rows = data_gen.gen_test_data_batch(self.rxspec, 100, None, probabilities)
+        self.assertEqual(len(rows), 100)
+        for row in rows:
+            self.assertEqual(row[1], check_match(self.regex, row[0]))
 
     def test_pct_data_correct(self):
         pass
@@ -7,6 +7,15 @@ from evolver.helpers import (
     check_match,
     callable_get,
     safe_sample,
+    batch_rng,
+    uniform_batch,
+    index_batch,
+    geometric_batch,
+    BatchRandom,
+    LRUCache,
+    freeze_rxspec,
+    freeze_node_spec,
+    thaw_node_spec,
 )
 
 
@@ -80,4 +89,85 @@ class TestHelpers(unittest.TestCase):
     def test_safe_sample_unsafe(self):
         data = [1, 2, 3, 4, 5]
         result = safe_sample(data, 10)
-        self.assertEqual(len(result), len(data))
\ No newline at end of file
+        self.assertEqual(len(result), len(data))
+
+    def test_uniform_batch(self):
+        result = uniform_batch(batch_rng(0), 100)
+        self.assertEqual(len(result), 100)
+        self.assertTrue(all(0 <= value < 1 for value in result))
+
+    def test_index_batch(self):
+        result = index_batch(batch_rng(0), 7, 100)
+        self.assertEqual(len(result), 100)
+        self.assertTrue(all(0 <= value < 7 for value in result))
+
+    def test_geometric_batch(self):
+        result = geometric_batch(batch_rng(0), 0.5, 1000)
+        self.assertTrue(all(value >= 1 for value in result))
+        self.assertAlmostEqual(sum(result) / len(result), 2, delta=0.3)
+
+    def test_geometric_batch_no_extend(self):
+        result = geometric_batch(batch_rng(0), 0, 10)
+        self.assertEqual(result, [1] * 10)
+
+    def test_batch_rng_seeded(self):
+        self.assertEqual(
+            uniform_batch(batch_rng(5), 10), uniform_batch(batch_rng(5), 10)
+        )
+
+    def test_batch_random(self):
+        rng = BatchRandom(batch_rng(0), block_size=7)
+        ints = [rng.randint(1, 3) for _ in range(100)]
+        self.assertEqual(set(ints), {1, 2, 3})
+        self.assertTrue(all([rng.choice("ab") in "ab" for _ in range(20)]))
+        self.assertTrue(all([0 <= rng.random() < 1 for _ in range(20)]))
+
+        first, second = BatchRandom(batch_rng(5), 3), BatchRandom(batch_rng(5), 3)
+        self.assertEqual(
+            [first.random() for _ in range(10)], [second.random() for _ in range(10)]
+        )
+
+    def test_freeze_node_spec(self):
+        node_spec = {"rw_name": "or", "children": [{"rw_name": "alpha(a)"}]}
+        frozen = freeze_node_spec(node_spec)
+        self.assertIsInstance(frozen["children"], tuple)
+        with self.assertRaises(TypeError):
+            frozen["children"][0]["rw_name"] = "alpha(b)"
+        self.assertEqual(thaw_node_spec(frozen), node_spec)
+
+    def test_freeze_deep_node_spec(self):
+        # nested well past the recursion limit
+        node_spec = {"rw_name": "alpha(a)"}
+        for _ in range(2000):
+            node_spec = {"rw_name": "group", "children": [node_spec]}
+        frozen = freeze_node_spec(node_spec)
+        self.assertIsInstance(frozen["children"][0]["children"], tuple)
+        thawed = thaw_node_spec(frozen)
+        for _ in range(2000):
+            [thawed] = thawed["children"]
+        self.assertEqual(thawed, {"rw_name": "alpha(a)"})
+
+        rxspec = ["alpha(a)"]
+        for _ in range(2000):
+            rxspec = ["group", rxspec]
+        self.assertEqual(hash(freeze_rxspec(rxspec)), hash(freeze_rxspec(rxspec)))
+
+
+class TestLRUCache(unittest.TestCase):
+    def test_get_put(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.info()["hits"], 1)
+        self.assertEqual(cache.info()["misses"], 1)
+
+    def test_evicts_least_recently_used(self):
+        cache = LRUCache(2)
+        cache.put("a", 1)
+        cache.put("b", 2)
+        cache.get("a")
+        cache.put("c", 3)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertEqual(len(cache), 2)
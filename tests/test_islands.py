@@ -0,0 +1,94 @@
+import unittest
+from queue import Queue
+
+from evolver.islands import RxMigration, evolve_islands
+from evolver.nodes import RxNodeSetFactory
+
+
+class TestRxMigration(unittest.TestCase):
+    def setUp(self):
+        self.node_set_factory = RxNodeSetFactory(seed=0)
+        self.inbox = Queue()
+        self.outbox = Queue()
+        self.migration = RxMigration(
+            self.inbox, self.outbox, self.node_set_factory, interval=5, migrants=2
+        )
+        self.scores = [
+            (score, self.node_set_factory.parse_node_set(regex))
+            for score, regex in [(0.1, r"\d+"), (0.2, "[a-z]"), (0.3, "x")]
+        ]
+
+    def test_migrate(self):
+        self.inbox.put([r"[a-z]{2}\d", "^a$"])
+        immigrants = self.migration(5, self.scores)
+        self.assertEqual(self.outbox.get_nowait(), [r"\d+", "[a-z]"])
+        self.assertEqual(
+            [node_set.display() for node_set in immigrants], [r"[a-z]{2}\d"]
+        )
+        self.assertIs(immigrants[0].node_factory, self.node_set_factory.node_factory)
+
+    def test_migrate_interval(self):
+        self.inbox.put(["a"])
+        for generation in [0, 1, 4, 6]:
+            self.assertEqual(self.migration(generation, self.scores), [])
+        self.assertTrue(self.outbox.empty())
+        self.assertEqual(len(self.migration(10, self.scores)), 1)
+
+    def test_receive_empty(self):
+        self.assertEqual(self.migration.receive(), [])
+
+    def test_counts(self):
+        self.inbox.put([r"[a-z]{2}\d", "(", "b"])
+        self.migration.observe(5, self.scores)
+        self.migration(5, self.scores)
+        self.assertEqual(self.migration.generations, 6)
+        self.assertEqual(self.migration.immigrants, 2)
+
+
+class TestEvolveIslands(unittest.TestCase):
+    def setUp(self):
+        self.dataset = [
+            ("ab1", True),
+            ("cd2", True),
+            ("xyz", False),
+            ("12", False),
+            ("ab", False),
+            ("a1", False),
+        ]
+
+    def test_evolve_islands(self):
+        params = [
+            {"pop_size": 10, "max_gen": 50, "seeds": [r"[a-z]{2}\d"]},
+            {"pop_size": 10, "max_gen": 50, "steady_state": True},
+        ]
+        results = evolve_islands(
+            self.dataset, islands=2, params=params, migration_interval=2, seed=0
+        )
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["score"], 0)
+        self.assertEqual(results[0]["regex"], r"[a-z]{2}\d")
+        self.assertIsInstance(results[1]["regex"], str)
+
+    def test_evolve_islands_stop(self):
+        # the second island cannot improve, so only the first can stop it
+        frozen = {"mutation_rate": 0, "crossover_rate": 0, "pnew_upper": 0}
+        params = [
+            {"pop_size": 10, "max_gen": 50, "seeds": [r"[a-z]{2}\d"]},
+            {"pop_size": 10, "max_gen": 1_000_000, "pnew_lower": 0, **frozen},
+        ]
+        results = evolve_islands(self.dataset, islands=2, params=params, seed=0)
+        self.assertEqual(results[0]["score"], 0)
+        self.assertGreater(results[1]["score"], 0)
+        self.assertLess(results[1]["generations"], 1000)
+
+    def test_evolve_islands_migration(self):
+        # no regex can separate the rows, so both islands run to `max_gen`
+        dataset = [("ab1", True), ("ab1", False), ("xyz", False)]
+        params = [{"pop_size": 10, "max_gen": 10}, {"pop_size": 10, "max_gen": 200}]
+        results = evolve_islands(
+            dataset, islands=2, params=params, migration_interval=2, migrants=2, seed=0
+        )
+        self.assertEqual([result["generations"] for result in results], [10, 200])
+        # the first island's four migrations all reach the second, still running
+        self.assertEqual(results[1]["immigrants"], 8)
+        self.assertGreater(results[0]["immigrants"], 0)
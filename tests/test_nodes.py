@@ -1,6 +1,14 @@
 import unittest
+import random
+import re
 
-from evolver.nodes import RxNode, RxNodeFactory
+from evolver.nodes import (
+    RxNode,
+    RxNodeFactory,
+    RxNodeSet,
+    RxNodeSetFactory,
+    limit_nodes,
+)
 
 
 class TestRxNode(unittest.TestCase):
@@ -116,6 +124,20 @@ class TestRxNodeFactory(unittest.TestCase):
         for i in range(len(results)):
             self.assertEqual(results[i], self.node_specs[i])
 
+    def test_parse_rxspec_cached(self):
+        node_factory = RxNodeFactory()
+        frozen = node_factory.parse_rxspec_frozen(self.rxspecs[0])
+        self.assertIs(node_factory.parse_rxspec_frozen(self.rxspecs[0]), frozen)
+        self.assertEqual(node_factory.parse_cache_info()["hits"], 1)
+        with self.assertRaises(TypeError):
+            frozen["rw_name"] = "!set"
+
+        # mutable copies do not share state with the cache
+        result = node_factory.parse_rxspec(self.rxspecs[0])
+        result["children"].pop()
+        self.assertEqual(node_factory.parse_rxspec(self.rxspecs[0]), self.node_specs[0])
+        self.assertEqual(node_factory.parse_cache_info()["hits"], 3)
+
     def test_make_node(self):
         pass
 
@@ -128,6 +150,134 @@ class TestRxNodeFactory(unittest.TestCase):
     def test_make_random_node_omit_wrappers(self):
         pass
 
+    def test_wrapper_table_cached(self):
+        node_factory = RxNodeFactory()
+        table = node_factory.wrapper_table("re")
+        self.assertIs(node_factory.wrapper_table("re"), table)
+        self.assertTrue(all(w.rxtype.is_type_name("re") for w in table))
+
+    def test_wrapper_table_omit_wrappers(self):
+        node_factory = RxNodeFactory()
+        self.assertIn("word", [w.name for w in node_factory.wrapper_table("re")])
+        node_factory.set_omit(wrappers=["word"])
+        self.assertNotIn("word", [w.name for w in node_factory.wrapper_table("re")])
+        node_factory.clear_omit()
+        self.assertIn("word", [w.name for w in node_factory.wrapper_table("re")])
+
+
+class TestRxNodeValidity(unittest.TestCase):
+    def setUp(self):
+        self.node_set_factory = RxNodeSetFactory()
+
+    def make_node(self, rxspec):
+        return self.node_set_factory.make_node_set([rxspec]).nodes[0]
+
+    def test_is_valid_set(self):
+        node = self.make_node(["set", [["range", ["alpha(a)", "alpha(f)"]], "digit"]])
+        self.assertTrue(node.is_valid())
+
+    def test_is_valid_nset_empty_inversion(self):
+        node = self.make_node(["!set", ["word", "!word"]])
+        self.assertFalse(node.is_valid())
+
+    def test_make_node_zero_width_unmodifiable(self):
+        node = self.make_node(["emptyterm", "0+"])
+        self.assertIsNone(node.modifier)
+
+    def test_is_valid_modified_zero_width(self):
+        node = self.make_node("emptyterm")
+        node.set_modifier(self.make_node("0+"))
+        self.assertFalse(node.is_valid())
+
+    def test_is_valid_or_zero_width_child(self):
+        node = self.make_node(["or", ["alpha(a)", "emptyterm"]])
+        self.assertFalse(node.is_valid())
+
+    def test_is_zero_width_count(self):
+        node = self.make_node(["alpha(a)", ["count", ["int(0)"]]])
+        self.assertTrue(node.is_zero_width())
+
+    def test_random_nodes_valid(self):
+        node_factory = self.node_set_factory.node_factory
+        for _ in range(500):
+            self.assertTrue(node_factory.make_random_node().is_valid())
+
+    def test_random_node_sets_valid(self):
+        for node_set in self.node_set_factory.random_node_sets(200):
+            self.assertTrue(node_set.is_valid())
+            self.assertIsNotNone(re.compile(node_set.display()))
+
+    def test_random_ranges_ordered(self):
+        node_factory = self.node_set_factory.node_factory
+        for _ in range(100):
+            node = node_factory.make_random_node("range", is_child=True)
+            bounds = [child.display() for child in node.children]
+            self.assertEqual(bounds, sorted(bounds))
+
+    def test_mutate_resets_char_table(self):
+        node = self.make_node(["set", ["alpha(a)"]])
+        node.char_table = "z"
+        mutated = node.mutate(self.node_set_factory.node_factory, 0)
+        self.assertEqual(mutated.compile(), "a")
+        self.assertIs(mutated.char_sets, node.char_sets)
+
+    def test_mutate_crossover_valid(self):
+        population = self.node_set_factory.random_node_sets(50)
+        for _ in range(200):
+            first, second = random.sample(population, 2)
+            node_set = first.crossover(second, 1).mutate(0.5)
+            self.assertTrue(node_set.is_valid())
+            population.append(node_set)
+
+
+class TestRxNodeSetLimits(unittest.TestCase):
+    def setUp(self):
+        self.node_set_factory = RxNodeSetFactory(seed=0)
+
+    def test_size_depth(self):
+        node_set = self.node_set_factory.parse_node_set(r"[a-c\d]{2,3}x")
+        self.assertEqual(node_set.nodes[0].size(), 8)
+        self.assertEqual(node_set.nodes[0].depth(), 3)
+        self.assertEqual(node_set.size(), 9)
+        self.assertEqual(node_set.depth(), 3)
+
+        # sizes are counted again when the nodes are replaced
+        node_set.nodes = node_set.nodes[1:]
+        self.assertEqual(node_set.size(), 1)
+
+        node_set = self.node_set_factory.parse_node_set("(a|(b|c))")
+        self.assertEqual(node_set.depth(), 3)
+
+    def test_limit_nodes(self):
+        nodes = self.node_set_factory.parse_node_set("ab[cd]e").nodes
+        self.assertEqual(limit_nodes(nodes, 10), nodes)
+        self.assertEqual(limit_nodes(nodes, 4), nodes[:2])
+        self.assertEqual(limit_nodes(nodes, 0), nodes[:1])
+
+    def test_random_node_sets_limited(self):
+        self.node_set_factory.set_limits(max_nodes=6, max_depth=2)
+        for node_set in self.node_set_factory.random_node_sets(200, prob_extend=0.9):
+            self.assertTrue(
+                node_set.size() <= 6 or len(node_set.nodes) == 1, node_set.display()
+            )
+            self.assertLessEqual(node_set.depth(), 2, node_set.display())
+
+    def test_operators_limited(self):
+        self.node_set_factory.set_limits(max_nodes=12, max_depth=3)
+        population = self.node_set_factory.random_node_sets(50)
+        for _ in range(500):
+            first, second = random.sample(population, 2)
+            node_set = first.crossover(second, 1).mutate(0.5)
+            self.assertLessEqual(node_set.size(), max(12, first.size()))
+            self.assertLessEqual(node_set.depth(), max(3, first.depth()))
+            population.append(node_set)
+
+    def test_operators_over_limits(self):
+        node_set = self.node_set_factory.parse_node_set("abcdefgh")
+        self.node_set_factory.set_limits(max_nodes=4)
+        for _ in range(20):
+            self.assertLessEqual(node_set.mutate(1).size(), 8)
+
 
 class TestRxNodeSet(unittest.TestCase):
     def test_display(self):
@@ -155,3 +305,27 @@ class TestRxNodeSetFactory(unittest.TestCase):
 
     def test_random_node_set_omit_wrappers(self):
         pass
+
+    def test_random_node_sets(self):
+        node_set_factory = RxNodeSetFactory(seed=0)
+        results = node_set_factory.random_node_sets(50)
+        self.assertEqual(len(results), 50)
+        for node_set in results:
+            self.assertIsInstance(node_set, RxNodeSet)
+            self.assertGreaterEqual(len(node_set.nodes), 1)
+
+    def test_random_node_sets_seeded(self):
+        first = RxNodeSetFactory(seed=3).random_node_sets(20)
+        second = RxNodeSetFactory(seed=3).random_node_sets(20)
+        self.assertEqual(
+            [[node.name for node in node_set.nodes] for node_set in first],
+            [[node.name for node in node_set.nodes] for node_set in second],
+        )
+
+    def test_random_node_sets_no_extend(self):
+        node_set_factory = RxNodeSetFactory()
+        results = node_set_factory.random_node_sets(20, prob_extend=0)
+        self.assertTrue(all(len(node_set.nodes) == 1 for node_set in results))
+
+    def test_random_node_sets_empty(self):
+        self.assertEqual(RxNodeSetFactory().random_node_sets(0), [])
@@ -1,6 +1,16 @@
 import unittest
 
-from evolver.parser import parse_regex
+from evolver.exceptions import InvalidRegexError
+from evolver.nodes import RxNodeSet, RxNodeSetFactory
+from evolver.parser import (
+    _extract_group,
+    clear_parse_cache,
+    extract_symbols,
+    parse_cache_info,
+    parse_regex,
+    parse_regex_frozen,
+    regex_to_nodes,
+)
 
 
 class TestRxParser(unittest.TestCase):
@@ -19,3 +29,148 @@ class TestRxParser(unittest.TestCase):
         for r in result:
             print(r)
         self.assertTrue(False)
+
+    def test_extract_symbols(self):
+        symbols, end = extract_symbols("a(b|c)d")
+        self.assertEqual(end, -1)
+        self.assertEqual(
+            [(level, value[0]) for _, level, value in symbols],
+            [
+                (0, "group"),
+                (1, "alpha(a)"),
+                (1, "or"),
+                (1.5, "group"),
+                (2, "alpha(b)"),
+                (1.5, "group"),
+                (2, "alpha(c)"),
+                (1, "alpha(d)"),
+            ],
+        )
+
+        symbols, end = extract_symbols("b)c", 1)
+        self.assertEqual(end, 2)
+        self.assertEqual(len(symbols), 2)
+
+    def test_extract_symbols_unclosed(self):
+        # deeply nested unclosed groups are rejected without being rescanned
+        with self.assertRaises(InvalidRegexError):
+            extract_symbols("(" * 30 + "a")
+        with self.assertRaises(InvalidRegexError):
+            parse_regex("a(b(c")
+
+    def test_extract_symbols_linear(self):
+        # tokenizing never copies the regex, which would be quadratic in its groups
+        class CountingStr(str):
+            copied = 0
+
+            def __getitem__(self, key):
+                item = str.__getitem__(self, key)
+                CountingStr.copied += len(item)
+                return item
+
+        regex = "|".join(["a(b|c)"] * 1000)
+        symbols = []
+        _extract_group(CountingStr(f"({regex})"), 0, 0, symbols, 1)
+        self.assertEqual(
+            [symbol for symbol in symbols if symbol is not None],
+            extract_symbols(regex)[0],
+        )
+        self.assertLessEqual(CountingStr.copied, 2 * len(regex))
+
+    def test_extract_symbols_below_top_level(self):
+        with self.assertRaises(InvalidRegexError):
+            extract_symbols("a]](b)")
+
+    def test_parse_regex_cached(self):
+        clear_parse_cache()
+        frozen = parse_regex_frozen(self.or_bounded_regex)
+        self.assertIs(parse_regex_frozen(self.or_bounded_regex), frozen)
+        self.assertEqual(parse_cache_info()["hits"], 1)
+        with self.assertRaises(TypeError):
+            frozen[0]["rw_name"] = "alpha(b)"
+
+        # mutable copies do not share state with the cache
+        result = parse_regex(self.or_bounded_regex)
+        result.pop()
+        self.assertEqual(len(parse_regex(self.or_bounded_regex)), len(frozen))
+        self.assertEqual(parse_cache_info()["misses"], 1)
+
+    def test_parse_regex_deep_nesting(self):
+        result = parse_regex("(" * 200 + "a|b" + ")" * 200)
+        for _ in range(199):
+            [result] = result
+            self.assertEqual(result["rw_name"], "group")
+            result = result["children"]
+        self.assertEqual(result[0]["rw_name"], "or")
+
+        # alternations at every level, as deep as before specs were cached
+        result = parse_regex("(" * 200 + "a" + "|b)" * 200)
+        for _ in range(200):
+            [result] = result
+            self.assertEqual(result["rw_name"], "or")
+            result = result["children"][0]["children"]
+
+
+class TestRegexToNodes(unittest.TestCase):
+    def setUp(self):
+        self.node_set_factory = RxNodeSetFactory(seed=3)
+        self.node_factory = self.node_set_factory.node_factory
+
+    def test_round_trip(self):
+        for node_set in self.node_set_factory.random_node_sets(500):
+            parsed = self.node_set_factory.parse_node_set(node_set.display())
+            self.assertIsInstance(parsed, RxNodeSet)
+            self.assertIs(parsed.node_factory, self.node_factory)
+            self.assertEqual(parsed.display(), node_set.display())
+
+    def test_regex_to_nodes(self):
+        nodes = regex_to_nodes(r"[a-z]{1,2}\d?.\-", self.node_factory)
+        self.assertEqual(
+            [node.name for node in nodes], ["set", "digit", "wildcard", "printable(-)"]
+        )
+        self.assertEqual(nodes[0].modifier.name, "count2")
+        self.assertEqual(nodes[0].children[0].name, "range")
+        self.assertTrue(nodes[0].children[0].is_child)
+        self.assertEqual(nodes[1].modifier.name, "0/1")
+
+        [node] = regex_to_nodes("a|b|c", self.node_factory)
+        self.assertEqual(node.display(), "(a|(b|c))")
+        self.assertFalse(node.is_child)
+        self.assertTrue(all([child.is_child for child in node.children]))
+
+        [node] = regex_to_nodes("a+?", self.node_factory)
+        self.assertEqual(node.modifier.modifier.name, "!greedy")
+
+        self.assertEqual(
+            "".join(
+                [node.display() for node in regex_to_nodes("[]a-]", self.node_factory)]
+            ),
+            r"[\]a\-]",
+        )
+        self.assertFalse(self.node_set_factory.parse_node_set(r"(a|\b)").is_valid())
+
+    def test_unsupported(self):
+        for regex in [
+            "",
+            "(ab|c)",
+            "(a)",
+            "(?:a|b)",
+            "^a",
+            "a$",
+            "a**",
+            "*a",
+            "a{12}",
+            "a{3,1}",
+            "[z-a]",
+            r"[\d-z]",
+            r"\1",
+            "a\\",
+            "a)",
+            "(a|b",
+            "[ab",
+            r"\b*",
+            "(a|b)*",
+            "\t",
+        ]:
+            with self.assertRaises(InvalidRegexError, msg=regex):
+                regex_to_nodes(regex, self.node_factory)
@@ -0,0 +1,92 @@
+import unittest
+import tempfile
+import json
+import os
+from queue import Queue
+
+from evolver.portfolio import RxProgress, gen_random_params, race_portfolio
+from evolver.nodes import RxNodeSetFactory
+
+
+def migrate_none(generation, scores):
+    return []
+
+
+class TestPortfolio(unittest.TestCase):
+    def setUp(self):
+        self.dataset = [("ab1", True), ("cd2", True), ("xyz", False), ("12", False)]
+
+    def test_gen_random_params(self):
+        for _ in range(20):
+            params = gen_random_params()
+            self.assertEqual(
+                set(params),
+                {"mutation_rate", "crossover_rate", "pexp", "pnew_upper", "pnew_lower"},
+            )
+            self.assertGreaterEqual(params["pnew_upper"], params["pnew_lower"])
+
+    def test_progress(self):
+        queue = Queue()
+        progress = RxProgress(queue, 3, interval=2)
+        scores = [(0.25, RxNodeSetFactory().parse_node_set(r"\w+"))]
+        for generation in range(5):
+            progress(generation, scores)
+        self.assertEqual(progress.generations, 5)
+        self.assertEqual(
+            [queue.get_nowait() for _ in range(queue.qsize())],
+            [(3, generation, 0.25, r"\w+") for generation in [0, 2, 4]],
+        )
+
+    def test_race_portfolio(self):
+        configs = [
+            {"seeds": [r"[a-z]{2}\d"]},
+            {"mutation_rate": 0.5},
+            {"mutation_rate": 0.9},
+        ]
+        reports = []
+        with tempfile.TemporaryDirectory() as tmpdir:
+            record_path = os.path.join(tmpdir, "winners.jsonl")
+            results = race_portfolio(
+                self.dataset,
+                configs,
+                params={"pop_size": 10, "max_gen": 50},
+                workers=1,
+                seed=0,
+                on_progress=reports.append,
+                record_path=record_path,
+            )
+            with open(record_path) as file:
+                records = [json.loads(line) for line in file]
+
+        self.assertEqual(len(results), 3)
+        self.assertEqual(results[0]["score"], 0)
+        self.assertEqual(results[0]["regex"], r"[a-z]{2}\d")
+        self.assertEqual([result["won"] for result in results], [True, False, False])
+        self.assertEqual(results[1]["params"], {"mutation_rate": 0.5})
+
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]["params"], {"seeds": [r"[a-z]{2}\d"]})
+        self.assertEqual(records[0]["regex"], r"[a-z]{2}\d")
+
+    def test_race_portfolio_migrate(self):
+        reports = []
+        results = race_portfolio(
+            self.dataset,
+            [{"migrate": migrate_none}],
+            params={"pop_size": 10, "max_gen": 3},
+            workers=1,
+            seed=0,
+            on_progress=reports.append,
+            progress_interval=1,
+        )
+        self.assertIsInstance(results[0]["regex"], str)
+        self.assertEqual(len(reports), results[0]["generations"])
+
+    def test_race_portfolio_random_configs(self):
+        results = race_portfolio(
+            self.dataset, 2, params={"pop_size": 10, "max_gen": 3}, seed=0
+        )
+        self.assertEqual(len(results), 2)
+        for result in results:
+            self.assertIn("pnew_upper", result["params"])
+            self.assertIsInstance(result["regex"], str)
@@ -0,0 +1,45 @@
+import unittest
+
+from evolver.scoring import RxPatternCache, string_mask
+from evolver.types import ALPHABET
+
+
+class TestRxPatternCache(unittest.TestCase):
+    def test_compile_valid(self):
+        patterns = RxPatternCache()
+        result = patterns.compile(r"\d+")
+        self.assertIsNotNone(result.fullmatch("123"))
+        self.assertEqual(patterns.failures(), {})
+
+    def test_compile_invalid(self):
+        patterns = RxPatternCache()
+        self.assertIsNone(patterns.compile(r"\b*"))
+        self.assertTrue(patterns.is_invalid(r"\b*"))
+        self.assertEqual(patterns.failures(), {"nothing to repeat": 1})
+
+    def test_compile_invalid_cached(self):
+        patterns = RxPatternCache()
+        for _ in range(3):
+            self.assertIsNone(patterns.compile(r"[a"))
+        self.assertEqual(patterns.info()["hits"], 2)
+        self.assertEqual(sum(patterns.failures().values()), 3)
+
+    def test_compile_invalid_bounded(self):
+        patterns = RxPatternCache(max_invalid=2)
+        for regex_string in [r"a**", r"b**", r"c**"]:
+            patterns.compile(regex_string)
+        self.assertFalse(patterns.is_invalid(r"a**"))
+        self.assertTrue(patterns.is_invalid(r"c**"))
+
+    def test_clear(self):
+        patterns = RxPatternCache()
+        patterns.compile(r"a**")
+        patterns.clear()
+        self.assertFalse(patterns.is_invalid(r"a**"))
+        self.assertEqual(patterns.failures(), {})
+
+
+class TestStringMask(unittest.TestCase):
+    def test_string_mask(self):
+        self.assertEqual(string_mask("ab"), ALPHABET.mask("ab"))
+        self.assertIsNone(string_mask("b\u00e9"))
@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import patch
+
+from evolver.nodes import RxNodeSet, RxNodeSetFactory
+from evolver.seeding import (
+    parse_seed,
+    seed_population,
+    positive_regexes,
+    data_seeds,
+)
+from evolver.exceptions import InvalidRegexError
+from evolver.helpers import check_match
+
+
+class TestSeeding(unittest.TestCase):
+    def setUp(self):
+        self.node_set_factory = RxNodeSetFactory(seed=0)
+
+    def test_parse_seed(self):
+        node_set = parse_seed(r"[a-z]{1,2}\d", self.node_set_factory)
+        self.assertEqual(node_set.display(), r"[a-z]{1,2}\d")
+        self.assertIs(node_set.node_factory, self.node_set_factory.node_factory)
+
+        node_set = parse_seed(
+            [["digit", ["count2", ["int(2)", "int(3)"]]]], self.node_set_factory
+        )
+        self.assertEqual(node_set.display(), r"\d{2,3}")
+
+        other = RxNodeSetFactory().parse_node_set("(a|b)c")
+        node_set = parse_seed(other, self.node_set_factory)
+        self.assertEqual(node_set.display(), "(a|b)c")
+        self.assertIs(node_set.node_factory, self.node_set_factory.node_factory)
+
+    def test_parse_seed_invalid(self):
+        with self.assertRaises(InvalidRegexError):
+            parse_seed("^a$", self.node_set_factory)
+
+    def test_seed_population(self):
+        seeds = [r"[a-z]+\d", "(x|y)z"]
+        population = seed_population(
+            seeds, 50, self.node_set_factory, fraction=0.2, mutation_rate=0.5
+        )
+        self.assertEqual(len(population), 10)
+        self.assertEqual([node_set.display() for node_set in population[:2]], seeds)
+        for node_set in population:
+            self.assertIsInstance(node_set, RxNodeSet)
+
+        # mutating variants leaves the seeds untouched
+        self.assertEqual([node_set.display() for node_set in population[:2]], seeds)
+
+    def test_seed_population_keeps_seeds(self):
+        seeds = ["a", "b", "c"]
+        population = seed_population(seeds, 10, self.node_set_factory, fraction=0)
+        self.assertEqual([node_set.display() for node_set in population], seeds)
+
+        population = seed_population(seeds, 2, self.node_set_factory)
+        self.assertEqual([node_set.display() for node_set in population], seeds[:2])
+
+    def test_seed_population_invalid_variants(self):
+        # seeds are copied when every redrawn variant is invalid
+        invalid = RxNodeSet([], self.node_set_factory.node_factory)
+        with patch.object(RxNodeSet, "mutate", return_value=invalid):
+            population = seed_population(["ab"], 4, self.node_set_factory, 1)
+        self.assertEqual([node_set.display() for node_set in population], ["ab"] * 4)
+        self.assertTrue(all([node_set.is_valid() for node_set in population]))
+        self.assertIsNot(population[1].nodes[0], population[0].nodes[0])
+
+
+class TestDataSeeding(unittest.TestCase):
+    def test_positive_regexes_aligned(self):
+        positives = ["AB1 2CD", "XY9 8ZZ", "CD12 3EF"]
+        regexes = positive_regexes(positives)
+        self.assertEqual(regexes[0], r"[A-Y]{2}[129]{1,2} [238][C-Z]{2}")
+        for regex in regexes:
+            for positive in positives:
+                self.assertTrue(check_match(regex, positive), (regex, positive))
+
+    def test_positive_regexes_common_substring(self):
+        positives = ["afoot", "catfoot", "foody", "prefool"]
+        self.assertIn("[a-y]*foo[a-y]*", positive_regexes(positives))
+
+    def test_positive_regexes_classes(self):
+        self.assertEqual(positive_regexes(["12", "345"])[0], r"[1-5]{2,3}")
+        self.assertEqual(positive_regexes(["a.b", "a.c"])[0], r"a\.[bc]")
+        self.assertEqual(positive_regexes(["x" * 12, "y"])[0], "[xy]+")
+        self.assertEqual(positive_regexes([]), [])
+        self.assertEqual(len(positive_regexes(["a1", "b", "c-"], max_seeds=2)), 2)
+
+    def test_data_seeds(self):
+        node_set_factory = RxNodeSetFactory()
+        positives = ["ab-1", "cd-22", "ef\t3"]
+        node_sets = data_seeds(positives, node_set_factory)
+        self.assertTrue(node_sets)
+        for node_set in node_sets:
+            self.assertIsInstance(node_set, RxNodeSet)
+            self.assertIs(node_set.node_factory, node_set_factory.node_factory)
@@ -1,6 +1,15 @@
 import unittest
-
-from evolver.types import RxType, RxTypeSet, CharSets
+from copy import deepcopy
+
+from evolver.types import (
+    RxType,
+    RxTypeSet,
+    CharSets,
+    Alphabet,
+    BitCharSets,
+    ALPHABET,
+)
+from evolver.wrappers import RxWrapperSet
 from evolver.config import CHAR_SETS, RXTYPE_SETTINGS, RXWRAPPER_SETTINGS
 
 
@@ -284,6 +293,29 @@ class TestCharSet(unittest.TestCase):
         for key in char_sets._char_sets.keys():
             self.assertEqual(len(char_sets._char_sets[key]), 0)
 
+    def test_table(self):
+        char_sets = CharSets(RxTypeSet())
+        result = char_sets.table("test", lambda: {"c", "a", "b"})
+        self.assertEqual(result, "abc")
+
+    def test_table_cached(self):
+        char_sets = CharSets(RxTypeSet())
+        builds = []
+        build = lambda: builds.append(1) or {"a"}
+        char_sets.table("test", build)
+        char_sets.table("test", build)
+        self.assertEqual(len(builds), 1)
+
+    def test_table_cleared_by_empty_sets(self):
+        char_sets = CharSets(RxTypeSet())
+        char_sets.table("test", lambda: {"a"})
+        char_sets.empty_sets()
+        self.assertEqual(char_sets.table("test", lambda: {"b"}), "b")
+
+    def test_deepcopy_shared(self):
+        char_sets = CharSets(RxTypeSet())
+        self.assertIs(deepcopy(char_sets), char_sets)
+
     def test_init_char_set_full_subset(self):
         type_set = RxTypeSet()
         type_set.init_types()
@@ -379,3 +411,49 @@ class TestCharSet(unittest.TestCase):
 
             for char in CHAR_SETS[type_name]:
                 self.assertIn(char, char_sets._char_sets[type_name])
+
+
+class TestAlphabet(unittest.TestCase):
+    def test_mask(self):
+        alphabet = Alphabet("cab")
+        self.assertEqual(alphabet.chars, "abc")
+        self.assertEqual(alphabet.mask("ac"), 0b101)
+        self.assertEqual(alphabet.mask("az"), 0b001)
+
+    def test_covers(self):
+        alphabet = Alphabet("abc")
+        self.assertTrue(alphabet.covers("cab"))
+        self.assertFalse(alphabet.covers("abz"))
+
+    def test_invert(self):
+        alphabet = Alphabet("abc")
+        self.assertEqual(alphabet.invert(0b001), 0b110)
+        self.assertEqual(alphabet.invert(0b001, within=0b011), 0b010)
+
+    def test_chars_of(self):
+        alphabet = Alphabet("abc")
+        self.assertEqual(alphabet.chars_of(0b110), "bc")
+        self.assertEqual(Alphabet.count(0b110), 2)
+
+
+class TestBitCharSets(unittest.TestCase):
+    def test_matches_char_sets(self):
+        char_sets = CharSets(RxTypeSet())
+        bit_char_sets = BitCharSets(RxTypeSet())
+        RxWrapperSet(char_sets, ["digit", "alpha_upper"])
+        RxWrapperSet(bit_char_sets, ["digit", "alpha_upper"])
+
+        for key in CHAR_SETS.keys():
+            self.assertEqual(bit_char_sets[key], char_sets[key])
+            self.assertEqual(bit_char_sets.mask(key), char_sets.mask(key))
+            self.assertEqual(bit_char_sets.mask(key), ALPHABET.mask(char_sets[key]))
+
+    def test_empty_sets(self):
+        char_sets = BitCharSets(RxTypeSet())
+        RxWrapperSet(char_sets)
+        self.assertNotEqual(char_sets.mask("printable"), 0)
+
+        char_sets.empty_sets()
+        for key in CHAR_SETS.keys():
+            self.assertEqual(char_sets.mask(key), 0)
+            self.assertEqual(char_sets[key], set())
@@ -5,7 +5,7 @@ import random
 
 from evolver.config import CHAR_SETS, WHITESPACE_CHARS
 from evolver.helpers import _d
-from evolver.types import RxType, RxTypeSet, CharSets
+from evolver.types import RxType, RxTypeSet, CharSets, BitCharSets, ALPHABET
 from evolver.wrappers import RxWrapper, RxWrapperSet
 from evolver.wrapper_functions import *
 
@@ -231,6 +231,30 @@ class TestRxWrapperSet(unittest.TestCase):
         wrapper = wrappers.create_wrapper(**data)
         self.assertEqual(wrapper.name, "digit(5)")
 
+    def test_create_wrapper_char_set_compiles_to_value(self):
+        wrappers = RxWrapperSet(self.char_sets, init_wrappers=False)
+        data = {
+            "name": "digit",
+            "rxtype_name": "digit",
+            "is_char_set": True,
+            "char_value": "5",
+        }
+        wrapper = wrappers.create_wrapper(**data)
+        self.assertEqual(wrapper.compile_function(None), "5")
+
+    def test_create_wrapper_meta_char_compiles_unescaped(self):
+        wrappers = RxWrapperSet(self.char_sets, init_wrappers=False)
+        data = {
+            "name": "printable",
+            "rxtype_name": "meta",
+            "display_value": r"\{}",
+            "is_char_set": True,
+            "char_value": ".",
+        }
+        wrapper = wrappers.create_wrapper(**data)
+        self.assertEqual(wrapper.display_function(None), r"\.")
+        self.assertEqual(wrapper.compile_function(None), ".")
+
     def test_init_wrappers(self):
         wrappers = RxWrapperSet(self.char_sets, init_wrappers=False)
         wrappers.init_wrappers()
@@ -294,3 +318,119 @@ class TestRxWrapperFunctions(unittest.TestCase):
         )
         result = expand_set(mock_node)
         self.assertSetEqual(result, set(WHITESPACE_CHARS))
+
+    def test_class_chars_inverted(self):
+        mock_node = MockNode(char_sets=self.char_sets)
+        result = class_chars(mock_node, "!digit")
+        self.assertSetEqual(
+            result, invert_set(mock_node, self.char_sets["digit"], "printable")
+        )
+
+    def test_class_chars_wildcard(self):
+        mock_node = MockNode(char_sets=self.char_sets)
+        result = class_chars(mock_node, "wildcard")
+        self.assertSetEqual(result, self.char_sets["printable"] - {"\n"})
+
+    def test_class_table_shared(self):
+        first = MockNode(char_sets=self.char_sets)
+        second = MockNode(char_sets=self.char_sets)
+        self.assertIs(class_table(first, "!word"), class_table(second, "!word"))
+        self.assertEqual(
+            class_table(first, "!word"), "".join(sorted(class_table(first, "!word")))
+        )
+
+    def test_set_table_cached(self):
+        mock_node = MockNode(
+            char_sets=self.char_sets,
+            children=[
+                MockNode(_d("f"), _d("f"), rxtype=RxType("test")),
+                MockNode(_d("a"), _d("a"), rxtype=RxType("test")),
+            ],
+        )
+        self.assertEqual(set_table(mock_node), "af")
+        mock_node.children = []
+        self.assertEqual(set_table(mock_node), "af")
+
+    def test_set_table_inverted(self):
+        mock_node = MockNode(
+            char_sets=self.char_sets,
+            children=[MockNode(_d("f"), _d("f"), rxtype=RxType("test"))],
+        )
+        result = set_table(mock_node, invert=True)
+        self.assertNotIn("f", result)
+        self.assertEqual(len(result), len(self.char_sets["printable"]) - 1)
+
+    def test_class_char_mask(self):
+        # masks read the same characters as sets, for any active subset
+        for printable_subset in [None, ["digit", "punctuation"]]:
+            char_sets = CharSets(RxTypeSet())
+            bit_char_sets = BitCharSets(RxTypeSet())
+            RxWrapperSet(char_sets, printable_subset)
+            RxWrapperSet(bit_char_sets, printable_subset)
+            mock_node = MockNode(char_sets=char_sets)
+            for class_name in [
+                "digit",
+                "!digit",
+                "word",
+                "!word",
+                "whitespace",
+                "!whitespace",
+            ]:
+                expected = ALPHABET.mask(class_chars(mock_node, class_name))
+                self.assertEqual(class_char_mask(char_sets, class_name), expected)
+                self.assertEqual(class_char_mask(bit_char_sets, class_name), expected)
+            self.assertEqual(
+                class_char_mask(bit_char_sets, "wildcard"),
+                ALPHABET.mask(class_chars(mock_node, "wildcard")),
+            )
+
+    def test_set_table_classes(self):
+        mock_node = MockNode(
+            char_sets=self.char_sets,
+            children=[
+                MockNode(name="digit", rxtype=RxType("cset"), char_sets=self.char_sets),
+                MockNode(_d("_"), _d("_"), rxtype=RxType("test")),
+            ],
+        )
+        self.assertEqual(
+            set_table(mock_node), "".join(sorted(CHAR_SETS["digit"] + "_"))
+        )
+
+    def test_class_mask(self):
+        self.assertEqual(class_mask("digit"), ALPHABET.mask(CHAR_SETS["digit"]))
+        self.assertEqual(
+            class_mask("!digit"), ALPHABET.invert(ALPHABET.mask(CHAR_SETS["digit"]))
+        )
+        self.assertFalse(class_mask("wildcard") & ALPHABET.bit("\n"))
+
+    def test_node_mask(self):
+        mock_node = MockNode(
+            name="set",
+            rxtype=RxType("set"),
+            children=[
+                MockNode(_d("f"), _d("f"), rxtype=RxType("test")),
+                MockNode(name="digit", rxtype=RxType("cset")),
+            ],
+        )
+        self.assertEqual(node_mask(mock_node), ALPHABET.mask("f0123456789"))
+
+        mock_node.name = "!set"
+        self.assertEqual(
+            node_mask(mock_node), ALPHABET.invert(ALPHABET.mask("f0123456789"))
+        )
+
+    def test_node_mask_zero_width(self):
+        mock_node = MockNode(name="word_boundary", rxtype=RxType("cset*"))
+        self.assertEqual(node_mask(mock_node), 0)
+
+    def test_c_nset(self):
+        mock_node = MockNode(
+            char_sets=self.char_sets,
+            children=[
+                MockNode(
+                    name="!digit", rxtype=RxType("cset"), char_sets=self.char_sets
+                ),
+            ],
+        )
+        for _ in range(20):
+            self.assertIn(c_nset(mock_node), CHAR_SETS["digit"])